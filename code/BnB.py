@@ -1,115 +1,697 @@
 """
 This file contains the implementation of a Branch-and-Bound (BnB) for MVC problem.
+
+The search runs on an explicit stack over array degrees: the residual graph is never copied
+or rebuilt, removed vertices are pushed on a trail and restored in LIFO order on backtracking,
+and the alive vertices are kept in doubly linked degree buckets, so the max-degree vertex is
+found in O(1) amortized time.
+
+Subtrees are pruned by the pluggable lower bounds of bounds.py, evaluated cheapest first.
+Branching is on the max-degree vertex v, refined by
+- mirrors (if v has at most MIRROR_MAX_DEGREE neighbors): a vertex u at distance 2 is a mirror
+  of v if N(v) \\ N(u) is a clique; some minimum cover either excludes v or contains v and all its mirrors;
+- satellites (if v has no mirror): w is a satellite of v if N(u) \\ N[v] = {w} for some u in N(v);
+  some minimum cover either contains v or excludes v and all its satellites;
+- components: once the residual graph splits, every component is solved independently.
+
+With workers > 1 the first branching decisions are fixed to split the tree into subproblems, which
+a pool of processes solves. The incumbent size is shared through a multiprocessing.Value, so every
+worker prunes against the best cover found by any of them, and a busy worker hands the unexplored
+branch closest to its root over to the task queue whenever another worker is idle (work stealing).
 """
+import multiprocessing as mp
+import queue
 import time
-import math
-import sys
+from bounds import BOUNDS, DEFAULT_BOUNDS
+from heuristics import best_of
+from budget import as_budget
+from shared_graph import publish, attach
+
+# mirrors are only searched for branching vertices up to this degree, the search is O(deg(v) * |N(N(v))|)
+MIRROR_MAX_DEGREE = 64
+# the parallel search starts with at least this many subproblems per worker
+SPLIT_FACTOR = 4
+# a busy worker checks for idle workers every 2 ** STEAL_INTERVAL_BITS nodes
+STEAL_INTERVAL_BITS = 6
 
-def branch_and_bound(graph, cut_off_time=600):
+
+class _Search:
     """
-    Branch and Bound Method.
-    :param graph: Graph object
-    :param cut_off_time: int (600 by default)
+    The search engine on the residual graph.
 
-    :return: best_cover, trace
+    :param indptr: list, CSR row pointers
+    :param indices: list, CSR neighbor indices
+    :param alive: list of bool, the vertices of the graph to cover
+    :param budget: Budget, the time budget of the search
+    :param stats: dict, the search statistics, shared with the nested component searches
+    :param bounds: tuple of bound names (see bounds.BOUNDS), cheapest first
+    :param mirrors: bool, whether to branch on mirrors and satellites
+    :param components: bool, whether to solve components independently
     """
+    def __init__(self, indptr, indices, alive, budget, stats, bounds=DEFAULT_BOUNDS, mirrors=True, components=True):
+        self.indptr = indptr
+        self.indices = indices
+        self.alive = alive = list(alive)
+        self.budget = budget
+        self.stats = stats
+        self.bound_names = bounds
+        self.use_mirrors = mirrors
+        self.use_components = components
+        n = len(alive)
+        self.degree = degree = [0] * n
+        for v in range(n):
+            if alive[v]:
+                degree[v] = sum(1 for k in range(indptr[v], indptr[v + 1]) if alive[indices[k]])
+        self.max_degree = max(degree, default=0)
+        self.edges = sum(degree) // 2
+        # degree buckets as doubly linked lists, with their sizes
+        self.head = head = [-1] * (self.max_degree + 1)
+        self.count = count = [0] * (self.max_degree + 1)
+        self.nxt = nxt = [-1] * n
+        self.prv = prv = [-1] * n
+        for v in range(n):
+            if alive[v]:
+                d = degree[v]
+                nxt[v] = head[d]
+                if head[d] != -1:
+                    prv[head[d]] = v
+                head[d] = v
+                count[d] += 1
+        self.trail = []
+        # scratch marks for the mirror / satellite / component computations
+        self.mark_of = [0] * n
+        self.current_mark = 0
+        self.bounds = [BOUNDS[name](self) for name in bounds]
+        self.incremental = [bound for bound in self.bounds if bound.incremental]
+        self.complete = True
+        # the _Share of the parallel search, None when searching alone
+        self.share = None
 
-    start_time = time.time()
-    graph_temp = graph.copy()
+    def remove(self, v):
+        """
+        Remove the vertex v from the residual graph and push it on the trail.
+        """
+        indptr, indices, alive, degree = self.indptr, self.indices, self.alive, self.degree
+        head, count, nxt, prv = self.head, self.count, self.nxt, self.prv
+        # unlink v from its bucket
+        p, q = prv[v], nxt[v]
+        if p != -1:
+            nxt[p] = q
+        else:
+            head[degree[v]] = q
+        if q != -1:
+            prv[q] = p
+        count[degree[v]] -= 1
+        alive[v] = False
+        # move every alive neighbor one bucket down
+        for k in range(indptr[v], indptr[v + 1]):
+            u = indices[k]
+            if alive[u]:
+                d = degree[u]
+                p, q = prv[u], nxt[u]
+                if p != -1:
+                    nxt[p] = q
+                else:
+                    head[d] = q
+                if q != -1:
+                    prv[q] = p
+                count[d] -= 1
+                d -= 1
+                degree[u] = d
+                q = head[d]
+                nxt[u] = q
+                prv[u] = -1
+                if q != -1:
+                    prv[q] = u
+                head[d] = u
+                count[d] += 1
+        self.edges -= degree[v]
+        self.trail.append(v)
+        for bound in self.incremental:
+            bound.remove(v)
 
-    # Set up info for the graph:
-    vertices = list(graph_temp.g.nodes)
-    n_edges = graph_temp.g.number_of_edges()
+    def undo(self, mark):
+        """
+        Restore the vertices removed after the trail mark, in LIFO order.
+        """
+        indptr, indices, alive, degree = self.indptr, self.indices, self.alive, self.degree
+        head, count, nxt, prv, trail = self.head, self.count, self.nxt, self.prv, self.trail
+        max_degree = self.max_degree
+        while len(trail) > mark:
+            v = trail.pop()
+            alive[v] = True
+            for k in range(indptr[v], indptr[v + 1]):
+                u = indices[k]
+                if alive[u]:
+                    d = degree[u]
+                    p, q = prv[u], nxt[u]
+                    if p != -1:
+                        nxt[p] = q
+                    else:
+                        head[d] = q
+                    if q != -1:
+                        prv[q] = p
+                    count[d] -= 1
+                    d += 1
+                    degree[u] = d
+                    q = head[d]
+                    nxt[u] = q
+                    prv[u] = -1
+                    if q != -1:
+                        prv[q] = u
+                    head[d] = u
+                    count[d] += 1
+                    if d > max_degree:
+                        max_degree = d
+            d = degree[v]
+            q = head[d]
+            nxt[v] = q
+            prv[v] = -1
+            if q != -1:
+                prv[q] = v
+            head[d] = v
+            count[d] += 1
+            if d > max_degree:
+                max_degree = d
+            self.edges += d
+        self.max_degree = max_degree
+
+    def mirrors(self, v):
+        """
+        The alive vertices u at distance 2 from v such that N(v) \\ N(u) is a clique.
+        """
+        indptr, indices, alive, mark_of = self.indptr, self.indices, self.alive, self.mark_of
+        self.current_mark += 1
+        in_nv = self.current_mark
+        nv = [indices[k] for k in range(indptr[v], indptr[v + 1]) if alive[indices[k]]]
+        mark_of[v] = in_nv
+        for w in nv:
+            mark_of[w] = in_nv
+        result = []
+        self.current_mark += 1
+        seen = self.current_mark
+        for w in nv:
+            for k in range(indptr[w], indptr[w + 1]):
+                u = indices[k]
+                if not alive[u] or mark_of[u] == in_nv or mark_of[u] == seen:
+                    continue
+                mark_of[u] = seen
+                # N(v) \ N(u): the neighbors of v not adjacent to u
+                adjacent = set()
+                for j in range(indptr[u], indptr[u + 1]):
+                    x = indices[j]
+                    if alive[x] and mark_of[x] == in_nv:
+                        adjacent.add(x)
+                rest = [x for x in nv if x not in adjacent]
+                if self._is_clique(rest):
+                    result.append(u)
+        return result
 
-    # Set up info for the task:
-    upper_bound = graph_temp.g.number_of_nodes()
-    best_cover = vertices
-    trace = []
+    def _is_clique(self, vertices):
+        if len(vertices) <= 1:
+            return True
+        indptr, indices, alive = self.indptr, self.indices, self.alive
+        members = set(vertices)
+        for x in vertices:
+            found = 0
+            for k in range(indptr[x], indptr[x + 1]):
+                if indices[k] in members:
+                    found += 1
+            if found < len(vertices) - 1:
+                return False
+        return True
 
-    # "renew" the recursion limit if the maximum recursion depth exceeds the recursion limit:
-    while sys.getrecursionlimit() < upper_bound:
-        sys.setrecursionlimit(upper_bound + 2)
+    def satellites(self, v):
+        """
+        The alive vertices w such that N(u) \\ N[v] = {w} for some u in N(v).
+        """
+        indptr, indices, alive, mark_of = self.indptr, self.indices, self.alive, self.mark_of
+        self.current_mark += 1
+        in_nv = self.current_mark
+        mark_of[v] = in_nv
+        nv = [indices[k] for k in range(indptr[v], indptr[v + 1]) if alive[indices[k]]]
+        for w in nv:
+            mark_of[w] = in_nv
+        result = set()
+        for u in nv:
+            outside = -1
+            for k in range(indptr[u], indptr[u + 1]):
+                w = indices[k]
+                if alive[w] and mark_of[w] != in_nv:
+                    if outside != -1:
+                        outside = -2
+                        break
+                    outside = w
+            if outside >= 0:
+                result.add(outside)
+        return list(result)
 
-    def _backtracking(cover, cover_n, subgraph, n_edge_subgraph):
+    def branching(self, v, d):
         """
-        Backtracking iteration.
-        :param cover: set
-        :param cover_n: int
-        :param subgraph: Graph
-        :param n_edge_subgraph: int
+        The mirrors and satellites to branch on along with the vertex v of degree d.
+        """
+        mirrors = self.mirrors(v) if self.use_mirrors and d <= MIRROR_MAX_DEGREE else []
+        satellites = self.satellites(v) if self.use_mirrors and not mirrors else []
+        self.stats['mirror_branches' if mirrors else 'satellite_branches' if satellites else 'plain_branches'] += 1
+        return mirrors, satellites
 
+    def exclude(self, vertices, cover):
+        """
+        Put every alive neighbor of the vertices into the cover.
         """
-        # cut-off condition:
-        if time.time() - start_time > cut_off_time:
-            return
-        # nonlocal best_cover, upper_bound
-        nonlocal best_cover, trace, upper_bound
+        indptr, indices, alive = self.indptr, self.indices, self.alive
+        for w in vertices:
+            for k in range(indptr[w], indptr[w + 1]):
+                u = indices[k]
+                if alive[u]:
+                    cover.append(u)
+                    self.remove(u)
 
+    def split(self, depth, cover=None):
         """
-        If there is only a single solution in the (sub)problem space,
-        check if it is a valid solution,
-        and if so, update the upper bound for the problem by comparing it to the current best (if necessary)
+        Fix the first depth branching decisions.
+
+        :param depth: int, the number of decisions to fix
+        :param cover: list (None by default), the vertices already put into the cover
+        :return: the subproblems as tasks (cover, None, []), in the order the sequential search visits them
         """
-        if n_edge_subgraph == 0:
-            if len(cover) < upper_bound:
-                best_cover = cover.copy()
-                upper_bound = len(best_cover)
-                # upper_bound = n_vertices
-                trace.append([time.time() - start_time, upper_bound])
-            return
+        if cover is None:
+            cover = []
+        if depth == 0 or self.edges == 0:
+            return [(cover.copy(), None, [])]
+        d = self.max_degree
+        while self.head[d] == -1:
+            d -= 1
+        self.max_degree = d
+        v = self.head[d]
+        mirrors, satellites = self.branching(v, d)
+        trail_mark, cover_mark = len(self.trail), len(cover)
+        for u in [v] + mirrors:
+            if self.alive[u]:
+                cover.append(u)
+                self.remove(u)
+        tasks = self.split(depth - 1, cover)
+        self.undo(trail_mark)
+        del cover[cover_mark:]
+        self.exclude([v] + satellites, cover)
+        tasks += self.split(depth - 1, cover)
+        self.undo(trail_mark)
+        del cover[cover_mark:]
+        return tasks
 
+    def donate(self, stack, cover):
         """
-        Otherwise, continue branching.
-        First find a subproblem to proceed next.
+        Hand the unexplored branch closest to the root over to the task queue, if any.
         """
+        for frame in stack:
+            if frame[1] == 1:
+                frame[1] = 2
+                self.share.push((cover[:frame[3]], frame[0], frame[5]))
+                self.stats['steals'] += 1
+                return
+
+    def components(self):
         """
-        Step 1: Find the vertex that has not been covered that has the most degree.
+        The connected components (vertex lists) of the non-isolated part of the residual graph.
         """
-        next_vertex = None
-        max_degree = None
-        for vertex in subgraph.g.nodes:
-            if vertex not in cover and subgraph.g.degree[vertex] > 0:
-                if max_degree is None or max_degree < subgraph.g.degree[vertex]:
-                    max_degree = subgraph.g.degree[vertex]
-                    next_vertex = vertex
+        indptr, indices, alive, head, nxt, mark_of = self.indptr, self.indices, self.alive, self.head, self.nxt, self.mark_of
+        self.current_mark += 1
+        seen = self.current_mark
+        result = []
+        for d in range(1, self.max_degree + 1):
+            s = head[d]
+            while s != -1:
+                if mark_of[s] != seen:
+                    mark_of[s] = seen
+                    component = [s]
+                    i = 0
+                    while i < len(component):
+                        x = component[i]
+                        i += 1
+                        for k in range(indptr[x], indptr[x + 1]):
+                            u = indices[k]
+                            if alive[u] and mark_of[u] != seen:
+                                mark_of[u] = seen
+                                component.append(u)
+                    result.append(component)
+                s = nxt[s]
+        return result
 
-        # Special Case: If all the vertices are included in the cover, then it is one "best trivial" answer:
-        if max_degree is None:
-            return
+    def solve_components(self, components, limit):
+        """
+        Solve every component independently, smallest first.
 
-        # Update the lower bound for the problem.
-        # If one demonstates that the subspace cannot contain the optimal solution, prune the subtree:
-        lower_bound = math.ceil(n_edge_subgraph / max_degree)
-        if cover_n + lower_bound >= upper_bound:
-            return
+        :param components: list of vertex lists
+        :param limit: int, only a total cover smaller than limit is of interest
+        :return: the union of the component covers, None if it cannot be smaller than limit
+        """
+        indptr, indices, alive = self.indptr, self.indices, self.alive
+        subgraphs = []
+        for component in sorted(components, key=len):
+            position = {v: i for i, v in enumerate(component)}
+            sub_indptr = [0]
+            sub_indices = []
+            for v in component:
+                for k in range(indptr[v], indptr[v + 1]):
+                    u = indices[k]
+                    if alive[u]:
+                        sub_indices.append(position[u])
+                sub_indptr.append(len(sub_indices))
+            edges = len(sub_indices) // 2
+            max_degree = max(sub_indptr[i + 1] - sub_indptr[i] for i in range(len(component)))
+            subgraphs.append((component, sub_indptr, sub_indices, -(-edges // max_degree)))
+        lower_rest = sum(lower for _, _, _, lower in subgraphs)
+        cover = []
+        for component, sub_indptr, sub_indices, lower in subgraphs:
+            lower_rest -= lower
+            sub_limit = limit - len(cover) - lower_rest
+            if sub_limit <= lower:
+                return None
+            if self.budget.check():
+                self.complete = False
+                return None
+            search = _Search(sub_indptr, sub_indices, [True] * len(component), self.budget, self.stats,
+                             self.bound_names, self.use_mirrors, self.use_components)
+            sub_cover = search.solve(sub_limit)
+            self.complete = self.complete and search.complete
+            if sub_cover is None:
+                return None
+            cover.extend(component[i] for i in sub_cover)
+        return cover
 
+    def solve(self, upper_bound, best_cover=None, on_improve=None, cover=None):
         """
-        Step 2: Choose a subproblem based on the chosen vertex.
+        Search for a vertex cover smaller than upper_bound.
+
+        :param upper_bound: int, the size of the incumbent
+        :param best_cover: list (None by default), the incumbent
+        :param on_improve: callable (None by default), called with every new incumbent
+        :param cover: list (None by default), the vertices already removed into the cover
+        :return: the best cover found (None if none is smaller than upper_bound)
         """
-        # Case 1: include the new vertex into the cover
-        cover.add(next_vertex)
-        n_adj = len(subgraph.g.adj[next_vertex])  # The number of adjacent nodes for next_vertex
-        adjacent_nodes = list(subgraph.g.adj[next_vertex].keys())
-        subgraph.g.remove_node(next_vertex)
-        _backtracking(cover, cover_n + 1, subgraph, n_edge_subgraph - n_adj)
+        alive, degree, head = self.alive, self.degree, self.head
+        bounds, incremental, stats, share, budget = self.bounds, self.incremental, self.stats, self.share, self.budget
+        pruned_by = stats['pruned_by']
+        steal_mask = (1 << STEAL_INTERVAL_BITS) - 1
+        if cover is None:
+            cover = []
+        # one frame per branching vertex:
+        # [vertex, next branch, trail mark, cover mark, bound marks, satellites, edges at the last component check]
+        stack = []
+        checked_edges = 2 * self.edges + 1
+        while True:
+            stats['nodes'] += 1
+            # cut-off condition (nodes can be as expensive as O(m) with the clique cover bound,
+            # the budget adapts its clock reads to the cost of the nodes):
+            if budget.expired():
+                self.complete = False
+                break
+            if share is not None:
+                # prune against the best cover of all the workers, and feed the idle ones
+                upper_bound = min(upper_bound, share.bound())
+                if not stats['nodes'] & steal_mask and share.hungry():
+                    self.donate(stack, cover)
+
+            """
+            If all the edges are covered, the cover is a solution:
+            update the upper bound for the problem if it is better than the current best.
+            Otherwise prune the subtree if a lower bound shows it cannot contain a better solution,
+            solve the components independently if the residual graph has split,
+            or branch on the vertex with the maximum degree.
+            """
+            expand = False
+            if self.edges == 0:
+                if len(cover) < upper_bound:
+                    best_cover = cover.copy()
+                    upper_bound = len(best_cover)
+                    if on_improve is not None:
+                        on_improve(best_cover)
+            else:
+                d = self.max_degree
+                while head[d] == -1:
+                    d -= 1
+                self.max_degree = d
+                next_vertex = head[d]
+                expand = True
+                lower_bound = 0
+                for bound in bounds:
+                    lower_bound = max(lower_bound, bound())
+                    if len(cover) + lower_bound >= upper_bound:
+                        pruned_by[bound.name] += 1
+                        expand = False
+                        break
+                if expand and self.use_components and 2 * self.edges <= checked_edges:
+                    checked_edges = self.edges
+                    components = self.components()
+                    if len(components) > 1:
+                        stats['component_splits'] += 1
+                        expand = False
+                        rest = self.solve_components(components, upper_bound - len(cover))
+                        if rest is not None:
+                            best_cover = cover + rest
+                            upper_bound = len(best_cover)
+                            if on_improve is not None:
+                                on_improve(best_cover)
+
+            if expand:
+                mirrors, satellites = self.branching(next_vertex, d)
+                stack.append([next_vertex, 1, len(self.trail), len(cover),
+                              [bound.mark() for bound in incremental], satellites, checked_edges])
+                # Case 1: include the vertex (and its mirrors) into the cover
+                cover.append(next_vertex)
+                self.remove(next_vertex)
+                for u in mirrors:
+                    if alive[u]:
+                        cover.append(u)
+                        self.remove(u)
+                continue
+
+            # backtrack to the deepest frame with an unexplored branch
+            while stack:
+                frame = stack[-1]
+                next_vertex, branch, trail_mark, cover_mark, bound_marks, satellites, checked_edges = frame
+                self.undo(trail_mark)
+                del cover[cover_mark:]
+                for bound, mark in zip(incremental, bound_marks):
+                    bound.undo(mark)
+                if branch == 1 and len(cover) + degree[next_vertex] < upper_bound:
+                    # Case 2: do not include the vertex (nor its satellites) into the cover,
+                    # so all of their adjacent nodes have to be included.
+                    frame[1] = 2
+                    self.exclude([next_vertex] + satellites, cover)
+                    break
+                stack.pop()
+            else:
+                break
+        return best_cover
+
+
+class _Share:
+    """
+    The state shared by the workers of the parallel search.
+
+    :param tasks: multiprocessing.Queue of the subproblems (cover, vertex, satellites) still to solve:
+        the cover is removed, then the vertex and its satellites are excluded (if vertex is not None)
+    :param results: multiprocessing.Queue of the improvements and the final statistics of the workers
+    :param upper_bound: multiprocessing.Value, the size of the best cover found so far
+    :param pending: multiprocessing.Value, the number of tasks queued or being solved
+    :param idle: multiprocessing.Value, the number of workers waiting for a task
+    """
+    def __init__(self, tasks, results, upper_bound, pending, idle):
+        self.tasks = tasks
+        self.results = results
+        self.upper_bound = upper_bound
+        self.pending = pending
+        self.idle = idle
+        # the unsynchronized views are read at every node, the lock is only taken to write
+        self.raw_bound = upper_bound.get_obj()
+        self.raw_idle = idle.get_obj()
+
+    def bound(self):
+        return self.raw_bound.value
+
+    def hungry(self):
+        return self.raw_idle.value > 0 and self.tasks.empty()
+
+    def push(self, task):
+        with self.pending.get_lock():
+            self.pending.value += 1
+        self.tasks.put(task)
+
+    def offer(self, cover):
+        with self.upper_bound.get_lock():
+            if len(cover) >= self.upper_bound.value:
+                return
+            self.upper_bound.value = len(cover)
+        self.results.put(('cover', time.perf_counter(), cover))
+
+
+def _worker(handle, alive, budget, bounds, mirrors, components, share):
+    """
+    Solve tasks from the queue until none is pending or the budget is spent,
+    then send the statistics of the worker.
+    """
+    graph = attach(handle)
+    indptr, indices = graph.indptr.tolist(), graph.indices.tolist()
+    del graph
+    stats = _new_stats(bounds)
+    search = _Search(indptr, indices, alive, budget, stats, bounds, mirrors, components)
+    search.share = share
+    bound_marks = [bound.mark() for bound in search.incremental]
+    complete = True
+    while True:
+        with share.idle.get_lock():
+            share.idle.value += 1
+        task = None
+        while task is None and not budget.check():
+            try:
+                task = share.tasks.get(timeout=0.01)
+            except queue.Empty:
+                if share.pending.value == 0:
+                    break
+        with share.idle.get_lock():
+            share.idle.value -= 1
+        if task is None:
+            break
+        cover, vertex, satellites = task
+        for u in cover:
+            search.remove(u)
+        if vertex is not None:
+            search.exclude([vertex] + satellites, cover)
+        search.solve(share.bound(), None, share.offer, cover)
+        complete = complete and search.complete
+        search.undo(0)
+        for bound, mark in zip(search.incremental, bound_marks):
+            bound.undo(mark)
+        with share.pending.get_lock():
+            share.pending.value -= 1
+    # the tasks this worker queued are either solved or abandoned once the budget is spent
+    share.tasks.cancel_join_thread()
+    share.results.put(('done', stats, complete and share.pending.value == 0))
+
+
+def _parallel_solve(graph, upper_bound, budget, stats, bounds, mirrors, components, workers):
+    """
+    Solve the subproblems of the first branching decisions in a pool of worker processes.
+
+    :return: the time-ordered list of (elapsed time, cover) improvements, and whether optimality was proven
+    """
+    indptr, indices, alive = graph.indptr.tolist(), graph.indices.tolist(), graph.alive.tolist()
+    depth = (SPLIT_FACTOR * workers - 1).bit_length()
+    splitter = _Search(indptr, indices, alive, budget, _new_stats(()), (), mirrors, components)
+    subproblems = splitter.split(depth)
+
+    # the workers attach the adjacency arrays from shared memory instead of receiving copies
+    shm, handle = publish(graph)
+    try:
+        context = mp.get_context()
+        share = _Share(context.Queue(), context.Queue(), context.Value('i', upper_bound),
+                       context.Value('i', len(subproblems)), context.Value('i', 0))
+        for task in subproblems:
+            share.tasks.put(task)
+        processes = [context.Process(target=_worker, daemon=True,
+                                     args=(handle, alive, budget, bounds, mirrors, components, share))
+                     for _ in range(workers)]
+        for process in processes:
+            process.start()
+
+        improvements = []
+        complete = True
+        done = 0
+        while done < workers:
+            try:
+                message = share.results.get(timeout=0.1)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    # a worker died without reporting
+                    complete = False
+                    break
+                continue
+            if message[0] == 'cover':
+                # perf_counter is system-wide, so the worker clock reads compare with the budget start
+                improvements.append((message[1] - budget.start, message[2]))
+            else:
+                _, worker_stats, worker_complete = message
+                _merge_stats(stats, worker_stats)
+                complete = complete and worker_complete
+                done += 1
+        for process in processes:
+            process.join()
+        share.tasks.cancel_join_thread()
+    finally:
+        shm.close()
+        shm.unlink()
+    # the workers report concurrently: keep the improvements in time order
+    improvements.sort(key=lambda improvement: improvement[0])
+    return improvements, complete
+
+
+def _new_stats(bounds):
+    return {'nodes': 0, 'pruned_by': {name: 0 for name in bounds}, 'component_splits': 0,
+            'mirror_branches': 0, 'satellite_branches': 0, 'plain_branches': 0, 'steals': 0}
+
+
+def _merge_stats(stats, other):
+    for key, value in other.items():
+        if key == 'pruned_by':
+            for name, count in value.items():
+                stats['pruned_by'][name] += count
+        else:
+            stats[key] += value
+
+
+def branch_and_bound(graph, cut_off_time=600, stats=None, bounds=DEFAULT_BOUNDS, mirrors=True, components=True,
+                     workers=1, initial_cover=None):
+    """
+    Branch and Bound Method.
+    :param graph: Graph object
+    :param cut_off_time: int (600 by default) or Budget
+    :param stats: dict (None by default), filled with the search statistics if given: the engine ('bnb'),
+        nodes, nodes/s, whether optimality was proven, how many nodes each bound pruned
+        and how many branchings used mirrors, satellites or neither, or split into components
+    :param bounds: tuple of bound names (see bounds.BOUNDS), evaluated in this order
+    :param mirrors: bool (True by default), whether to branch on mirrors and satellites
+    :param components: bool (True by default), whether to solve components independently
+    :param workers: int (1 by default), the number of processes of the parallel search
+    :param initial_cover: list of labels (None by default), a known vertex cover (e.g. from the solution store)
+        that seeds the upper bound if it is smaller than the heuristic one
+
+    :return: best_cover, trace
+    """
+
+    budget = as_budget(cut_off_time)
+    if stats is None:
+        stats = {}
+    stats.update(_new_stats(bounds))
 
-        # Case 2: do not include the new vertex into the cover
-        # Since we do not include the new vertex, all of its adjacent nodes have to be included,
-        # so all the edges linked to the new vertex can be covered.
-        cover_temp = cover.copy()
-        cover_temp.remove(next_vertex)
-        for adj_v in adjacent_nodes:
-            # adj_v is int
-            cover_temp.add(adj_v)
-        _backtracking(cover_temp, len(cover_temp), subgraph, n_edge_subgraph - n_adj)
+    # Set up info for the task, the upper bound is seeded by the constructive heuristics:
+    best_cover, _ = best_of(graph, budget)
+    # the incumbent has to be a cover, a known cover that is not one is ignored
+    if initial_cover is not None and len(initial_cover) < len(best_cover) and graph.is_cover(initial_cover):
+        best_cover = list(initial_cover)
+    best_cover = [graph.index_of(v) for v in best_cover]
+    trace = [[budget.elapsed(), len(best_cover)]]
 
-        # Finally restore the subgraph
-        subgraph.g.add_node(next_vertex)
-        for adj_v in adjacent_nodes:
-            subgraph.g.add_edge(next_vertex, adj_v)
-        cover.remove(next_vertex)
+    def on_improve(cover):
+        trace.append([budget.elapsed(), len(cover)])
 
-    cover_init = set()
-    _backtracking(cover_init, 0, graph, n_edges)
-    return best_cover, trace
+    if workers > 1:
+        improvements, complete = _parallel_solve(graph, len(best_cover), budget, stats,
+                                                 bounds, mirrors, components, workers)
+        for improve_time, cover in improvements:
+            if len(cover) < len(best_cover):
+                best_cover = cover
+                trace.append([improve_time, len(cover)])
+    else:
+        search = _Search(graph.indptr.tolist(), graph.indices.tolist(), graph.alive.tolist(),
+                         budget, stats, bounds, mirrors, components)
+        best_cover = search.solve(len(best_cover), best_cover, on_improve)
+        complete = search.complete
 
+    elapsed = budget.elapsed()
+    stats['engine'] = 'bnb'
+    stats['time'] = elapsed
+    stats['workers'] = workers
+    stats['nodes_per_second'] = stats['nodes'] / elapsed if elapsed > 0 else float('inf')
+    stats['optimal'] = complete
+    return graph.labels[best_cover].tolist(), trace
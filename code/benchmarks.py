@@ -0,0 +1,308 @@
+"""
+This file contains the benchmark suite of the solvers, with regression tracking against a saved baseline.
+
+Every algorithm of solvers.ALGORITHM_LIST and the bit-parallel BnB engine run at a fixed budget on the DATA
+instances and on a few generated graphs (seeded, so every run sees the same graphs), each benchmark in a fresh
+process so that its peak RSS is its own; only the solvers are imported (not exec.py, which pulls in pandas and
+matplotlib), and the memory is also reported as the growth of the peak RSS over its value after the imports. A
+benchmark records the load time of the graph (cold: parsing the text file, warm: from the compiled cache), the
+size and validity of the cover, the peak RSS and the throughput of the algorithm: the moves per second of the LS
+algorithms, the search nodes per second of BnB and the edges per second of the constructive heuristics (best of a
+few repeats, they take milliseconds). run_algorithm hands the small graphs of BnB to the bit-parallel engine, so
+the two engines are called directly instead, BnB as 'BnB' and the bit-parallel one as its own row 'Bitset'.
+
+A run is saved with the metadata of the machine in BENCHMARK_PATH; it is compared with the baseline
+(BASELINE_FILE, saved by -save-baseline) and the metrics worse than the baseline by more than the
+tolerance are reported as regressions (the exit status is then 1). This is not a test suite:
+the timings are only comparable on the same machine.
+
+Run from the root folder, e.g. python code/benchmarks.py -graphs karate jazz -algs LS1 BnB -budget 2
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import platform
+import resource
+import subprocess
+import multiprocessing as mp
+import numpy as np
+from graph import Graph
+from io_utils import load_graph, OUTPUT_PATH, _atomic_write
+from solvers import ALGORITHM_LIST, run_algorithm
+from BnB import branch_and_bound
+from bitset_bnb import bitset_branch_and_bound
+from verifier import verify_cover
+
+BENCHMARK_PATH = OUTPUT_PATH + 'benchmarks/'
+BASELINE_FILE = BENCHMARK_PATH + 'baseline.json'
+
+DEFAULT_GRAPHS = ['karate', 'football', 'jazz', 'email', 'delaunay_n10', 'netscience', 'power', 'gnm_2000_8000',
+                  'ba_2000_3']
+DEFAULT_BUDGET = 2  # the cutoff time in seconds of every benchmark
+DEFAULT_TOLERANCE = 0.2  # the relative change beyond which a metric is a regression
+SEED = 1  # the seed of the LS algorithms and of the generated graphs
+HEURISTIC_REPEATS = 5  # the constructive heuristics keep the best time of this many runs
+TIME_FLOOR = 0.005  # the timings are compared from this many seconds on, the shorter ones are noise
+RSS_FLOOR = 1.0  # the memory growths are compared from this many MB on, the smaller ones are noise
+
+# the metrics compared with the baseline, whether higher values are better
+METRICS = {'throughput': True, 'quality': False, 'load_cold': False, 'load_warm': False, 'peak_rss_mb': False,
+           'rss_growth_mb': False}
+# the floors below which the metrics are noise
+FLOORS = {'load_cold': TIME_FLOOR, 'load_warm': TIME_FLOOR, 'rss_growth_mb': RSS_FLOOR}
+
+LS_ALGORITHMS = ('LS1', 'LS2', 'LS3')
+# the branch and bound engines, benchmarked on every graph whatever its size
+BNB_ENGINES = {'BnB': branch_and_bound, 'Bitset': bitset_branch_and_bound}
+BENCHMARK_ALGORITHMS = list(ALGORITHM_LIST.keys()) + ['Bitset']
+
+
+def generate_graph(name):
+    """
+    Generate the graph of a name: 'gnm_<n>_<m>' is a uniform random graph of n vertices and m edges,
+    'ba_<n>_<k>' a Barabasi-Albert graph of n vertices, every new vertex attached to k existing ones
+
+    Returns
+    -------
+    g : Graph
+        The generated graph, None if the name is not a generated graph
+    """
+    kind, _, sizes = name.partition('_')
+    if kind not in ('gnm', 'ba'):
+        return None
+    n, k = map(int, sizes.split('_'))
+    rng = np.random.default_rng(SEED)
+    if kind == 'gnm':
+        keys = np.zeros(0, dtype=np.int64)
+        while len(keys) < k:
+            u, v = rng.integers(0, n, size=(2, 2 * k))
+            pairs = np.minimum(u, v) * n + np.maximum(u, v)
+            keys = np.unique(np.concatenate([keys, pairs[u != v]]))
+        keys = rng.permutation(keys)[:k]
+        return Graph.from_edges(n, keys // n, keys % n)
+    # every vertex appears once per edge end in targets, so a uniform pick in it is a pick by degree;
+    # the first new vertex is attached to the k initial ones
+    targets = []
+    src, dst = [], []
+    for v in range(k, n):
+        chosen = set(range(k)) if not targets else set()
+        while len(chosen) < k:
+            chosen.add(targets[rng.integers(len(targets))])
+        for u in sorted(chosen):
+            src.append(v)
+            dst.append(u)
+            targets.extend((u, v))
+    return Graph.from_edges(n, src, dst)
+
+
+def run_benchmark(graph_name, algorithm, budget):
+    """
+    Benchmark an algorithm on a graph, in the current process
+
+    Parameters
+    ----------
+    graph_name : str
+        The file name of the graph in DATA_PATH, or the name of a generated graph (see generate_graph)
+    algorithm : str
+        The name of the algorithm, one of BENCHMARK_ALGORITHMS
+    budget : float
+        The cutoff time in seconds
+
+    Returns
+    -------
+    result : dict
+        The graph, algorithm, num_nodes, num_edges, budget, load_cold and load_warm (in seconds, None for the
+        generated graphs), time (of the algorithm), quality (the size of the cover), valid, throughput,
+        throughput_unit, work (the moves / nodes / edges processed), peak_rss_mb and rss_growth_mb
+        (the growth of the peak RSS from the call on, i.e. without the imports)
+    """
+    import_rss = _peak_rss_mb()
+    graph = generate_graph(graph_name)
+    load_cold = load_warm = None
+    if graph is None:
+        start = time.perf_counter()
+        load_graph(graph_name, use_cache=False)
+        load_cold = time.perf_counter() - start
+        load_graph(graph_name)  # writes the cache if it is missing
+        start = time.perf_counter()
+        graph = load_graph(graph_name)
+        load_warm = time.perf_counter() - start
+    config = {'graph': graph_name, 'algorithm': algorithm, 'seed': SEED, 'cutoff_time': budget, 'workers': 1}
+    stats = {}
+    repeats = 1 if algorithm in LS_ALGORITHMS or algorithm in BNB_ENGINES else HEURISTIC_REPEATS
+    elapsed = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        if algorithm in BNB_ENGINES:
+            solution, _ = BNB_ENGINES[algorithm](graph.copy(), budget, stats)
+        else:
+            solution, _ = run_algorithm(config, graph.copy(), budget, stats=stats)
+        elapsed = min(elapsed, time.perf_counter() - start)
+    num_edges = graph.get_num_edges()
+    if algorithm in LS_ALGORITHMS:
+        work, unit = stats.get('moves', 0), 'moves/s'
+        throughput = stats.get('moves_per_second', 0.0)
+    elif algorithm in BNB_ENGINES:
+        work, unit = stats.get('nodes', 0), 'nodes/s'
+        throughput = stats.get('nodes_per_second', 0.0)
+    else:
+        work, unit = num_edges, 'edges/s'
+        throughput = num_edges / elapsed if elapsed > 0 else float('inf')
+    peak_rss = _peak_rss_mb()
+    return {'graph': graph_name, 'algorithm': algorithm, 'num_nodes': graph.get_num_nodes(), 'num_edges': num_edges,
+            'budget': budget, 'load_cold': load_cold, 'load_warm': load_warm, 'time': elapsed,
+            'quality': len(solution), 'valid': verify_cover(graph, solution)['valid'],
+            'throughput': throughput, 'throughput_unit': unit, 'work': work, 'peak_rss_mb': peak_rss,
+            'rss_growth_mb': peak_rss - import_rss}
+
+
+# the peak RSS of the current process in MB, ru_maxrss is in kilobytes on Linux and in bytes on macOS
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (2 ** 20 if sys.platform == 'darwin' else 2 ** 10)
+
+
+# run a benchmark in a worker of the pool
+def _run_benchmark(task):
+    return run_benchmark(*task)
+
+
+def machine_metadata():
+    """
+    The description of the machine and of the code a benchmark runs on
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'hostname': socket.gethostname(), 'platform': platform.platform(), 'processor': platform.processor(),
+            'cpu_count': os.cpu_count(), 'python': platform.python_version(), 'numpy': np.__version__,
+            'commit': commit, 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+def run_suite(graphs=DEFAULT_GRAPHS, algorithms=None, budget=DEFAULT_BUDGET):
+    """
+    Run the benchmarks of every algorithm on every graph, each in a fresh process, one at a time
+
+    Parameters
+    ----------
+    graphs : list (DEFAULT_GRAPHS by default)
+        The names of the graphs
+    algorithms : list (None by default)
+        The names of the algorithms, all of BENCHMARK_ALGORITHMS by default
+    budget : float (DEFAULT_BUDGET by default)
+        The cutoff time in seconds of every benchmark
+
+    Returns
+    -------
+    suite : dict
+        'machine' (see machine_metadata), 'budget' and 'results' (one dict per benchmark, see run_benchmark)
+    """
+    algorithms = algorithms or BENCHMARK_ALGORITHMS
+    tasks = [(graph_name, algorithm, budget) for graph_name in graphs for algorithm in algorithms]
+    results = []
+    # a single worker replaced after every benchmark: the benchmarks do not compete for the CPU,
+    # and the peak RSS of a benchmark is not inflated by the previous ones
+    with mp.get_context('spawn').Pool(1, maxtasksperchild=1) as pool:
+        for result in pool.imap(_run_benchmark, tasks, chunksize=1):
+            print('{graph} {algorithm}: {throughput:.4g} {throughput_unit}, cover {quality}, '
+                  '{peak_rss_mb:.1f} MB (+{rss_growth_mb:.1f} MB)'.format(**result))
+            results.append(result)
+    return {'machine': machine_metadata(), 'budget': budget, 'results': results}
+
+
+def save_suite(suite, file_path=None):
+    """
+    Save the results of a suite as JSON, in BENCHMARK_PATH under its timestamp by default
+
+    Returns
+    -------
+    file_path : str
+        The path of the saved file
+    """
+    if file_path is None:
+        file_path = BENCHMARK_PATH + suite['machine']['timestamp'].replace(':', '-') + '.json'
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    _atomic_write(file_path, json.dumps(suite, indent=1).encode())
+    return file_path
+
+
+def compare(suite, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compare the results of a suite with the baseline
+
+    Parameters
+    ----------
+    suite, baseline : dict
+        The results of run_suite
+    tolerance : float (DEFAULT_TOLERANCE by default)
+        The relative change beyond which a metric is a regression
+
+    Returns
+    -------
+    regressions : list
+        One (graph, algorithm, metric, baseline value, value, relative change) tuple per regression,
+        an invalid cover is reported as the metric 'valid'
+    """
+    reference = {(result['graph'], result['algorithm']): result for result in baseline['results']}
+    regressions = []
+    for result in suite['results']:
+        key = (result['graph'], result['algorithm'])
+        if key not in reference:
+            continue
+        if reference[key]['valid'] and not result['valid']:
+            regressions.append(key + ('valid', True, False, None))
+        for metric, higher_is_better in METRICS.items():
+            before, after = reference[key].get(metric), result.get(metric)
+            if before is None or after is None:
+                continue
+            if metric in FLOORS:
+                before, after = max(before, FLOORS[metric]), max(after, FLOORS[metric])
+            if before == 0:
+                continue
+            change = (after - before) / before
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(key + (metric, before, after, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-graphs', nargs='+', default=DEFAULT_GRAPHS, help='The graphs to benchmark')
+    parser.add_argument('-algs', nargs='+', default=None, help='The algorithms to benchmark (all by default)')
+    parser.add_argument('-budget', type=float, default=DEFAULT_BUDGET, help='The cutoff time of every benchmark')
+    parser.add_argument('-tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='The relative change beyond which a metric is a regression')
+    parser.add_argument('-baseline', type=str, default=BASELINE_FILE, help='The baseline file')
+    parser.add_argument('-save-baseline', action='store_true', help='Save the results as the new baseline')
+    args = parser.parse_args()
+    for algorithm in args.algs or []:
+        assert algorithm in BENCHMARK_ALGORITHMS, 'The algorithm {} does not exist'.format(algorithm)
+    suite = run_suite(args.graphs, args.algs, args.budget)
+    print('Results saved to', save_suite(suite))
+    if args.save_baseline:
+        save_suite(suite, args.baseline)
+        print('Baseline saved to', args.baseline)
+        return 0
+    if not os.path.exists(args.baseline):
+        print('No baseline to compare with, save one with -save-baseline')
+        return 0
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+    if baseline['machine']['hostname'] != suite['machine']['hostname']:
+        print('Warning: the baseline was measured on {}, the timings may not be comparable'
+              .format(baseline['machine']['hostname']))
+    regressions = compare(suite, baseline, args.tolerance)
+    for graph_name, algorithm, metric, before, after, change in regressions:
+        print('REGRESSION {} {} {}: {:.4g} -> {:.4g}{}'.format(graph_name, algorithm, metric, before, after,
+                                                             '' if change is None else ' ({:+.0%})'.format(change)))
+    print('{} regressions beyond {:.0%}'.format(len(regressions), args.tolerance))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
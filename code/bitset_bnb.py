@@ -0,0 +1,162 @@
+"""
+This file contains the implementation of a bit-parallel exact solver for MVC problem, for graphs
+of up to a few thousand vertices.
+
+A minimum vertex cover is the complement of a maximum independent set, i.e. of a maximum clique
+of the complement graph, which is searched by a MCQ-style Branch-and-Bound:
+- the neighborhood of every vertex is a Python big int, so restricting a candidate set to the
+  (non-)neighbors of a vertex or computing the degree of a vertex are word-wide operations;
+- the bound is a greedy coloring of the complement graph, i.e. a cover of the candidates by cliques
+  of the graph: an independent set contains at most one vertex of every clique;
+- the candidates of degree 0 or 1 in the graph they induce are taken into the independent set
+  without branching, some maximum independent set always contains them.
+"""
+from heuristics import best_of
+from budget import as_budget
+
+# exec.py runs this solver instead of BnB.branch_and_bound for graphs up to this many nodes
+BITSET_MAX_NODES = 2048
+
+
+def _bits(x):
+    """
+    The positions of the set bits of x, in increasing order.
+    """
+    positions = []
+    while x:
+        low = x & -x
+        positions.append(low.bit_length() - 1)
+        x ^= low
+    return positions
+
+
+def _take_low_degree(adj, candidates, independent):
+    """
+    Take the candidates of degree 0 or 1 into the independent set (removing the neighbor of a
+    degree-1 one from the candidates), until none is left.
+
+    :param adj: list of int, the neighborhood bitsets
+    :param candidates: int, the candidate bitset
+    :param independent: list, the independent set, extended in place
+    :return: the remaining candidates
+    """
+    changed = True
+    while changed:
+        changed = False
+        for v in _bits(candidates):
+            bit = 1 << v
+            if not candidates & bit:
+                continue
+            neighbors = adj[v] & candidates
+            if neighbors & (neighbors - 1) == 0:
+                independent.append(v)
+                candidates &= ~(bit | neighbors)
+                changed = True
+    return candidates
+
+
+def _color(adj, candidates):
+    """
+    Greedy coloring of the complement graph on the candidates: every color class is a clique of the graph.
+
+    :param adj: list of int, the neighborhood bitsets
+    :param candidates: int, the candidate bitset
+    :return: the candidates in coloring order and their colors (non-decreasing)
+    """
+    order, colors = [], []
+    uncolored = candidates
+    color = 0
+    while uncolored:
+        color += 1
+        clique = uncolored
+        while clique:
+            low = clique & -clique
+            v = low.bit_length() - 1
+            uncolored ^= low
+            clique &= adj[v]
+            order.append(v)
+            colors.append(color)
+    return order, colors
+
+
+def bitset_branch_and_bound(graph, cut_off_time=600, stats=None, initial_cover=None):
+    """
+    Bit-parallel Branch and Bound Method.
+    :param graph: Graph object
+    :param cut_off_time: int (600 by default) or Budget
+    :param stats: dict (None by default), filled with the search statistics if given:
+        the engine ('bitset'), nodes, nodes/s and whether optimality was proven
+    :param initial_cover: list of labels (None by default), a known vertex cover (e.g. from the solution store)
+        that seeds the incumbent if it is smaller than the heuristic one
+
+    :return: best_cover, trace
+    """
+
+    budget = as_budget(cut_off_time)
+    if stats is None:
+        stats = {}
+
+    # Set up info for the task, the incumbent is seeded by the constructive heuristics:
+    best_cover, _ = best_of(graph, budget)
+    # the incumbent has to be a cover, a known cover that is not one is ignored
+    if initial_cover is not None and len(initial_cover) < len(best_cover) and graph.is_cover(initial_cover):
+        best_cover = list(initial_cover)
+    trace = [[budget.elapsed(), len(best_cover)]]
+
+    # bit i stands for the i-th alive vertex by increasing degree, the coloring visits them in this order
+    vertices = sorted((v for v in range(len(graph.alive)) if graph.alive[v]), key=lambda v: graph.degree[v])
+    position = {v: i for i, v in enumerate(vertices)}
+    adj = [sum(1 << position[u] for u in graph.neighbors(v) if graph.alive[u]) for v in vertices]
+    num_vertices = len(vertices)
+    best_size = num_vertices - len(best_cover)
+    best_independent = None
+
+    nodes = 0
+    complete = True
+    independent = []
+    candidates = _take_low_degree(adj, (1 << num_vertices) - 1, independent)
+    order, colors = _color(adj, candidates)
+    # one frame per node: [candidates not branched on yet, coloring order, colors, next index, independent set size]
+    stack = [[candidates, order, colors, len(order) - 1, len(independent)]]
+    if len(independent) > best_size:
+        best_size, best_independent = len(independent), independent.copy()
+        trace.append([budget.elapsed(), num_vertices - best_size])
+    while stack:
+        nodes += 1
+        if budget.expired():
+            complete = False
+            break
+        frame = stack[-1]
+        candidates, order, colors, i, size = frame
+        # the vertices order[:i + 1] can be covered by colors[i] cliques
+        if i < 0 or size + colors[i] <= best_size:
+            stack.pop()
+            continue
+        v = order[i]
+        frame[0] = candidates & ~(1 << v)
+        frame[3] = i - 1
+
+        # branch: v joins the independent set, its neighbors leave the candidates
+        del independent[size:]
+        independent.append(v)
+        child = _take_low_degree(adj, frame[0] & ~adj[v], independent)
+        if not child:
+            if len(independent) > best_size:
+                best_size, best_independent = len(independent), independent.copy()
+                trace.append([budget.elapsed(), num_vertices - best_size])
+            continue
+        child_order, child_colors = _color(adj, child)
+        if len(independent) + child_colors[-1] > best_size:
+            stack.append([child, child_order, child_colors, len(child_order) - 1, len(independent)])
+
+    if best_independent is not None:
+        excluded = {vertices[i] for i in best_independent}
+        best_cover = graph.labels[[v for v in vertices if v not in excluded]].tolist()
+
+    elapsed = budget.elapsed()
+    stats['engine'] = 'bitset'
+    stats['nodes'] = nodes
+    stats['time'] = elapsed
+    stats['nodes_per_second'] = nodes / elapsed if elapsed > 0 else float('inf')
+    stats['optimal'] = complete
+    return best_cover, trace
@@ -0,0 +1,128 @@
+"""
+This file contains the lower bounds used by the Branch-and-Bound (BnB) to prune the search tree.
+Every bound is a class constructed with the search engine, whose residual graph state it reads
+(degree, bucket heads and sizes, number of residual edges), and called without arguments to get
+a lower bound on the size of a vertex cover of the residual graph. The BnB evaluates them in the
+order given, cheapest first, and stops at the first one that prunes.
+
+Bounds that maintain their own incremental state (the matching bound) also implement
+remove(v), mark() and undo(mark), which the engine calls along with its own trail.
+"""
+
+from matching import MatchingBound
+
+
+class DegreeBound:
+    """
+    ceil(m / max degree): every vertex of the cover covers at most max degree edges. O(1).
+    """
+    name = 'degree'
+    incremental = False
+
+    def __init__(self, search):
+        self.search = search
+
+    def __call__(self):
+        search = self.search
+        return -(-search.edges // search.max_degree)
+
+
+class DegreeSequenceBound:
+    """
+    The smallest k such that the k largest degrees sum up to at least m. O(max degree).
+    """
+    name = 'degree_sequence'
+    incremental = False
+
+    def __init__(self, search):
+        self.search = search
+
+    def __call__(self):
+        search = self.search
+        count = search.count
+        need = search.edges
+        k = 0
+        for d in range(search.max_degree, 0, -1):
+            c = count[d]
+            if c * d >= need:
+                return k - (-need // d)
+            need -= c * d
+            k += c
+        return k
+
+
+class MatchingLowerBound:
+    """
+    ceil(|M| / 2) for a matching M of the bipartite double cover, i.e. the LP relaxation bound,
+    maintained incrementally by matching.MatchingBound. O(1) amortized per removal.
+    """
+    name = 'matching'
+    incremental = True
+
+    def __init__(self, search):
+        self.matching = MatchingBound(search.indptr, search.indices, search.alive)
+        self.remove = self.matching.remove
+        self.mark = self.matching.mark
+        self.undo = self.matching.undo
+
+    def __call__(self):
+        return self.matching.bound()
+
+
+class CliqueCoverBound:
+    """
+    n' - k for a greedy cover of the n' non-isolated vertices by k cliques: a vertex cover
+    contains all but at most one vertex of every clique. O(m).
+
+    Vertices are taken in increasing degree order and each joins the largest clique all of whose
+    members are among its neighbors, or starts a new clique.
+    """
+    name = 'clique_cover'
+    incremental = False
+
+    def __init__(self, search):
+        self.search = search
+        n = len(search.alive)
+        self.clique_of = [0] * n
+        self.stamp = [0] * n
+        self.current = 0
+
+    def __call__(self):
+        search = self.search
+        indptr, indices, alive, head, nxt = search.indptr, search.indices, search.alive, search.head, search.nxt
+        clique_of, stamp = self.clique_of, self.stamp
+        self.current += 1
+        current = self.current
+        sizes = []
+        hits = []
+        num_vertices = 0
+        for d in range(1, search.max_degree + 1):
+            v = head[d]
+            while v != -1:
+                num_vertices += 1
+                touched = []
+                for k in range(indptr[v], indptr[v + 1]):
+                    u = indices[k]
+                    if alive[u] and stamp[u] == current:
+                        c = clique_of[u]
+                        if not hits[c]:
+                            touched.append(c)
+                        hits[c] += 1
+                best = -1
+                for c in touched:
+                    if hits[c] == sizes[c] and (best == -1 or sizes[c] > sizes[best]):
+                        best = c
+                    hits[c] = 0
+                if best == -1:
+                    best = len(sizes)
+                    sizes.append(0)
+                    hits.append(0)
+                sizes[best] += 1
+                clique_of[v] = best
+                stamp[v] = current
+                v = nxt[v]
+        return num_vertices - len(sizes)
+
+
+BOUNDS = {bound.name: bound for bound in (DegreeBound, DegreeSequenceBound, MatchingLowerBound, CliqueCoverBound)}
+DEFAULT_BOUNDS = ('degree', 'degree_sequence', 'matching', 'clique_cover')
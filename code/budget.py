@@ -0,0 +1,101 @@
+"""
+This file contains the time budget shared by the solvers.
+
+A Budget starts its clock when it is created and reads time.perf_counter(), which is monotonic,
+so the trace timestamps (budget.elapsed()) never go backwards. The hot loops of the solvers call
+budget.expired() once per iteration: it only reads the clock every `interval` calls, and the
+interval adapts so that the clock is read about every CHECK_PERIOD seconds whatever an iteration
+costs. A run can also be cancelled cooperatively, by budget.cancel() or by setting the event
+(threading.Event or multiprocessing.Event) given to the budget from another thread or process.
+
+Every solver takes its cutoff time either as a number of seconds or as a Budget (see as_budget),
+so a caller can share one budget and its cancel flag across several solvers.
+"""
+import time
+
+CHECK_PERIOD = 0.001  # the target time in seconds between two reads of the clock
+MAX_CHECK_INTERVAL = 64  # the maximum number of calls of expired() between two reads of the clock
+
+
+class Budget:
+    """
+    The time budget of a run.
+
+    Parameters
+    ----------
+    cutoff_time : float
+        The budget in seconds
+    cancel : threading.Event or multiprocessing.Event (None by default)
+        An event to cancel the run from another thread or process
+    """
+    def __init__(self, cutoff_time, cancel=None):
+        self.cutoff_time = cutoff_time
+        self.cancel_event = cancel
+        self.start = time.perf_counter()
+        self.deadline = self.start + cutoff_time
+        self.done = False
+        # calls of expired() between two reads of the clock, and calls left until the next read
+        self.interval = 1
+        self.countdown = 1
+        self.last_check = self.start
+
+    def elapsed(self):
+        """
+        The time in seconds since the budget started
+        """
+        return time.perf_counter() - self.start
+
+    def remaining(self):
+        """
+        The time in seconds left in the budget
+        """
+        return max(0.0, self.deadline - time.perf_counter())
+
+    def expired(self):
+        """
+        Whether the budget is spent or the run cancelled, amortized: the clock is only read every interval calls
+        """
+        self.countdown -= 1
+        if self.countdown > 0:
+            return False
+        if self.check():
+            return True
+        # adapt the interval to the cost of the calls since the last read: grow it at most twofold
+        # so a sudden slow call is not repeated too often, shrink it at once if the calls got slower
+        now = time.perf_counter()
+        spent = now - self.last_check
+        if spent <= 0:
+            interval = self.interval * 2
+        else:
+            interval = int(self.interval * CHECK_PERIOD / spent)
+        self.interval = max(1, min(interval, self.interval * 2, MAX_CHECK_INTERVAL))
+        self.countdown = self.interval
+        self.last_check = now
+        return False
+
+    def check(self):
+        """
+        Whether the budget is spent or the run cancelled, reading the clock
+        """
+        if self.done:
+            return True
+        if time.perf_counter() >= self.deadline or (self.cancel_event is not None and self.cancel_event.is_set()):
+            self.done = True
+        return self.done
+
+    def cancel(self):
+        """
+        Cancel the run: set the cancel event (if any), so that every process sharing it stops
+        """
+        self.done = True
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+
+
+def as_budget(cutoff_time):
+    """
+    The budget of a run given as a number of seconds or as a Budget (which is returned as is)
+    """
+    if isinstance(cutoff_time, Budget):
+        return cutoff_time
+    return Budget(cutoff_time)
@@ -0,0 +1,192 @@
+"""
+This file contains the connected-component decomposition stage applied to the graph before a solver runs.
+
+A minimum vertex cover of a graph is the union of minimum vertex covers of its connected components,
+so every component (found by a linear-time BFS) is solved on its own: the tiny ones by the exact
+bit-parallel Branch-and-Bound, the others by the configured solver, either in turn or across a pool of
+processes. The cutoff time is split across the components in proportion to their number of edges,
+and the time a component leaves unused (e.g. an exact solver proving optimality early) goes to the
+components solved after it.
+
+A greedy cover of the whole graph (the matching 2-approximation) is computed first, so that the combined
+trace only records complete covers: a component counts with its greedy cover until its solver improves it.
+"""
+
+import time
+import multiprocessing as mp
+import numpy as np
+from graph import Graph
+from budget import Budget, as_budget
+from heuristics import matching_approx
+from bitset_bnb import bitset_branch_and_bound
+
+EXACT_MAX_NODES = 100  # the components of at most this many vertices are solved exactly
+
+
+def connected_components(graph):
+    """
+    The connected components of the alive non-isolated vertices, by BFS in O(n + m)
+
+    Parameters
+    ----------
+    graph : Graph
+        The graph object of the predefined Graph class
+
+    Returns
+    -------
+    component : np.ndarray (n,)
+        The component of every vertex, -1 for the deleted and isolated vertices
+    count : int
+        The number of components
+    """
+    indptr, indices = graph.indptr.tolist(), graph.indices.tolist()
+    alive, degree = graph.alive.tolist(), graph.degree.tolist()
+    component = [-1] * len(alive)
+    count = 0
+    for s in range(len(alive)):
+        if component[s] != -1 or not alive[s] or degree[s] == 0:
+            continue
+        component[s] = count
+        queue = [s]
+        for v in queue:
+            for k in range(indptr[v], indptr[v + 1]):
+                u = indices[k]
+                if component[u] == -1 and alive[u]:
+                    component[u] = count
+                    queue.append(u)
+        count += 1
+    return np.array(component, dtype=np.int64), count
+
+
+def split_components(graph):
+    """
+    Split the graph into the induced subgraphs of its connected components
+
+    Parameters
+    ----------
+    graph : Graph
+        The graph object of the predefined Graph class
+
+    Returns
+    -------
+    subgraphs : list
+        The components as Graph objects, whose labels are the labels of their vertices in the graph
+    """
+    component, count = connected_components(graph)
+    # the vertices grouped by component, and the position of every vertex in its component
+    vertices = np.argsort(component, kind='stable')
+    vertices = vertices[component[vertices] >= 0]
+    vertex_bounds = np.searchsorted(component[vertices], np.arange(count + 1))
+    position = np.zeros(len(component), dtype=np.int64)
+    position[vertices] = np.arange(len(vertices)) - np.repeat(vertex_bounds[:-1], np.diff(vertex_bounds))
+    # the edges grouped by component
+    src, dst = graph.get_edge_arrays()
+    order = np.argsort(component[src], kind='stable')
+    src, dst = src[order], dst[order]
+    edge_bounds = np.searchsorted(component[src], np.arange(count + 1))
+    subgraphs = []
+    for c in range(count):
+        nodes = vertices[vertex_bounds[c]:vertex_bounds[c + 1]]
+        edges = slice(edge_bounds[c], edge_bounds[c + 1])
+        subgraphs.append(Graph.from_edges(len(nodes), position[src[edges]], position[dst[edges]],
+                                          graph.labels[nodes]))
+    return subgraphs
+
+
+def solve_components(graph, solver, cutoff_time, processes=1, exact_max_nodes=EXACT_MAX_NODES):
+    """
+    Solve every connected component of the graph independently and combine the covers
+
+    Parameters
+    ----------
+    graph : Graph
+        The graph object of the predefined Graph class
+    solver : callable
+        solver(graph, budget) returns the (solution, trace) of a component; it has to be picklable
+        (e.g. a functools.partial of a module-level function) when processes > 1
+    cutoff_time : float or Budget
+        The cutoff time in seconds, or the budget, of the whole graph
+    processes : int (1 by default)
+        The number of processes solving the components
+    exact_max_nodes : int (EXACT_MAX_NODES by default)
+        The components of at most this many vertices are solved by bitset_branch_and_bound
+
+    Returns
+    -------
+    solution : list
+        The union of the covers of the components
+    trace : list
+        The trace of the combined cover
+    """
+    budget = as_budget(cutoff_time)
+    subgraphs = split_components(graph)
+    if len(subgraphs) <= 1:
+        return solver(graph, budget)
+    # the tiny components first, they are the cheapest and their leftover time goes to the others
+    subgraphs.sort(key=lambda g: (g.get_num_nodes() > exact_max_nodes, g.get_num_edges()))
+    greedy, _ = matching_approx(graph, budget)
+    greedy = set(greedy)
+    covers = [[v for v in g.labels.tolist() if v in greedy] for g in subgraphs]
+    current = [len(cover) for cover in covers]
+    events = [(budget.elapsed(), -1, 0)]
+    jobs = [(bitset_branch_and_bound if g.get_num_nodes() <= exact_max_nodes else solver, g)
+            for g in subgraphs]
+    sizes = [max(1, g.get_num_edges()) for g in subgraphs]
+    if processes <= 1:
+        results = _solve_in_turn(jobs, sizes, budget)
+    else:
+        num_exact = sum(g.get_num_nodes() <= exact_max_nodes for g in subgraphs)
+        results = _solve_in_pool(jobs, sizes, budget, processes, num_exact)
+    for c, solution, trace in results:
+        solution = list(solution)
+        # a solver stopped before its first cover (e.g. for lack of time) returns a partial one, which is
+        # rejected together with its trace: the component keeps its greedy cover
+        if len(solution) < len(covers[c]) and subgraphs[c].is_cover(solution):
+            covers[c] = solution
+            events.extend((t, c, size) for t, size in trace)
+    # the combined trace: every component counts with its best cover so far, the greedy one at first
+    total = sum(current)
+    trace = []
+    for t, c, size in sorted(events):
+        if c >= 0 and size < current[c]:
+            total -= current[c] - size
+            current[c] = size
+        if not trace or total < trace[-1][1]:
+            trace.append([t, total])
+    return [v for cover in covers for v in cover], trace
+
+
+# solve the first count components (all by default) one after the other, every one with its share of the time
+# left, which includes the time the previous ones left unused
+def _solve_in_turn(jobs, sizes, budget, count=None):
+    results = []
+    size_left = sum(sizes)
+    for c, (algorithm, subgraph) in enumerate(jobs[:count]):
+        share = budget.remaining() * sizes[c] / size_left
+        size_left -= sizes[c]
+        results.append(_solve_component((c, algorithm, subgraph, share, budget.start, budget.deadline)))
+    return results
+
+
+# solve the components across a pool of processes, every one with its share of the processes' time; the first
+# num_exact (tiny) components are solved exactly in this process beforehand, so the time they leave unused is
+# split among the others
+def _solve_in_pool(jobs, sizes, budget, processes, num_exact=0):
+    results = _solve_in_turn(jobs, sizes, budget, num_exact)
+    total = sum(sizes[num_exact:])
+    tasks = [(c, algorithm, subgraph, budget.remaining() * processes * sizes[c] / total,
+              budget.start, budget.deadline) for c, (algorithm, subgraph) in enumerate(jobs) if c >= num_exact]
+    if tasks:
+        with mp.get_context().Pool(min(processes, len(tasks))) as pool:
+            results.extend(pool.imap_unordered(_solve_component, tasks))
+    return results
+
+
+# solve a component within its share of the time and before the deadline of the whole graph;
+# the trace is shifted to the clock of the whole graph (time.perf_counter is system-wide)
+def _solve_component(task):
+    c, algorithm, subgraph, share, start, deadline = task
+    component_budget = Budget(max(0.0, min(share, deadline - time.perf_counter())))
+    solution, trace = algorithm(subgraph, component_budget)
+    offset = component_budget.start - start
+    return c, solution, [(offset + t, size) for t, size in trace]
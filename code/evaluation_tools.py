@@ -5,55 +5,74 @@ This file contains some support functions for evaluation, i.e.,
 - plotting the Solution Quality Distributions for various run-times (SQDs);
 - box plotting for running time comparison.
 """
+import os
 import numpy as np
 import pandas as pd
 from pandas import DataFrame as df
 from matplotlib import pyplot as plt
-from io_utils import load_graph, load_solution, load_trace, get_graph_files, get_solution_files
+from io_utils import load_solution, load_trace, get_graph_files, OUTPUT_PATH
+from verifier import verify_files
 
 PLOTS_PATH = './plots/'
 ALGORITHM_NAME_LIST = {'Approx', 'BnB', 'LS1', 'LS2'}
 OPT_SOL = {'jazz': 158, 'karate': 14, 'football': 94, 'as-22july06': 3303, 'hep-th': 3926, 'star': 6902,\
             'star2': 4542, 'netscience': 899, 'email': 594, 'delaunay_n10': 703, 'power': 2203, 'dummy1': 2, 'dummy2': 3}
 T0_P_LIST = [50, 200, 400]
+# the trace tensors of load_trace_tensor: key -> (modification times of the trace files, (times, errors))
+_TRACE_TENSORS = {}
+
+# Function to get the time at which a trace reaches the optimum
+def time_to_optimal(graph, trace):
+    """
+    Get the time at which the trace first reaches the optimal solution quality of the graph
+
+    Parameters
+    ----------
+    graph : str
+        The graph name, a key of OPT_SOL
+    trace : list
+        The trace of the run, [time, quality] pairs
+
+    Returns
+    -------
+    time : float
+        The time to the optimum, None if the trace never reaches it or the optimum is unknown
+    """
+    if graph not in OPT_SOL:
+        return None
+    for time, quality in trace:
+        if quality <= OPT_SOL[graph]:
+            return time
+    return None
 
 # Function to verify the goodness of solution
-def verify_solutions():
+def verify_solutions(processes=None):
     """
-    Verify the solutions generated by the algorithms
+    Verify the solutions generated by the algorithms (see verifier.verify_files)
+
+    Parameters
+    ----------
+    processes : int (None by default)
+        The number of processes, os.cpu_count() by default
+
+    Returns
+    -------
+    results : list
+        The verification result of every solution file
 
     """
-    qualified = True
-    solution_files = get_solution_files()
-    for solution_file in solution_files:
-        if 'delaunay_n10' in solution_file:
-            graph_name0, graph_name1, algorithm, cutoff_time, seed = solution_file.split('_')
-            graph_name = graph_name0 + '_' + graph_name1
-        else:
-            graph_name, algorithm, cutoff_time, seed = solution_file.split('_')
-        graph = load_graph(graph_name)
-        num_sol, solution = load_solution(solution_file)
+    results = verify_files(processes=processes)
+    for result in results:
         print('=========================================')
-        print('Graph: {}, Algorithm: {}, Seed: {}, Cutoff: {}' 
-            .format(graph_name, algorithm, seed, cutoff_time))
-        if len(solution) != num_sol:
-            print('The number of vertices ({}) in the solution does not match the number of solution ({})!'
-                .format(num_sol, len(solution)))
-            qualified = False
-            continue
-        if not set(solution).issubset(set(graph.get_vertices_set())): 
-            print('The solution contains vertices that are not in the graph!')
-            qualified = False
-            continue
-        for edge in graph.get_edges_set():
-            if (edge[0] not in solution) and (edge[1] not in solution):
-                print('Edge {} is not covered by the solution!'.format(edge))
-                qualified = False
-                break
-        if qualified:
+        print('Graph: {}, Algorithm: {}, Seed: {}, Cutoff: {}'
+            .format(result['graph'], result['algorithm'], result['seed'], result['cutoff_time']))
+        if result['valid']:
             print('The solution is qualified!')
-    if qualified:
+        else:
+            print(result['error'] + '!')
+    if all(result['valid'] for result in results):
         print('All the solutions are qualified!')
+    return results
 
 def get_results_table():
     """
@@ -88,6 +107,91 @@ def get_results_table():
         df_list[algorithm] = df_results
     return df_list
 
+def load_trace_tensor(graph, algorithm, cutoff_time=600, seeds=range(1, 11)):
+    """
+    Load the traces of the runs of an algorithm on a graph as a padded runs x events tensor, cached in
+    _TRACE_TENSORS (a cached tensor is reloaded if one of its trace files changed)
+
+    Parameters
+    ----------
+    graph : str
+        The graph name, a key of OPT_SOL
+    algorithm : str
+        The algorithm name
+    cutoff_time : int (600 by default)
+        The cutoff time of the runs
+    seeds : iterable (1..10 by default)
+        The seeds of the runs, the missing runs are skipped
+
+    Returns
+    -------
+    times : np.ndarray (runs, events)
+        The times of the events of every run, padded with inf
+    errors : np.ndarray (runs, events)
+        The relative error (%) of the best solution found by every event (the cumulative minimum
+        of the trace), padded with the final error of the run
+    """
+    file_names = [graph + '_' + algorithm + '_' + str(cutoff_time) + '_' + str(seed) for seed in seeds]
+    paths = [OUTPUT_PATH + file_name + '.trace' for file_name in file_names]
+    stamps = tuple(os.stat(path).st_mtime_ns if os.path.exists(path) else None for path in paths)
+    key = (graph, algorithm, cutoff_time, tuple(file_names))
+    if key in _TRACE_TENSORS and _TRACE_TENSORS[key][0] == stamps:
+        return _TRACE_TENSORS[key][1]
+    traces = [load_trace(file_name).reshape(-1, 2) for file_name, stamp in zip(file_names, stamps)
+              if stamp is not None]
+    num_events = max((len(trace) for trace in traces), default=0)
+    times = np.full((len(traces), num_events), np.inf)
+    errors = np.full((len(traces), num_events), np.inf)
+    for r, trace in enumerate(traces):
+        times[r, :len(trace)] = trace[:, 0]
+        errors[r, :len(trace)] = (trace[:, 1] - OPT_SOL[graph]) / OPT_SOL[graph] * 100
+        errors[r, len(trace):] = errors[r, len(trace) - 1] if len(trace) else np.inf
+    # the best error so far at every event; the events are sorted by time, as they are written
+    np.minimum.accumulate(errors, axis=1, out=errors)
+    _TRACE_TENSORS[key] = (stamps, (times, errors))
+    return times, errors
+
+def get_P_grid(graph, algorithm, q_stars, time_steps, cutoff_time=600, seeds=range(1, 11)):
+    """
+    Calculate the probability that a run reaches a relative error <= q* within a runtime <= t,
+    for every (q*, t) pair of the grid at once
+
+    Parameters
+    ----------
+    graph : str
+        The graph name, a key of OPT_SOL
+    algorithm : str
+        The algorithm name
+    q_stars : array-like
+        The relative solution quality thresholds (%)
+    time_steps : array-like
+        The runtime thresholds (s)
+    cutoff_time : int (600 by default)
+        The cutoff time of the runs
+    seeds : iterable (1..10 by default)
+        The seeds of the runs, the probabilities are over all of them (a missing run never solves)
+
+    Returns
+    -------
+    P : np.ndarray (len(q_stars), len(time_steps))
+        P[i, j] is the probability that a run reaches the quality q_stars[i] within time_steps[j]
+    """
+    seeds = list(seeds)
+    times, errors = load_trace_tensor(graph, algorithm, cutoff_time, seeds)
+    q_stars = np.asarray(q_stars, dtype=float)
+    time_steps = np.asarray(time_steps, dtype=float)
+    # best[r, j]: the best error of run r by time_steps[j], inf before its first event
+    best = np.full((len(times), len(time_steps)), np.inf)
+    for r in range(len(times)):
+        last = np.searchsorted(times[r], time_steps, side='right') - 1
+        best[r, last >= 0] = errors[r, last[last >= 0]]
+    # count the runs within every threshold: the sorted best errors of every time step, searched by q*
+    best.sort(axis=0)
+    counts = np.empty((len(q_stars), len(time_steps)), dtype=np.int64)
+    for j in range(len(time_steps)):
+        counts[:, j] = np.searchsorted(best[:, j], q_stars, side='right')
+    return counts / len(seeds)
+
 def get_Ps(graph, algorithm, RT_leq, SQ_leq):
     """
     Calculate the probability that the solution quality is less than or equal to SQ_leq
@@ -110,17 +214,7 @@ def get_Ps(graph, algorithm, RT_leq, SQ_leq):
         and the runtime is less than or equal to RT_leq
 
     """
-    count = 0
-    for seed in range(1, 11):
-        file_name = graph + '_' + algorithm + '_' \
-                + str(600) + '_' + str(seed)
-        trace = load_trace(file_name)
-        if trace is None:
-            continue
-        time_q = np.array([np.array([record[0], (record[1] - OPT_SOL[graph]) / OPT_SOL[graph] * 100]) for record in trace])
-        # print(time_q)
-        count += np.logical_and(time_q[:, 0] <= RT_leq, time_q[:, 1] <= SQ_leq).any()
-    return count / 10
+    return float(get_P_grid(graph, algorithm, [SQ_leq], [RT_leq])[0, 0])
 
 
 def QRTD_plot(graph, algorithm, q_stars = list(range(10)), time_steps = list(range(10))):
@@ -134,10 +228,10 @@ def QRTD_plot(graph, algorithm, q_stars = list(range(10)), time_steps = list(ran
         The algorithm name
 
     """
+    P = get_P_grid(graph, algorithm, q_stars, time_steps)
     plt.figure()
-    for q_star in q_stars:
-        Ps = [get_Ps(graph, algorithm, RT_leq, q_star) for RT_leq in time_steps]
-        plt.plot(time_steps, Ps, label='q* = {}%'.format(q_star))
+    for i, q_star in enumerate(q_stars):
+        plt.plot(time_steps, P[i], label='q* = {}%'.format(q_star))
     plt.grid(color='0.95', linestyle='-')
     plt.xlabel('Runtime (s)')
     plt.ylabel('P(solve)')
@@ -157,10 +251,10 @@ def SQD_plot(graph, algorithm, q_stars = list(range(10)), time_steps = list(rang
         The algorithm name
     """
     # time_steps = list(range(start_time, end_time, ceil(end_time/num_time)))
+    P = get_P_grid(graph, algorithm, q_stars, time_steps)
     plt.figure()
-    for RT_leq in time_steps:
-        Ps = [get_Ps(graph, algorithm, RT_leq, q_star) for q_star in q_stars]
-        plt.plot(q_stars, Ps, label='RT = {}s'.format(RT_leq))
+    for j, RT_leq in enumerate(time_steps):
+        plt.plot(q_stars, P[:, j], label='RT = {}s'.format(RT_leq))
     plt.grid(color='0.95', linestyle='-')
     plt.xlabel('Relative solution Quality (%)')
     plt.ylabel('P(solve)')
@@ -1,71 +1,218 @@
 """
 This file contains functions to conduct the experiments, which can:
 - parse the command line arguments and executes the corresponding experiments (one-time test);
-- automatically run the experiments for all the algorithms and all the graphs (concrete results for project report).
+- automatically run the experiments for all the algorithms and all the graphs (concrete results for project report),
+  across a pool of processes (see scheduler.py), resuming where an interrupted run stopped.
 """
 
 import argparse
 import os
-from heuristics import heuristic
-from BnB import branch_and_bound
-from local_search_1 import local_search_1
-from local_search_2 import local_search_2
-from io_utils import load_graph, write_output, get_graph_files
-from evaluation_tools import verify_solutions
+from functools import partial
+from solvers import ALGORITHM_LIST, run_algorithm
+from io_utils import load_graph, write_output, write_trace, get_graph_files, get_output_paths, OUTPUT_PATH
+from race import race, RACE_ALGORITHMS
+from matching import lp_kernel
+from scheduler import run_jobs
+from reductions import reduce_graph
+from components import solve_components
+from solution_store import SolutionStore
+from results_store import ResultsStore
+from verifier import verify_cover
+from evaluation_tools import time_to_optimal, OPT_SOL
 
 
-ALGORITHM_LIST = {'Approx': heuristic, 'BnB': branch_and_bound, 'LS1': local_search_1, 'LS2': local_search_2}
-
-def get_algorithm_list():
-    return ALGORITHM_LIST
+T0_P_OUTPUT_PATH = './output/Exp_T0_P/'
+RACE_STAGNATION = 0.1  # the default stagnation budget of a race, as a fraction of the cutoff time
+# the algorithms of the EXP1 experiments by default: deliberately the four algorithms of the report rather than
+# all of solvers.ALGORITHM_LIST, so that the grid (and its resumed runs) stays the one of the report;
+# the other algorithms are opted in with the algorithms argument of run_experiments
+EXP1_ALGORITHMS = ['Approx', 'BnB', 'LS1', 'LS2']
 
 # run single experiment with the given configuration
-def single_round_experiment(config, T0_P = None):
+def single_round_experiment(config, T0_P = None, graph = None):
     """
     Run single experiment with the given configuration and write the results to the output files (solution and trace)
 
     Parameters
     ----------
     config : dict
-        The configuration of the experiment
+        The configuration of the experiment, with config['reduce'] the graph is kernelized before
+        the algorithm runs and the solution is lifted back to the original graph,
+        config['workers'] is the number of processes of the parallel BnB; a sequential BnB on a graph
+        of at most BITSET_MAX_NODES nodes runs the bit-parallel solver instead;
+        config['replicas'] is the number of replicas of the replica exchange mode of LS1;
+        with config['components'] every connected component is solved independently (see components.py),
+        in config['workers'] processes; with config['warm'] the algorithm starts from the best known cover
+        of the graph in the solution store (see solution_store.py), which every run updates;
+        with config['store'] the run goes to the results store (see results_store.py) instead of the output files
+    T0_P : int (None by default)
+        The T0_P of LS1, the results go to T0_P_OUTPUT_PATH if given
+    graph : Graph (None by default)
+        The graph of the experiment if already loaded, it is loaded from config['graph'] otherwise
     """
     print('=========================================')
     print('Graph: {}, Algorithm: {}, Seed: {}, Cutoff: {}'\
         .format(config['graph'], config['algorithm'], config['seed'], config['cutoff_time']))
-    graph = load_graph(config['graph'])
-    algorithm = ALGORITHM_LIST[config['algorithm']]
-    if algorithm in {ALGORITHM_LIST['Approx'], ALGORITHM_LIST['BnB']}:
-        solution, trace = algorithm(graph, config['cutoff_time'])
-    if algorithm == ALGORITHM_LIST['LS1']:
-        solution, trace = algorithm(graph, config['seed'], config['cutoff_time'], T0_P)
-    if algorithm == ALGORITHM_LIST['LS2']:
-        solution, trace = algorithm(graph, config['seed'], config['cutoff_time'])
-    if T0_P:
-        write_output(config, solution, trace, OUTPUT_PATH='./output/Exp_T0_P/', T0_P=T0_P)
+    if graph is None:
+        graph = load_graph(config['graph'])
+    original = graph
+    reduction = None
+    if config.get('reduce'):
+        reduction = reduce_graph(graph)
+        graph = reduction.graph
+        print(reduction.report())
+    stats = {}
+    if config.get('components'):
+        # the components are solved in config['workers'] processes, each one by a sequential solver
+        solver = partial(run_algorithm, dict(config, workers=1), T0_P=T0_P)
+        solution, trace = solve_components(graph, solver, config['cutoff_time'], config.get('workers', 1))
+    else:
+        initial_cover = warm_start(config, graph)
+        solution, trace = run_algorithm(config, graph, config['cutoff_time'], T0_P, initial_cover, stats)
+    # an empty (reduced) graph is solved exactly
+    optimal = stats.get('optimal', False) or graph.get_num_edges() == 0
+    kernel_solution = solution
+    if reduction is not None:
+        solution, trace = reduction.lift(solution), reduction.lift_trace(trace)
+    if check_solution(original, solution):
+        record_solution(config, graph, kernel_solution, optimal)
+        if reduction is not None:
+            record_solution(config, original, solution, optimal)
+    if config['algorithm'] == 'BnB' and config['graph'] in OPT_SOL:
+        opt_time = time_to_optimal(config['graph'], trace)
+        engine = stats.get('engine', 'components' if config.get('components') else 'bnb')
+        if opt_time is None:
+            print('Optimum {} not reached ({}), best {}'.format(OPT_SOL[config['graph']], engine, len(solution)))
+        else:
+            print('Optimum {} reached in {:.2f} s ({})'.format(OPT_SOL[config['graph']], opt_time, engine))
+    if config.get('store'):
+        ResultsStore().append(config, solution, trace, T0_P)
+    elif T0_P:
+        write_output(config, solution, trace, OUTPUT_PATH=T0_P_OUTPUT_PATH, T0_P=T0_P)
     else:
         write_output(config, solution, trace)
 
-# run the experiments for all the algorithms and all the graphs
-def run_experiments():
+# get the best known cover of the graph from the solution store if the configuration asks for a warm start
+def warm_start(config, graph):
+    if not config.get('warm'):
+        return None
+    entry = SolutionStore().get(graph)
+    if entry is None:
+        print('Warm start: no known cover')
+        return None
+    print('Warm start: cover of size {} (lower bound {}) from {}'.format(len(entry['cover']), entry['lower_bound'],
+                                                                        entry['source']))
+    return entry['cover']
+
+# write a solution back to the solution store, a proven optimal one also gives a lower bound
+def record_solution(config, graph, solution, optimal=False):
+    store = SolutionStore()
+    source = '{}_{}_{}_{}'.format(config['graph'], config['algorithm'], config['cutoff_time'], config['seed'])
+    if graph.get_num_edges() > 0 and store.update(graph, solution, len(solution) if optimal else 0, source):
+        print('Solution store updated: cover of size {}{}'.format(len(solution), ' (optimal)' if optimal else ''))
+    store.evict()
+
+# verify the solution of a run before it is recorded, an invalid one is reported (and still written)
+def check_solution(graph, solution):
+    result = verify_cover(graph, solution)
+    if not result['valid']:
+        print('Invalid solution: {}'.format(result['error']))
+    return result['valid']
+
+# race several seeds of a local search algorithm in parallel
+def race_experiment(config, graph = None):
     """
-    Run the experiments for all the algorithms and all the graphs
+    Race config['seeds'] seeded runs of a LS algorithm in parallel processes (seeds config['seed'],
+    config['seed'] + 1, ...) and write the best cover with the trace of the global incumbent
+    (as the seed 'first-last') and the trace of every seed
 
+    Parameters
+    ----------
+    config : dict
+        The configuration of the experiment, as for single_round_experiment; with config['race'] the
+        runs stop as soon as the known optimum (OPT_SOL) or the LP lower bound of the graph is reached,
+        or when the incumbent has not improved for config['stagnation'] seconds
+        (RACE_STAGNATION of the cutoff time by default), or the lower bound of the solution store;
+        with config['warm'] every run starts from the best known cover of the solution store
+    graph : Graph (None by default)
+        The graph of the experiment if already loaded, it is loaded from config['graph'] otherwise
+    """
+    seeds = list(range(config['seed'], config['seed'] + config['seeds']))
+    race_config = dict(config, seed='{}-{}'.format(seeds[0], seeds[-1]))
+    print('=========================================')
+    print('Graph: {}, Algorithm: {}, Seeds: {}, Cutoff: {}'\
+        .format(config['graph'], config['algorithm'], race_config['seed'], config['cutoff_time']))
+    if graph is None:
+        graph = load_graph(config['graph'])
+    original = graph
+    reduction = None
+    if config.get('reduce'):
+        reduction = reduce_graph(graph)
+        graph = reduction.graph
+        print(reduction.report())
+    offset = reduction.offset if reduction is not None else 0
+    target, stagnation = None, None
+    if config.get('race'):
+        # the bounds are on the size of the cover of the (reduced) graph the runs see
+        target = lp_kernel(graph)[3]
+        if config['graph'] in OPT_SOL:
+            target = max(target, OPT_SOL[config['graph']] - offset)
+        target = max(target, SolutionStore().lower_bound(graph))
+        stagnation = config.get('stagnation') or RACE_STAGNATION * config['cutoff_time']
+    if graph.get_num_edges() == 0:
+        solution, trace, seed_results = [], [[0.0, 0]], {seed: ([], [[0.0, 0]]) for seed in seeds}
+    else:
+        solution, trace, seed_results = race(graph, config['algorithm'], seeds, config['cutoff_time'],
+                                            target, stagnation, warm_start(config, graph))
+    kernel_solution = solution
+    if reduction is not None:
+        solution, trace = reduction.lift(solution), reduction.lift_trace(trace)
+        seed_results = {seed: (reduction.lift(s), reduction.lift_trace(t)) for seed, (s, t) in seed_results.items()}
+    if check_solution(original, solution):
+        record_solution(race_config, graph, kernel_solution)
+        if reduction is not None:
+            record_solution(race_config, original, solution)
+    print('Best cover {} found in {:.2f} s'.format(len(solution), trace[-1][0]))
+    if config.get('store'):
+        # every seed is a run of its own, the race is the run of the seed range
+        results = ResultsStore()
+        for seed, (seed_solution, seed_trace) in seed_results.items():
+            results.append(dict(config, seed=seed), seed_solution, seed_trace)
+        results.append(race_config, solution, trace)
+    else:
+        for seed, (_, seed_trace) in seed_results.items():
+            write_trace(dict(config, seed=seed), seed_trace)
+        write_output(race_config, solution, trace)
+
+# expand the experiments for all the algorithms and all the graphs into jobs
+def get_experiment_grid(algorithms=EXP1_ALGORITHMS):
+    """
+    Expand the experiments for all the algorithms and all the graphs into jobs
+
+    Parameters
+    ----------
+    algorithms : list (EXP1_ALGORITHMS by default)
+        The algorithms of EXP1, e.g. list(ALGORITHM_LIST) to also run LS3 and the other heuristics
+
+    Returns
+    -------
+    jobs : list
+        The (config, T0_P) pairs of the experiments
     """
     seed = 1
     cutoff_time = 600
+    jobs = []
 
     # EXP1: 
-    #   Algorithm: heuristic, BnB, LS1, LS2
+    #   Algorithm: heuristic, BnB, LS1, LS2 (by default)
     #   Graph: all graphs
     #   Seed: 1
     #   Cutoff: 600
     graph_list = get_graph_files()
-    for algorithm in ALGORITHM_LIST.keys():
-        if algorithm == None:
-            continue
+    for algorithm in algorithms:
         for graph in graph_list:
             config = {'graph': graph, 'algorithm': algorithm, 'seed': seed, 'cutoff_time': cutoff_time}
-            single_round_experiment(config)
+            jobs.append((config, None))
 
     # EXP2: 
     #   Algorithm: LS1
@@ -77,7 +224,7 @@ def run_experiments():
     for graph in graph_list:
         for seed in seed_list:
             config = {'graph': graph, 'algorithm': 'LS1', 'seed': seed, 'cutoff_time': cutoff_time}
-            single_round_experiment(config)
+            jobs.append((config, None))
 
     # EXP3:
     #   Algorithm: LS1
@@ -92,19 +239,19 @@ def run_experiments():
         for seed in seed_list:
             for T0_P in T0_P_list:
                 config = {'graph': graph, 'algorithm': 'LS1', 'seed': seed, 'cutoff_time': cutoff_time}
-                single_round_experiment(config, T0_P)
+                jobs.append((config, T0_P))
 
     # EXP4:
     #   Algorithm: LS1
     #   Graph: all graphs except power.graph and star2.graph
     #   Seed: 2, 3, 4, 5, 6, 7, 8, 9, 10
     #   Cutoff: 600
-    graph_list = set(get_graph_files()) - {'power', 'star2'}
+    graph_list = sorted(set(get_graph_files()) - {'power', 'star2'})
     seed_list = [2, 3, 4, 5, 6, 7, 8, 9, 10]
     for graph in graph_list:
         for seed in seed_list:
             config = {'graph': graph, 'algorithm': 'LS1', 'seed': seed, 'cutoff_time': cutoff_time}
-            single_round_experiment(config)
+            jobs.append((config, None))
 
     # EXP5:
     #   Algorithm: LS2
@@ -116,7 +263,41 @@ def run_experiments():
     for graph in graph_list:
         for seed in seed_list:
             config = {'graph': graph, 'algorithm': 'LS2', 'seed': seed, 'cutoff_time': cutoff_time}
-            single_round_experiment(config)
+            jobs.append((config, None))
+    return jobs
+
+# check whether the results of an experiment already exist
+def experiment_done(config, T0_P=None):
+    if config.get('store'):
+        return ResultsStore().contains(config, T0_P)
+    output_path = T0_P_OUTPUT_PATH if T0_P else OUTPUT_PATH
+    return all(os.path.exists(path) for path in get_output_paths(config, output_path, T0_P))
+
+# run the experiments for all the algorithms and all the graphs
+def run_experiments(processes=None, pin=False, store=False, algorithms=EXP1_ALGORITHMS):
+    """
+    Run the experiments for all the algorithms and all the graphs across a pool of processes,
+    skipping the experiments whose results already exist (so an interrupted run can be resumed)
+
+    Parameters
+    ----------
+    processes : int (None by default)
+        The number of worker processes, os.cpu_count() by default
+    pin : bool (False by default)
+        Whether to pin every worker process to its own CPU
+    store : bool (False by default)
+        Whether to append the results to the results store instead of writing the output files,
+        ResultsStore().export_files() writes them afterwards
+    algorithms : list (EXP1_ALGORITHMS by default)
+        The algorithms of EXP1, see get_experiment_grid
+
+    """
+    jobs = get_experiment_grid(algorithms)
+    if store:
+        jobs = [(dict(config, store=True), T0_P) for config, T0_P in jobs]
+    failed = run_jobs(jobs, single_round_experiment, experiment_done, processes, pin)
+    for (config, T0_P), error in failed:
+        print('Failed: {} {} (T0_P: {}): {}'.format(config, T0_P, error))
     
 
 # execute the experiments according to the command line arguments
@@ -126,14 +307,35 @@ def exec():
     parser.add_argument('-alg', type=str, default=None, help='The algorithm name', required=True)
     parser.add_argument('-time', type=str, default=None, help='The cutoff time', required=True)   
     parser.add_argument('-seed', type=int, default=1, help='The random seed', required=True)
+    parser.add_argument('-reduce', action='store_true', help='Kernelize the graph before running the algorithm')
+    parser.add_argument('-workers', type=int, default=1, help='The number of processes of the parallel BnB')
+    parser.add_argument('-replicas', type=int, default=1, help='The number of replicas of LS1 (replica exchange)')
+    parser.add_argument('-components', action='store_true',
+                        help='Solve every connected component independently (in -workers processes)')
+    parser.add_argument('-warm', action='store_true',
+                        help='Start from the best known cover of the graph in the solution store')
+    parser.add_argument('-store', action='store_true',
+                        help='Append the results to the results store instead of writing the output files')
+    parser.add_argument('-seeds', type=int, default=1, help='The number of seeded LS runs raced in parallel')
+    parser.add_argument('-race', action='store_true',
+                        help='Stop the seeded runs at the optimum / lower bound or when they stagnate')
+    parser.add_argument('-stagnation', type=float, default=None,
+                        help='The stagnation budget of -race in seconds')
     args = parser.parse_args()
     assert args.inst in get_graph_files(), 'The graph file does not exist'
     assert args.alg in ALGORITHM_LIST.keys(), 'The algorithm does not exist'
-    config = {'graph': args.inst, 'algorithm': args.alg, 'seed': args.seed, 'cutoff_time': int(args.time)}
-    single_round_experiment(config)
+    config = {'graph': args.inst, 'algorithm': args.alg, 'seed': args.seed, 'cutoff_time': int(args.time),
+              'reduce': args.reduce, 'workers': args.workers, 'replicas': args.replicas,
+              'components': args.components, 'warm': args.warm, 'store': args.store}
+    if args.seeds > 1 or args.race:
+        assert args.alg in RACE_ALGORITHMS, 'Only the LS algorithms can be raced'
+        config.update({'seeds': max(args.seeds, 1), 'race': args.race, 'stagnation': args.stagnation})
+        race_experiment(config)
+    else:
+        single_round_experiment(config)
 
 if __name__ == '__main__':
-    # run_experiments()
+    # run_experiments(processes=os.cpu_count(), pin=True)
     # verify_solutions()
     exec()
 
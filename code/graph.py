@@ -1,82 +1,227 @@
 """
-This file defines the graph class based on networkx and some essential operations.
+This file defines the graph class based on a compact CSR (compressed sparse row) layout and some essential operations.
+
+Vertices are stored internally with 0-based indices; `labels` maps every index back to the
+(1-based) vertex ID used in the graph file, and every public method taking or returning
+vertices speaks in terms of these labels, so the solvers never see the internal indices
+unless they ask for them (`indptr`, `indices`, `degree`, `alive`, `index_of`).
 """
 
-import networkx as nx
-import matplotlib.pyplot as plt
-import matplotlib
+import numpy as np
+
+INDEX_DTYPE = np.int32
+
+# build the CSR arrays of an undirected graph from the endpoints of its edges
+def edges_to_csr(num_nodes, src, dst):
+    """
+    Build the CSR arrays of an undirected graph, neighbor lists are sorted
+
+    Parameters
+    ----------
+    num_nodes : int
+        The number of vertices
+    src, dst : array-like
+        The 0-based endpoints of every edge, each undirected edge listed once
 
-# Create a wrapper class for networkx graph object and add some essential operations.
+    Returns
+    -------
+    indptr : np.ndarray (n + 1,)
+    indices : np.ndarray (2m,)
+    """
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    rows = np.concatenate((src, dst))
+    cols = np.concatenate((dst, src))
+    order = np.lexsort((cols, rows))
+    indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=num_nodes), out=indptr[1:])
+    return indptr, cols[order].astype(INDEX_DTYPE)
+
+# Create a CSR-backed graph class with the essential operations used by the solvers.
 class Graph:
     """
-    Wrapper class for networkx graph object
+    Array-backed undirected graph in CSR format
 
     Parameters
     ----------
-    incoming_graph_data : nx_G (None by default)
+    indptr : np.ndarray (n + 1,)
+        Row pointers, the neighbors of vertex i are indices[indptr[i]:indptr[i + 1]]
+    indices : np.ndarray (2m,)
+        Concatenated neighbor lists (0-based), every edge is stored in both directions
+    labels : np.ndarray (n,) (None by default)
+        The vertex IDs of the graph file, 1..n by default
 
+    Notes
+    -----
+    `indptr`, `indices` and `labels` are never written to, so they can be read-only
+    (e.g. memory-mapped) arrays. Deleting vertices only flips the `alive` mask and
+    decrements `degree` in place, the adjacency arrays themselves are shared by all copies.
     """
     # initialize the graph class
-    def __init__(self, nx_G=None):
-        self.g = nx.Graph() if nx_G is None else nx_G
+    def __init__(self, indptr, indices, labels=None):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=INDEX_DTYPE)
+        n = len(self.indptr) - 1
+        if labels is None:
+            labels = np.arange(1, n + 1, dtype=np.int64)
+        self.labels = np.asarray(labels, dtype=np.int64)
+        # current degree of every vertex (number of alive neighbors)
+        self.degree = np.diff(self.indptr).astype(INDEX_DTYPE)
+        # vertices that have not been deleted
+        self.alive = np.ones(n, dtype=bool)
+        self._num_nodes = n
+        self._num_edges = int(len(self.indices) // 2)
+        # labels 1..n can be mapped back to indices by an offset, others need a lookup table
+        self._contiguous = n == 0 or (int(self.labels[0]) == 1 and int(self.labels[-1]) == n
+                                      and bool(np.all(np.diff(self.labels) == 1)))
+        self._index = None
+        self._lists = None
+
+    # build a graph from two arrays of (0-based) edge endpoints
+    @classmethod
+    def from_edges(cls, num_nodes, src, dst, labels=None):
+        """
+        Build a graph from the endpoints of its edges
+
+        Parameters
+        ----------
+        num_nodes : int
+            The number of vertices
+        src, dst : array-like
+            The 0-based endpoints of every edge, each undirected edge listed once
+        labels : array-like (None by default)
+            The vertex IDs, 1..n by default
+
+        Returns
+        -------
+        g : Graph
+            The CSR graph
+        """
+        indptr, indices = edges_to_csr(num_nodes, src, dst)
+        return cls(indptr, indices, labels)
 
     # define graph iterator
     def __iter__(self):
-        return iter(list(self.g))
-
-    # add a new node to the graph
-    def add_node(self, node):
-        self.g.add_node(node)
-
-    # add a new edge to the graph
-    def add_edge(self, from_node, to_node):
-        self.g.add_edge(from_node, to_node)
-    
-    def add_edge_from(self, from_node, to_nodes):
-        if not to_nodes:
-            self.g.add_node(from_node)
-        else:
-            self.g.add_edges_from([(from_node, to_node) for to_node in to_nodes])
+        return iter(self.labels[self.alive].tolist())
+
+    # map a vertex ID to its internal index
+    def index_of(self, node):
+        if self._contiguous:
+            return node - 1
+        if self._index is None:
+            self._index = {label: i for i, label in enumerate(self.labels.tolist())}
+        return self._index[node]
+
+    # get indptr and indices as Python lists for the pure-Python loops, built once and shared by the copies
+    # made afterwards (like the arrays, they must not be written to)
+    def adjacency_lists(self):
+        if self._lists is None:
+            self._lists = (self.indptr.tolist(), self.indices.tolist())
+        return self._lists
+
+    # get the (0-based) neighbor indices of the internal index i as a view, no allocation
+    def neighbors(self, i):
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
 
     # get the list of nodes connected with the input node
     def get_neighbors_as_list(self, node):
-        return list(self.g.neighbors(node))
+        nbrs = self.neighbors(self.index_of(node))
+        return self.labels[nbrs[self.alive[nbrs]]].tolist()
+
+    # get the current degree of the input node
+    def get_degree(self, node):
+        return int(self.degree[self.index_of(node)])
 
     # get the total number of nodes in the graph
     def get_num_nodes(self):
-        return self.g.number_of_nodes()
-    
+        return self._num_nodes
+
     # get the total number of edges in the graph
     def get_num_edges(self):
-        return self.g.number_of_edges()
-    
+        return self._num_edges
+
     # get the set of nodes in the graph (copied object)
     def get_vertices_set(self):
-        return set(self.g.nodes()).copy()
+        return set(self.labels[self.alive].tolist())
 
     # get the set of edges in the graph (copied object)
     def get_edges_set(self):
-        return set(self.g.edges()).copy()
+        src, dst = self.get_edge_arrays()
+        return set(zip(self.labels[src].tolist(), self.labels[dst].tolist()))
+
+    # get the (0-based) endpoints of the alive edges, each edge once with src < dst
+    def get_edge_arrays(self):
+        src = np.repeat(np.arange(len(self.alive), dtype=INDEX_DTYPE), np.diff(self.indptr))
+        keep = (src < self.indices) & self.alive[src] & self.alive[self.indices]
+        return src[keep], self.indices[keep]
 
     # determine whether the graph is empty
     def is_empty(self):
-        return self.g.number_of_nodes() == 0
-    
+        return self._num_nodes == 0
+
+    # determine whether the input nodes cover every alive edge of the graph
+    def is_cover(self, node_set):
+        in_cover = np.isin(self.labels, np.asarray(list(node_set), dtype=np.int64))
+        src, dst = self.get_edge_arrays()
+        return bool(np.all(in_cover[src] | in_cover[dst]))
+
+    # delete a single node from the graph, return the labels of its alive neighbors
+    def remove_node(self, node):
+        i = self.index_of(node)
+        nbrs = self.neighbors(i)
+        nbrs = nbrs[self.alive[nbrs]]
+        self.alive[i] = False
+        self.degree[nbrs] -= 1
+        self._num_nodes -= 1
+        self._num_edges -= len(nbrs)
+        return self.labels[nbrs].tolist()
+
+    # put a deleted node back into the graph
+    def restore_node(self, node):
+        i = self.index_of(node)
+        nbrs = self.neighbors(i)
+        nbrs = nbrs[self.alive[nbrs]]
+        self.alive[i] = True
+        self.degree[nbrs] += 1
+        self.degree[i] = len(nbrs)
+        self._num_nodes += 1
+        self._num_edges += len(nbrs)
+
     # delete the input nodes from the graph
     def delete_nodes_from_set(self, node_set):
-        self.g.remove_nodes_from(iter(node_set))
+        for node in node_set:
+            if self.alive[self.index_of(node)]:
+                self.remove_node(node)
 
-    # get the node with the minimum degree
+    # get the node with the minimum degree (lowest ID among ties)
     def get_node_with_min_degree(self):
-        return min(self.g, key=self.g.degree)
+        masked = np.where(self.alive, self.degree, np.iinfo(INDEX_DTYPE).max)
+        return int(self.labels[np.argmin(masked)])
 
-    # get the deep copy of the graph
+    # pickle the graph without the cached lists, the workers rebuild them if they need them
+    def __getstate__(self):
+        return dict(self.__dict__, _lists=None)
+
+    # get the copy of the graph, the read-only adjacency arrays are shared
     def copy(self):
-        return Graph(self.g.copy())
-    
+        g = Graph.__new__(Graph)
+        g.__dict__.update(self.__dict__)
+        g.degree = self.degree.copy()
+        g.alive = self.alive.copy()
+        return g
+
+    # export the alive part of the graph to networkx
+    def to_networkx(self):
+        import networkx as nx
+        nx_G = nx.Graph()
+        nx_G.add_nodes_from(self)
+        nx_G.add_edges_from(self.get_edges_set())
+        return nx_G
+
     # draw the graph (debugging purpose)
     def show(self):
+        import networkx as nx
+        import matplotlib.pyplot as plt
         plt.figure()
-        nx.draw(self.g, with_labels=True)
+        nx.draw(self.to_networkx(), with_labels=True)
         plt.show()
-        plt.show()
\ No newline at end of file
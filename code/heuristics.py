@@ -1,18 +1,246 @@
 """
-This file contains the implementation of a constructive heuristic for MVC with approximation guarantees.
-We choose to implement the Greedy Independent Cover (GIC) algorithm.
+This file contains the implementation of constructive heuristics for MVC.
+Our main choice is the Greedy Independent Cover (GIC) algorithm, with approximation guarantees.
 The implemntation is based on the following paper:
-[1]Franc ̧ois Delbot and Christian Laforest. Analytical and experimental comparison of six algorithms 
+[1]Franc ̧ois Delbot and Christian Laforest. Analytical and experimental comparison of six algorithms
    for the vertex cover problem. Journal of Experimental Algorithmics (JEA), 15:1–4, 2010.
+A small portfolio of linear-time alternatives (max-degree greedy, leaf-first greedy, the maximal matching
+2-approximation) share the same incremental degree engine, DegreeQueue, and can be followed by a
+redundancy-removal pass. best_of runs all of them and keeps the smallest cover.
 """
 
+import heapq
 import numpy as np
-import time
+from budget import as_budget
+
+
+class DegreeQueue:
+    """
+    Bucket queue of the alive vertices keyed by their current degree, with lazy deletion.
+
+    Vertex v is stored in buckets[d] for every degree d it has had; an entry is valid only
+    if v is alive and its current degree is d, stale entries are dropped when popped.
+    Degrees only decrease, so every vertex enters every bucket at most once and all the
+    operations together cost O(n + m). Ties within a bucket are broken LIFO: the vertex
+    whose degree dropped most recently is popped first, initially the lowest index.
+
+    A popped vertex has left its bucket, so the caller is expected to remove it.
+
+    Parameters
+    ----------
+    graph : Graph
+        The graph object of the predefined Graph class, it is not modified
+    """
+    def __init__(self, graph):
+        self.indptr, self.indices = graph.adjacency_lists()
+        self.degree = graph.degree.tolist()
+        self.alive = graph.alive.tolist()
+        self.num_alive = sum(self.alive)
+        max_degree = max(self.degree, default=0)
+        self.buckets = [[] for _ in range(max_degree + 1)]
+        for v in range(len(self.degree) - 1, -1, -1):
+            if self.alive[v]:
+                self.buckets[self.degree[v]].append(v)
+        self.min_degree = 0
+        self.max_degree = max_degree
+
+    # pop the alive vertex with the minimum degree, None if the graph is empty
+    def pop_min(self):
+        buckets, degree, alive = self.buckets, self.degree, self.alive
+        while self.min_degree < len(buckets):
+            bucket = buckets[self.min_degree]
+            while bucket:
+                v = bucket.pop()
+                if alive[v] and degree[v] == self.min_degree:
+                    return v
+            self.min_degree += 1
+        return None
+
+    # pop the alive vertex with the maximum degree, None if the graph is empty
+    def pop_max(self):
+        buckets, degree, alive = self.buckets, self.degree, self.alive
+        while self.max_degree >= 0:
+            bucket = buckets[self.max_degree]
+            while bucket:
+                v = bucket.pop()
+                if alive[v] and degree[v] == self.max_degree:
+                    return v
+            self.max_degree -= 1
+        return None
+
+    # pop an alive vertex with exactly degree d, None if there is none
+    def pop_degree(self, d):
+        buckets, degree, alive = self.buckets, self.degree, self.alive
+        if d >= len(buckets):
+            return None
+        bucket = buckets[d]
+        while bucket:
+            v = bucket.pop()
+            if alive[v] and degree[v] == d:
+                return v
+        return None
+
+    # remove the vertex v from the graph and decrement the degrees of its neighbors in place
+    def remove(self, v):
+        alive, degree, buckets, indices = self.alive, self.degree, self.buckets, self.indices
+        alive[v] = False
+        self.num_alive -= 1
+        for k in range(self.indptr[v], self.indptr[v + 1]):
+            u = indices[k]
+            if alive[u]:
+                d = degree[u] - 1
+                degree[u] = d
+                buckets[d].append(u)
+                if d < self.min_degree:
+                    self.min_degree = d
+
+    # get the list of alive neighbors of the vertex v
+    def neighbors(self, v):
+        alive, indices = self.alive, self.indices
+        return [indices[k] for k in range(self.indptr[v], self.indptr[v + 1]) if alive[indices[k]]]
+
+
+class RankedDegreeQueue:
+    """
+    Bucket queue of the alive vertices keyed by their current degree, whose ties go to the lowest rank.
+
+    Bucket d is the list of every vertex with an initial degree of at least d, in rank order,
+    all of them laid out in one flat list of n + 2m entries. A cursor walks every bucket
+    forward only, skipping the entries that are deleted or whose degree is not d: an entry
+    with a lower degree never comes back, so every entry is skipped once and the scans
+    cost O(n + m) in total. An entry skipped while its degree was still higher can reach
+    degree d later, behind the cursor; such late entries wait in a small heap of ranks per
+    bucket and cost O(log n) each (on sparse graphs they are a fraction of the vertices).
+
+    A popped vertex is still in the graph, so the caller is expected to remove it.
+
+    Parameters
+    ----------
+    graph : Graph
+        The graph object of the predefined Graph class, it is not modified
+    rank : np.ndarray (n,)
+        A distinct priority of every vertex breaking the ties (e.g. insertion_rank)
+    """
+    def __init__(self, graph, rank):
+        self.indptr, self.indices = graph.adjacency_lists()
+        vertex = np.empty(len(rank), dtype=np.int64)
+        vertex[rank] = np.arange(len(rank))
+        order = vertex[graph.alive[vertex]]
+        # bucket d holds the vertices of degree >= d, i.e. vertex v is repeated degree + 1 times
+        repeats = graph.degree[order].astype(np.int64) + 1
+        offsets = np.repeat(np.cumsum(repeats) - repeats, repeats)
+        entry_degree = np.arange(len(offsets)) - offsets
+        max_degree = int(repeats.max()) - 1 if len(order) else 0
+        # a stable sort of 16-bit keys is a radix sort, in O(n + m)
+        key = entry_degree.astype(np.uint16 if max_degree < 1 << 16 else np.int64)
+        by_degree = np.argsort(key, kind='stable')
+        self.entries = np.repeat(order, repeats)[by_degree].tolist()
+        self.start = np.searchsorted(entry_degree[by_degree], np.arange(max_degree + 2)).tolist()
+        self.cursor = self.start[:-1]
+        # rank of the last entry skipped in every bucket (-1 if none), later ones are late
+        self.passed = [-1] * (max_degree + 1)
+        self.late = [[] for _ in range(max_degree + 1)]
+        self.rank = np.asarray(rank).tolist()
+        self.vertex = vertex.tolist()
+        self.degree = graph.degree.tolist()
+        self.alive = graph.alive.tolist()
+        self.num_alive = len(order)
+        self.min_degree = 0
+
+    # get the alive vertex with the minimum degree (the lowest rank among ties), None if the graph is empty
+    def pop_min(self):
+        entries, start, degree, alive, rank = self.entries, self.start, self.degree, self.alive, self.rank
+        while self.min_degree < len(self.late):
+            d = self.min_degree
+            c, end = self.cursor[d], start[d + 1]
+            while c < end:
+                v = entries[c]
+                if alive[v] and degree[v] == d:
+                    break
+                c += 1
+            if c > self.cursor[d]:
+                self.cursor[d] = c
+                self.passed[d] = rank[entries[c - 1]]
+            late = self.late[d]
+            while late and not (alive[self.vertex[late[0]]] and degree[self.vertex[late[0]]] == d):
+                heapq.heappop(late)
+            if late and (c == end or late[0] < rank[entries[c]]):
+                return self.vertex[heapq.heappop(late)]
+            if c < end:
+                return entries[c]
+            self.min_degree += 1
+        return None
+
+    # remove the vertices of nodes from the graph at once and decrement the degrees of their neighbors in place
+    def remove_all(self, nodes):
+        alive, degree, indices, indptr = self.alive, self.degree, self.indices, self.indptr
+        passed, late, rank = self.passed, self.late, self.rank
+        min_degree = self.min_degree
+        for v in nodes:
+            alive[v] = False
+        self.num_alive -= len(nodes)
+        for v in nodes:
+            for u in indices[indptr[v]:indptr[v + 1]]:
+                if alive[u]:
+                    d = degree[u] - 1
+                    degree[u] = d
+                    if rank[u] <= passed[d]:
+                        heapq.heappush(late[d], rank[u])
+                    if d < min_degree:
+                        min_degree = d
+        self.min_degree = min_degree
+
+    # get the list of alive neighbors of the vertex v
+    def neighbors(self, v):
+        alive = self.alive
+        return [u for u in self.indices[self.indptr[v]:self.indptr[v + 1]] if alive[u]]
+
+
+def insertion_rank(graph):
+    """
+    The order in which the vertices first appear in the adjacency lists read row by row
+    (the vertex of a row, then its neighbors), i.e. the order in which the original networkx
+    implementation inserted them, which its min-degree selection used to break the ties
+
+    Parameters
+    ----------
+    graph : Graph
+        The graph object of the predefined Graph class
+
+    Returns
+    -------
+    rank : np.ndarray (n,)
+        The position of every vertex in that order
+    """
+    indptr, indices = graph.indptr, graph.indices
+    n = len(indptr) - 1
+    rows = np.repeat(np.arange(n), np.diff(indptr))
+    # position of every neighbor in the sequence, after the heads of its row and of the rows before
+    position = np.arange(len(indices)) + rows + 1
+    first = indptr[:-1] + np.arange(n)
+    # a vertex can appear before its own row only in the row of its lowest neighbor
+    lowest = np.full(n, n, dtype=np.int64)
+    nonempty = np.flatnonzero(np.diff(indptr))
+    if len(nonempty):
+        lowest[nonempty] = np.minimum.reduceat(indices, indptr[nonempty])
+    hit = rows == lowest[indices]
+    np.minimum.at(first, indices[hit], position[hit])
+    # the first occurrences are distinct positions of the sequence, so they are sorted in O(n + m)
+    slots = np.full(n + len(indices), -1, dtype=np.int64)
+    slots[first] = np.arange(n)
+    rank = np.empty(n, dtype=np.int64)
+    rank[slots[slots >= 0]] = np.arange(n)
+    return rank
+
 
 def heuristic(graph, cutoff_time=600):
     """
     A constructive heuristic for MVC with approximation guarantees.
-    We choose to implement the Greedy Independent Cover (GIC) algorithm.
+    We choose to implement the Greedy Independent Cover (GIC) algorithm:
+    repeatedly take a vertex with the minimum degree, put its neighbors into the cover
+    and delete it together with its neighbors. The ties go to the vertex inserted first (see
+    insertion_rank), as in the original implementation, so the cover is the same.
+    With the RankedDegreeQueue it runs in O(n + m) plus O(log n) per late entry.
 
     Parameters
     ----------
@@ -27,21 +255,219 @@ def heuristic(graph, cutoff_time=600):
         The trace of the heuristic
 
     """
-    start_time = time.time()
-    solution = set()
-    graph_temp = graph.copy()
-    while not graph_temp.is_empty() and time.time() - start_time < cutoff_time:
+    budget = as_budget(cutoff_time)
+    solution = []
+    queue = RankedDegreeQueue(graph, insertion_rank(graph))
+    while queue.num_alive and not budget.expired():
         # select the vertex with the minimum degree
-        selected_node = graph_temp.get_node_with_min_degree()
-        # get neighbors of the selected vertex
-        neighbors = set(graph_temp.get_neighbors_as_list(selected_node))
-        # add the selected vertex to the solution
-        solution = solution.union(neighbors)
+        selected_node = queue.pop_min()
+        # add the neighbors of the selected vertex to the solution
+        neighbors = queue.neighbors(selected_node)
+        solution.extend(neighbors)
         # remove the selected vertex and its neighbors from the graph
-        neighbors.add(selected_node)
-        graph_temp.delete_nodes_from_set(neighbors)
-        # add the solution to the trace
-    trace= [[time.time() - start_time, len(solution)]]
-    solution = list(solution)
-    
-    return solution, trace
\ No newline at end of file
+        queue.remove_all([selected_node] + neighbors)
+    if queue.num_alive:
+        # stopped by the budget
+        solution = _complete(graph, solution)
+    # add the solution to the trace
+    trace = [[budget.elapsed(), len(solution)]]
+    solution = graph.labels[solution].tolist()
+
+    return solution, trace
+
+
+def max_degree_greedy(graph, cutoff_time=600, prune=True):
+    """
+    Max-degree greedy: repeatedly put a vertex with the maximum degree into the cover and delete it.
+
+    Parameters
+    ----------
+    graph : Graph
+        The graph object of the predefined Graph class
+    prune : bool (True by default)
+        Whether to apply the redundancy-removal pass
+
+    Returns
+    -------
+    solution : list
+        The solution of the MVC problem
+    trace : list
+        The trace of the heuristic
+
+    """
+    budget = as_budget(cutoff_time)
+    cover = []
+    queue = DegreeQueue(graph)
+    while not budget.expired():
+        node = queue.pop_max()
+        if node is None or queue.degree[node] == 0:
+            break
+        cover.append(node)
+        queue.remove(node)
+    return _finish(graph, cover, budget, prune)
+
+
+def leaf_first_greedy(graph, cutoff_time=600, prune=True):
+    """
+    Degree-1 greedy: while there is a leaf, put its neighbor into the cover (which is always safe),
+    otherwise fall back to a vertex with the maximum degree. Isolated vertices are dropped.
+
+    Parameters
+    ----------
+    graph : Graph
+        The graph object of the predefined Graph class
+    prune : bool (True by default)
+        Whether to apply the redundancy-removal pass
+
+    Returns
+    -------
+    solution : list
+        The solution of the MVC problem
+    trace : list
+        The trace of the heuristic
+
+    """
+    budget = as_budget(cutoff_time)
+    cover = []
+    queue = DegreeQueue(graph)
+    while not budget.expired():
+        leaf = queue.pop_degree(1)
+        if leaf is not None:
+            node = queue.neighbors(leaf)[0]
+            queue.remove(leaf)
+        else:
+            node = queue.pop_max()
+            if node is None or queue.degree[node] == 0:
+                break
+        cover.append(node)
+        queue.remove(node)
+    return _finish(graph, cover, budget, prune)
+
+
+def matching_approx(graph, cutoff_time=600, prune=True):
+    """
+    Edge-deletion 2-approximation: build a maximal matching greedily and take both ends of every matched edge.
+
+    Parameters
+    ----------
+    graph : Graph
+        The graph object of the predefined Graph class
+    prune : bool (True by default)
+        Whether to apply the redundancy-removal pass
+
+    Returns
+    -------
+    solution : list
+        The solution of the MVC problem
+    trace : list
+        The trace of the heuristic
+
+    """
+    budget = as_budget(cutoff_time)
+    cover = []
+    queue = DegreeQueue(graph)
+    alive, indices, indptr = queue.alive, queue.indices, queue.indptr
+    for u in range(len(alive)):
+        if not alive[u]:
+            continue
+        for k in range(indptr[u], indptr[u + 1]):
+            v = indices[k]
+            if alive[v]:
+                cover.append(u)
+                cover.append(v)
+                queue.remove(u)
+                queue.remove(v)
+                break
+        if budget.expired():
+            break
+    return _finish(graph, cover, budget, prune)
+
+
+def remove_redundant(graph, solution):
+    """
+    Redundancy-removal pass: drop the vertices of the cover whose neighbors are all in the cover,
+    lowest degree first. The result is still a cover and no vertex can be dropped from it anymore.
+
+    Parameters
+    ----------
+    graph : Graph
+        The graph object of the predefined Graph class
+    solution : list
+        A vertex cover of the graph
+
+    Returns
+    -------
+    solution : list
+        The pruned vertex cover
+
+    """
+    cover = _remove_redundant(graph, [graph.index_of(node) for node in solution])
+    return graph.labels[cover].tolist()
+
+
+def best_of(graph, cutoff_time=600):
+    """
+    Run every constructive heuristic (each followed by the redundancy-removal pass) and keep the smallest cover.
+
+    Parameters
+    ----------
+    graph : Graph
+        The graph object of the predefined Graph class
+
+    Returns
+    -------
+    solution : list
+        The solution of the MVC problem
+    trace : list
+        The trace of the improvements over the portfolio
+
+    """
+    budget = as_budget(cutoff_time)
+    solution, trace = None, []
+    for algorithm in (heuristic, max_degree_greedy, leaf_first_greedy, matching_approx):
+        # the first heuristic always runs (a heuristic stopped by the budget completes its cover),
+        # so there is a cover even if the budget is spent
+        if solution is not None and budget.check():
+            break
+        if algorithm is heuristic:
+            candidate, _ = heuristic(graph, budget)
+            candidate = remove_redundant(graph, candidate)
+        else:
+            candidate, _ = algorithm(graph, budget)
+        if solution is None or len(candidate) < len(solution):
+            solution = candidate
+            trace.append([budget.elapsed(), len(solution)])
+    return solution, trace
+
+
+# shared tail of the heuristics: complete the cover (given as indices) if the heuristic was stopped by
+# the budget, prune it, convert it to labels and trace it
+def _finish(graph, cover, budget, prune):
+    cover = _complete(graph, cover)
+    if prune:
+        cover = _remove_redundant(graph, cover)
+    trace = [[budget.elapsed(), len(cover)]]
+    return graph.labels[cover].tolist(), trace
+
+
+# add one endpoint of every edge left uncovered by a partial cover given as indices, in O(n + m)
+def _complete(graph, cover):
+    in_cover = np.zeros(len(graph.alive), dtype=bool)
+    in_cover[cover] = True
+    src, dst = graph.get_edge_arrays()
+    missing = np.unique(src[~(in_cover[src] | in_cover[dst])])
+    return list(cover) + missing.tolist() if len(missing) else cover
+
+
+# redundancy-removal pass on a cover given as indices
+def _remove_redundant(graph, cover):
+    indptr, indices = graph.adjacency_lists()
+    alive = graph.alive.tolist()
+    in_cover = [False] * len(alive)
+    for v in cover:
+        in_cover[v] = True
+    degree = graph.degree.tolist()
+    for v in sorted(cover, key=degree.__getitem__):
+        if all(in_cover[indices[k]] or not alive[indices[k]] for k in range(indptr[v], indptr[v + 1])):
+            in_cover[v] = False
+    return [v for v in cover if in_cover[v]]
@@ -1,26 +1,44 @@
 """
 This file contains some support functions for
-- loading graphs from the '/Data/' folder in format of Graph class;
+- loading graphs (METIS-style or edge lists, optionally compressed) from the '/Data/' folder in format of Graph class;
 - writing the results to the '/output/' folder in format of .sol and .trace file;
 - loading the results from the '/output/' folder;
 """
 
+import io
 import os
+import json
+import hashlib
+import gzip
+import bz2
 import numpy as np
-from graph import Graph
+from graph import Graph, INDEX_DTYPE, edges_to_csr
 
 DATA_PATH = './DATA/'
 OUTPUT_PATH = './output/'
+CACHE_PATH = DATA_PATH + '.cache/'
+CACHE_VERSION = 1
+CACHE_ARRAYS = ('indptr', 'indices', 'labels')
+GRAPH_FORMATS = {'.graph': 'metis', '.edges': 'edgelist', '.el': 'edgelist', '.txt': 'edgelist'}
+COMPRESSIONS = {'.gz': gzip.open, '.bz2': bz2.open}
 
 # load the graph from the graph file
-def load_graph(graph_file):
+def load_graph(graph_file, use_cache=True, fmt=None):
     """
     Load the graph from the graph file indicated by graph_file
 
+    A compiled CSR copy of the graph is kept in CACHE_PATH, a warm load memory-maps it
+    read-only instead of parsing the text file again.
+
     Parameters
     ----------
     graph_file : str
-        The file name of the graph
+        The file name of the graph (in DATA_PATH, the extension may be omitted) or a path to it,
+        METIS-style .graph files and 'u v' edge lists are supported, optionally gzip/bz2-compressed
+    use_cache : bool (True by default)
+        Whether to read / write the compiled graph cache
+    fmt : str (None by default)
+        'metis' or 'edgelist', guessed from the file extension by default
 
     Returns
     -------
@@ -28,25 +46,306 @@ def load_graph(graph_file):
         The loaded graph object of the predefined Graph class
 
     """
-    if not graph_file.endswith('.graph'):
-        graph_file = graph_file + '.graph'
-    graph_path = DATA_PATH + graph_file
-    graph = Graph()
+    graph_path = resolve_graph_path(graph_file)
+    if use_cache:
+        arrays = _load_cached_graph(graph_path)
+        if arrays is not None:
+            return Graph(*arrays)
+    arrays = parse_graph_file(graph_path, fmt)
+    if use_cache:
+        _write_cached_graph(graph_path, arrays)
+    return Graph(*arrays)
+
+# find the graph file indicated by graph_file
+def resolve_graph_path(graph_file):
+    """
+    Find the graph file indicated by graph_file
+
+    Parameters
+    ----------
+    graph_file : str
+        A path, a file name in DATA_PATH, or a file name without extension
+
+    Returns
+    -------
+    graph_path : str
+        The path of the graph file
+
+    """
+    if os.path.isfile(graph_file):
+        return graph_file
+    candidates = [DATA_PATH + graph_file]
+    candidates += [DATA_PATH + graph_file + extension + compression
+                   for extension in GRAPH_FORMATS for compression in ('',) + tuple(COMPRESSIONS)]
+    for graph_path in candidates:
+        if os.path.isfile(graph_path):
+            return graph_path
+    raise FileNotFoundError('The graph file {} does not exist in {}'.format(graph_file, DATA_PATH))
+
+# parse the text graph file into CSR arrays
+def parse_graph_file(graph_path, fmt=None):
+    """
+    Parse the graph file into CSR arrays, the whole file is read in one buffer and tokenized with NumPy
+
+    Parameters
+    ----------
+    graph_path : str
+        The path of the graph file, a .gz / .bz2 suffix means it is compressed
+    fmt : str (None by default)
+        'metis' or 'edgelist', guessed from the file extension by default
+
+    Returns
+    -------
+    indptr, indices, labels : np.ndarray
+        The CSR arrays of the graph
+
+    """
+    name, compression = os.path.splitext(graph_path)
+    if compression not in COMPRESSIONS:
+        name, compression = graph_path, ''
+    if fmt is None:
+        fmt = GRAPH_FORMATS.get(os.path.splitext(name)[1], 'metis')
+    if fmt not in PARSERS:
+        raise ValueError('Unknown graph format {}, expected one of {}'.format(fmt, list(PARSERS)))
+    with COMPRESSIONS.get(compression, open)(graph_path, 'rb') as file:
+        buffer = file.read()
+    try:
+        return PARSERS[fmt](buffer)
+    except ValueError as e:
+        raise ValueError('{}: {}'.format(graph_path, e)) from None
+
+# tokenize a buffer of non-negative integers separated by whitespace
+def _tokenize(buffer, comment):
+    """
+    Tokenize the buffer into integers with NumPy, lines starting with the comment character are skipped
+
+    Returns
+    -------
+    values : np.ndarray
+        The integers in the buffer
+    lines : np.ndarray
+        The (0-based) line of every integer, counting only the lines that are not comments
+    num_lines : int
+        The number of lines in the buffer that are not comments
+    source : np.ndarray (num_lines,)
+        The (0-based) line of the file of every line that is not a comment, for the error messages
+
+    """
+    if comment in buffer:
+        kept = [not line.lstrip().startswith(comment) for line in buffer.split(b'\n')]
+        source = np.flatnonzero(kept)
+        buffer = b'\n'.join(line for line, keep in zip(buffer.split(b'\n'), kept) if keep)
+    else:
+        source = None
+    chars = np.frombuffer(buffer, dtype=np.uint8)
+    newline = chars == ord('\n')
+    line_ends = np.flatnonzero(newline)
+    if source is None:
+        source = np.arange(len(line_ends) + 1)
+    digit = (chars >= ord('0')) & (chars <= ord('9'))
+    invalid = ~(digit | newline | (chars == ord(' ')) | (chars == ord('\t')) | (chars == ord('\r')))
+    if invalid.any():
+        position = int(np.argmax(invalid))
+        raise ValueError('unexpected character {!r} on line {}'.format(
+            chr(chars[position]), int(source[np.searchsorted(line_ends, position)]) + 1))
+    boundary = np.diff(digit.astype(np.int8), prepend=0, append=0)
+    starts = np.flatnonzero(boundary == 1)
+    lengths = np.flatnonzero(boundary == -1) - starts
+    if len(lengths) and lengths.max() > 18:
+        raise ValueError('integer too large on line {}'.format(
+            int(source[np.searchsorted(line_ends, starts[np.argmax(lengths)])]) + 1))
+    values = np.zeros(len(starts), dtype=np.int64)
+    for k in range(int(lengths.max()) if len(lengths) else 0):
+        mask = lengths > k
+        values[mask] = values[mask] * 10 + (chars[starts[mask] + k] - ord('0'))
+    lines = np.searchsorted(line_ends, starts)
+    return values, lines, len(line_ends) + 1, source
+
+# parse a METIS-style graph file: a header 'n m [fmt]' followed by the neighbor list of vertex i on line i
+def _parse_metis(buffer):
+    values, lines, num_lines, source = _tokenize(buffer, b'%')
+    if not len(values):
+        raise ValueError('empty graph file, expected a header "<# nodes> <# edges> [fmt]"')
+    header = values[lines == lines[0]]
+    if len(header) < 2 or len(header) > 3:
+        raise ValueError('malformed header, expected "<# nodes> <# edges> [fmt]"')
+    if len(header) == 3 and header[2] != 0:
+        raise ValueError('weighted graphs (fmt {}) are not supported'.format(header[2]))
+    num_nodes, num_edges = int(header[0]), int(header[1])
+    header_line = lines[0]
+    values, lines = values[len(header):], lines[len(header):] - header_line - 1
+    if len(lines) and lines[-1] >= num_nodes:
+        raise ValueError('# nodes ({}) does not match the file ({}), found neighbors on line {}'.format(
+            int(lines[-1]) + 1, num_nodes, int(source[lines[-1] + header_line + 1]) + 1))
+    if len(values) and (values.min() < 1 or values.max() > num_nodes):
+        bad = int(np.argmax((values < 1) | (values > num_nodes)))
+        raise ValueError('vertex {} on line {} is out of range [1, {}]'.format(
+            int(values[bad]), int(source[lines[bad] + header_line + 1]) + 1, num_nodes))
+    if len(values) != 2 * num_edges:
+        raise ValueError('# edges ({:g}) does not match the file ({})'.format(len(values) / 2, num_edges))
+    forward = np.sort(lines * num_nodes + values - 1)
+    backward = np.sort((values - 1) * num_nodes + lines)
+    if not np.array_equal(forward, backward):
+        bad = int(np.argmax(forward != backward))
+        raise ValueError('the adjacency is not symmetric, edge ({}, {}) is listed only once'.format(
+            int(forward[bad] // num_nodes) + 1, int(forward[bad] % num_nodes) + 1))
+    indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(lines, minlength=num_nodes), out=indptr[1:])
+    labels = np.arange(1, num_nodes + 1, dtype=np.int64)
+    return indptr, (values - 1).astype(INDEX_DTYPE), labels
+
+# parse an edge list file: one edge 'u v' per line, self loops and duplicated edges are dropped
+def _parse_edgelist(buffer):
+    values, lines, num_lines, source = _tokenize(buffer, b'#')
+    per_line = np.bincount(lines, minlength=num_lines)
+    if np.any((per_line != 0) & (per_line != 2)):
+        bad = int(np.argmax((per_line != 0) & (per_line != 2)))
+        raise ValueError('expected "u v" on line {}, found {} values'.format(int(source[bad]) + 1,
+                                                                            int(per_line[bad])))
+    labels, ids = np.unique(values, return_inverse=True)
+    src, dst = ids[0::2], ids[1::2]
+    src, dst = np.minimum(src, dst), np.maximum(src, dst)
+    keep = src != dst
+    edges = np.unique(src[keep] * len(labels) + dst[keep])
+    indptr, indices = edges_to_csr(len(labels), edges // len(labels), edges % len(labels))
+    return indptr, indices, labels
+
+PARSERS = {'metis': _parse_metis, 'edgelist': _parse_edgelist}
+
+# get the cache key of a graph file from its size and modification time
+def _graph_file_key(graph_path):
+    stat = os.stat(graph_path)
+    return stat.st_size, stat.st_mtime_ns
+
+# get the content hash of a graph file
+def _graph_file_hash(graph_path):
+    sha1 = hashlib.sha1()
     with open(graph_path, 'rb') as file:
-        temp = file.readline().split()
-        num_nodes, num_edges = int(temp[0]), int(temp[1])
-        for current_node in range(1, num_nodes + 1):
-            nodes = list(map(lambda x: int(x), file.readline().split()))
-            graph.add_edge_from(current_node, nodes)
-    assert graph.get_num_nodes() == num_nodes, '# nodes ({}) does not match the file ({})'.format(graph.get_num_nodes(), num_nodes)
-    assert graph.get_num_edges() == num_edges, '# edges ({}) does not match the file ({})'.format(graph.get_num_edges(), num_edges)
-    return graph
+        for block in iter(lambda: file.read(1 << 20), b''):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+# get the path of the cache metadata of a graph file
+def _cache_meta_path(graph_path):
+    return os.path.join(CACHE_PATH, os.path.basename(graph_path) + '.json')
+
+# load the compiled graph from the cache, None on a cache miss
+def _load_cached_graph(graph_path):
+    """
+    Memory-map the compiled CSR arrays of the graph file if the cache is up to date
+
+    The arrays are opened read-only, so the cache can be shared by concurrent processes.
+    A file whose size matches but whose mtime changed (e.g. touched or copied) is
+    re-hashed and accepted if its content is unchanged.
+
+    Parameters
+    ----------
+    graph_path : str
+        The path of the graph file
+
+    Returns
+    -------
+    arrays : tuple or None
+        (indptr, indices, labels) as read-only np.memmap, None if the cache is missing or stale
+
+    """
+    try:
+        with open(_cache_meta_path(graph_path), 'r') as f:
+            meta = json.load(f)
+        size, mtime_ns = _graph_file_key(graph_path)
+        if meta['version'] != CACHE_VERSION or meta['size'] != size:
+            return None
+        if meta['mtime_ns'] != mtime_ns:
+            if meta['sha1'] != _graph_file_hash(graph_path):
+                return None
+            meta['mtime_ns'] = mtime_ns
+            _atomic_write(_cache_meta_path(graph_path), json.dumps(meta).encode())
+        return tuple(np.load(os.path.join(CACHE_PATH, meta['arrays'][name]), mmap_mode='r')
+                     for name in CACHE_ARRAYS)
+    except (OSError, ValueError, KeyError):
+        return None
+
+# write the compiled graph to the cache
+def _write_cached_graph(graph_path, arrays):
+    """
+    Write the CSR arrays of the graph file to the cache
+
+    Every file is written to a temporary name and renamed into place, and the array files
+    are named after the content hash, so a concurrent reader never sees a partial or
+    mismatched cache entry. Failing to write the cache (e.g. a read-only DATA folder)
+    is not an error.
+
+    Parameters
+    ----------
+    graph_path : str
+        The path of the graph file
+    arrays : tuple
+        (indptr, indices, labels) of the graph
+
+    """
+    try:
+        os.makedirs(CACHE_PATH, exist_ok=True)
+        size, mtime_ns = _graph_file_key(graph_path)
+        sha1 = _graph_file_hash(graph_path)
+        meta = {'version': CACHE_VERSION, 'size': size, 'mtime_ns': mtime_ns, 'sha1': sha1,
+                'num_nodes': len(arrays[0]) - 1, 'num_edges': len(arrays[1]) // 2, 'arrays': {}}
+        for name, array in zip(CACHE_ARRAYS, arrays):
+            file_name = '{}.{}.{}.npy'.format(os.path.basename(graph_path), sha1[:16], name)
+            buffer = io.BytesIO()
+            np.save(buffer, np.ascontiguousarray(array))
+            _atomic_write(os.path.join(CACHE_PATH, file_name), buffer.getvalue())
+            meta['arrays'][name] = file_name
+        _atomic_write(_cache_meta_path(graph_path), json.dumps(meta).encode())
+    except OSError:
+        pass
+
+# write a file atomically by renaming a temporary file into place
+def _atomic_write(path, data):
+    temp_path = '{}.{}.tmp'.format(path, os.getpid())
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+# get the paths of the output files of an experiment
+def get_output_paths(config, OUTPUT_PATH=OUTPUT_PATH, T0_P=None):
+    """
+    Get the paths of the solution and trace files of an experiment
+
+    Parameters
+    ----------
+    config : dict
+        The configuration of the experiment (graph, algorithm, cutoff_time, seed)
+    T0_P : int (None by default)
+        The T0_P of the LS1 experiments, part of the file names if given
+
+    Returns
+    -------
+    solution_path, trace_path : str
+        The paths of the .sol and .trace files
+    """
+    output_file = OUTPUT_PATH + config['graph'] + '_' + config['algorithm'] + '_' \
+        + str(config['cutoff_time']) + '_' + str(config['seed'])
+    if T0_P:
+        output_file += '_' + str(T0_P)
+    return output_file + '.sol', output_file + '.trace'
+
+# write the trace of a run to its trace file
+def write_trace(config, trace, OUTPUT_PATH=OUTPUT_PATH, T0_P=None):
+    """
+    Write the trace of a run (atomically) to its .trace file, see write_output
+    """
+    _, trace_path = get_output_paths(config, OUTPUT_PATH, T0_P)
+    trace_lines = ''.join(','.join(map(str, t)) + '\n' for t in trace)
+    _atomic_write(trace_path, trace_lines.encode())
 
 # write the results to the output file
 def write_output(config, solution, trace, OUTPUT_PATH=OUTPUT_PATH, T0_P=None):
     """
     Write the results to the output file
 
+    Both files are written atomically (to a temporary name, then renamed into place),
+    so an interrupted run never leaves a partial .sol or .trace file behind.
+
     Parameters
     ----------
 
@@ -60,29 +359,11 @@ def write_output(config, solution, trace, OUTPUT_PATH=OUTPUT_PATH, T0_P=None):
         - Quality of the best found solution at that point in time (integer).
 
     """
-    if T0_P:
-        output_file = OUTPUT_PATH + config['graph'] + '_' + config['algorithm'] + '_' \
-                + str(config['cutoff_time']) + '_' + str(config['seed']) + '_' + str(T0_P) +'.sol'
-    else:
-        output_file = OUTPUT_PATH + config['graph'] + '_' + config['algorithm'] + '_' \
-                + str(config['cutoff_time']) + '_' + str(config['seed']) + '.sol'
-    with open(output_file, 'w') as f:
-        # write the solution
-        f.write(str(len(solution)))
-        f.write('\n')
-        f.write(','.join(map(str, solution)))
-    
-    if T0_P:
-        output_file = OUTPUT_PATH + config['graph'] + '_' + config['algorithm'] + '_' \
-                + str(config['cutoff_time']) + '_' + str(config['seed']) + '_' + str(T0_P) +'.trace'
-    else:
-        output_file = OUTPUT_PATH + config['graph'] + '_' + config['algorithm'] + '_' \
-                + str(config['cutoff_time']) + '_' + str(config['seed']) + '.trace'
-    with open(output_file, 'w') as f:
-        # write the trace
-        for t in trace:
-            f.write(','.join(map(str, t)))
-            f.write('\n')
+    solution_path, _ = get_output_paths(config, OUTPUT_PATH, T0_P)
+    # write the trace first: a run is only complete once its solution file exists
+    write_trace(config, trace, OUTPUT_PATH, T0_P)
+    # write the solution
+    _atomic_write(solution_path, (str(len(solution)) + '\n' + ','.join(map(str, solution))).encode())
         
 # load solution and trace from the output file
 def load_solution(sol_file):
@@ -147,9 +428,11 @@ def get_graph_files():
         The list of graph files
 
     """
-    graph_files = os.listdir(DATA_PATH)
-    graph_files = list(filter(lambda x: x.endswith('.graph'), graph_files))
-    graph_files = list(map(lambda x: x.removesuffix('.graph'), graph_files))
+    graph_files = []
+    for file_name in os.listdir(DATA_PATH):
+        for compression in ('',) + tuple(COMPRESSIONS):
+            if file_name.endswith('.graph' + compression):
+                graph_files.append(file_name.removesuffix('.graph' + compression))
     return graph_files
 
 # get all output files in the OUTPUT_PATH
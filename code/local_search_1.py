@@ -1,58 +1,264 @@
 """
 This file contains the implementation of our first choice of Local Search (LS) algorithm for MVC.
 We choose to implement the Simulated Annealing (SA) algorithm.
+
+The state is kept in per-vertex arrays: whether the vertex is in the cover, and its number of
+neighbors out of the cover (free). A flip of v changes the number of uncovered edges by free[v]
+if v is not covered, so its score delta is known in O(1) before committing, a rejected move
+changes nothing, and an accepted move updates free in O(deg(v)).
+
+With replicas > 1, the replica exchange (parallel tempering) mode runs one chain per process at
+fixed temperatures of a geometric ladder, periodically swapping the temperatures of neighboring
+chains, so that no initial temperature has to be tuned; the best covers of all the chains are
+merged into a single trace.
 """
+import multiprocessing as mp
+import multiprocessing.synchronize
+import queue
 import time
 import random
 import math
+from budget import Budget, as_budget
+
+PT_T_MIN = 0.2  # temperature of the coldest replica
+PT_T_MAX = 10  # temperature of the hottest replica
+EXCHANGE_MOVES = 1500  # moves of every replica between two exchange rounds
+
 
-def local_search_1(graph, seed, cutoff_time, T0_P=None):
+class _Chain:
     """
-        local search 1：Simulated Annealing
+    The state of one annealing chain.
+
+    Parameters
+    ----------
+    adj : list of lists
+        adj[i] is the list of the neighbors of the vertex i, the vertices are numbered 0..n-1
+    in_cov : list of bool
+        The initial vertex set
     """
-    def cost_f(num_uncov, num_node):
-        """ 
-            evaluation function 
-            score = 5 * number of uncovered edge + number of covered node
+    def __init__(self, adj, in_cov):
+        self.adj = adj
+        self.in_cov = in_cov
+        self.free = [sum(1 for u in adj[i] if not in_cov[u]) for i in range(len(adj))]
+        self.num_cov = sum(in_cov)
+        self.num_uncov = sum(self.free[i] for i in range(len(adj)) if not in_cov[i]) // 2
+        self.score = _cost(self.num_uncov, self.num_cov)
+        self.best_score = self.score
+        self.solution = in_cov.copy()
+
+    def sweep(self, T, moves):
         """
-        return 5 * num_uncov + num_node
+        Make the given number of moves at the temperature T, return whether a better cover was found
+        """
+        adj, in_cov, free = self.adj, self.in_cov, self.free
+        num_vertices = len(adj)
+        improved = False
+        for _ in range(moves):
+            # pick a random node
+            node = random.randrange(num_vertices)
+            # evaluate the flip of the node before committing it
+            if in_cov[node]:
+                delta_uncov, delta_cov = free[node], -1
+            else:
+                delta_uncov, delta_cov = -free[node], 1
+            gap = _cost(delta_uncov, delta_cov)
+            # decide whether to update solution
+            update = True
+            if gap > 0:
+                p = math.exp(-gap / T)
+                rand = random.uniform(0, 1)
+                update = True if rand < p else False
+            if update:
+                step = 1 if in_cov[node] else -1
+                in_cov[node] = not in_cov[node]
+                for nei in adj[node]:
+                    free[nei] += step
+                self.num_uncov += delta_uncov
+                self.num_cov += delta_cov
+                self.score += gap
+
+            # form a vertex set
+            if not self.num_uncov and self.score < self.best_score:
+                self.best_score = self.score
+                self.solution = in_cov.copy()
+                improved = True
+        return improved
 
-    def prob(gap, t):
-        """ get the prob of updating """
-        p = math.exp(-gap / T)
-        return p
 
-    def empty_init(graph):
+def _cost(num_uncov, num_node):
+    """
+        evaluation function
+        score = 5 * number of uncovered edge + number of covered node
+        (an uncovered edge is counted from both of its ends)
+    """
+    return 5 * 2 * num_uncov + num_node
+
+
+def _replica(adj, labels, seed, in_cov, conn, results, best, deadline, cancel):
+    """
+    One replica of the replica exchange: sweep at the temperature received from the master,
+    send back the score, until the master sends None. Every cover better than the shared best
+    is sent to the master along with its time. The replica stops on its own at the deadline of
+    the master budget or when its cancel event is set, and then sends None instead of its score.
+    """
+    random.seed(seed)
+    budget = Budget(max(0.0, deadline - time.perf_counter()), cancel)
+    chain = _Chain(adj, in_cov.copy())
+    T = conn.recv()
+    while T is not None:
+        if budget.check():
+            conn.send(None)
+            break
+        if chain.sweep(T, EXCHANGE_MOVES):
+            with best.get_lock():
+                improved = chain.best_score < best.value
+                if improved:
+                    best.value = chain.best_score
+            if improved:
+                results.put((time.perf_counter(), [labels[i] for i in range(len(adj)) if chain.solution[i]]))
+        conn.send(chain.score)
+        T = conn.recv()
+    conn.close()
+
+
+def _replica_exchange(adj, labels, seed, in_cov, budget, replicas, trace, on_improve, stats):
+    """
+    Run the replicas on a geometric ladder of temperatures from PT_T_MIN to PT_T_MAX in parallel
+    processes. After every EXCHANGE_MOVES moves, the neighboring temperatures are swapped with
+    probability min(1, exp((1 / T_i - 1 / T_j) * (E_i - E_j))). Every replica starts from in_cov.
+    The replicas share the deadline and the cancel event of the budget, so a race or the scheduler
+    cancelling the run stops them too.
+    """
+    context = mp.get_context()
+    # a threading.Event cannot be shared with the replicas, the master still checks it every round
+    cancel = budget.cancel_event if isinstance(budget.cancel_event, mp.synchronize.Event) else None
+    results = context.Queue()
+    best = context.Value('i', _cost(0, len(adj)) + 1)
+    temperatures = [PT_T_MIN * (PT_T_MAX / PT_T_MIN) ** (k / (replicas - 1)) for k in range(replicas)]
+    pipes, processes = [], []
+    for k in range(replicas):
+        conn, child_conn = context.Pipe()
+        process = context.Process(target=_replica, daemon=True,
+                                  args=(adj, labels, seed * 1000 + k, in_cov, child_conn, results, best,
+                                        budget.deadline, cancel))
+        process.start()
+        pipes.append(conn)
+        processes.append(process)
+    rng = random.Random(seed)
+    # ladder[k] is the replica at the k-th temperature
+    ladder = list(range(replicas))
+    improvements = []
+
+    def drain():
+        while True:
+            try:
+                improvement = results.get_nowait()
+            except queue.Empty:
+                return
+            improvements.append(improvement)
+            if on_improve is not None:
+                on_improve(len(improvement[1]))
+
+    rounds = 0
+    try:
+        for k in range(replicas):
+            pipes[ladder[k]].send(temperatures[k])
+        while True:
+            scores = [conn.recv() for conn in pipes]
+            rounds += 1
+            drain()
+            # None: the replica was stopped by the deadline or the cancel event
+            if budget.check() or None in scores:
+                break
+            for k in range(rng.randrange(2), replicas - 1, 2):
+                i, j = ladder[k], ladder[k + 1]
+                exponent = (1 / temperatures[k] - 1 / temperatures[k + 1]) * (scores[i] - scores[j])
+                if exponent >= 0 or rng.random() < math.exp(exponent):
+                    ladder[k], ladder[k + 1] = j, i
+            for k in range(replicas):
+                pipes[ladder[k]].send(temperatures[k])
+    except (EOFError, OSError):
+        # a replica died (its pipe is closed): stop the others, the covers reported so far are kept
+        print('Replica exchange: a replica process died, stopping the replicas')
+    for conn in pipes:
+        try:
+            conn.send(None)
+        except OSError:
+            pass
+    # keep draining the results, a replica only exits once its reports are flushed
+    while any(process.is_alive() for process in processes):
+        drain()
+        processes[0].join(0.01)
+    drain()
+    # the replicas report concurrently: merge the improvements in time order
+    solution = None
+    for report_time, cover in sorted(improvements, key=lambda improvement: improvement[0]):
+        if len(cover) < trace[-1][1]:
+            # perf_counter is system-wide, so the replica clock reads compare with the budget start
+            trace.append([report_time - budget.start, len(cover)])
+            solution = set(cover)
+    if solution is None:
+        solution = _cover(adj, labels, in_cov, budget, trace)
+    _fill_stats(stats, rounds * EXCHANGE_MOVES * replicas, budget)
+    return solution, trace
+
+
+def _cover(adj, labels, in_cov, budget, trace):
+    """
+    The vertex set as labels; if it is not a cover (no chain reached one, e.g. for lack of time),
+    it is completed by one end of every uncovered edge in O(n + m) and the completed cover is traced
+    """
+    cover = in_cov.copy()
+    for i in range(len(adj)):
+        if not cover[i] and not all(cover[u] for u in adj[i]):
+            cover[i] = True
+    if cover != in_cov:
+        trace.append([budget.elapsed(), sum(cover)])
+    return {labels[i] for i in range(len(adj)) if cover[i]}
+
+
+def _fill_stats(stats, moves, budget):
+    """
+    Record the number of moves and the moves per second in stats (if given)
+    """
+    if stats is not None:
+        elapsed = budget.elapsed()
+        stats['moves'] = moves
+        stats['time'] = elapsed
+        stats['moves_per_second'] = moves / elapsed if elapsed > 0 else float('inf')
+
+
+def local_search_1(graph, seed, cutoff_time, T0_P=None, replicas=1, on_improve=None, initial_cover=None,
+                   stats=None):
+    """
+        local search 1：Simulated Annealing
+        with replicas > 1, replica exchange: the replicas run at fixed temperatures
+        in parallel processes instead of annealing from T0 (T0_P is not used)
+        on_improve (if given) is called with the size of every new best cover
+        initial_cover (if given) is a known vertex cover (labels) to start from instead of the empty set
+        stats (if given) is filled with the number of moves and the moves per second
+    """
+    def empty_init():
         """ initialization: an empty vertex set """
-        all_nodes = graph.get_vertices_set()
-        uncov = set()
-        cov = set()
-        for node in all_nodes:
-            neighbors = graph.get_neighbors_as_list(node)
-            for neighbor in neighbors:
-                uncov.add((node, neighbor))
-        return uncov, cov
-
-    def full_init(graph):
+        return [False] * num_vertices
+
+    def full_init():
         """ initialization: a full vertex set """
-        all_nodes = graph.get_vertices_set()
-        cov = set(list(all_nodes))
-        uncov = set()
-        return uncov, cov
+        return [True] * num_vertices
 
-    def random_init(graph, p=0.3):
+    def cover_init():
+        """ initialization: the initial cover """
+        in_cov = [False] * num_vertices
+        for label in initial_cover:
+            in_cov[position[graph.index_of(label)]] = True
+        return in_cov
+
+    def random_init(p=0.3):
         """ initialization: a vertex set formed randomly """
-        all_nodes = graph.get_vertices_set()
-        num = (1 - p) * len(all_nodes)
-        tmp = set(random.sample(all_nodes, int(num)))  # 70% nodes as uncovered
-        cov = all_nodes - tmp  # covered nodes
-        uncov = set()
-        for node in tmp:
-            neighbors = graph.get_neighbors_as_list(node)
-            for neighbor in neighbors:
-                if neighbor not in cov:
-                    uncov.add((node, neighbor))
-        return uncov, cov
+        in_cov = [False] * num_vertices
+        for i in random.sample(range(num_vertices), int(p * num_vertices)):  # 30% nodes as covered
+            in_cov[i] = True
+        return in_cov
 
     random.seed(seed)
 
@@ -60,9 +266,15 @@ def local_search_1(graph, seed, cutoff_time, T0_P=None):
     Tmin = 1e-3  # min t
     inner_round = 150
 
-    all_nodes, original_v = graph.get_vertices_set(), graph.get_vertices_set()
+    # the alive vertices, numbered 0..n-1, with their CSR adjacency
+    vertices = [v for v in range(len(graph.alive)) if graph.alive[v]]
+    num_vertices = len(vertices)
+    position = [-1] * len(graph.alive)
+    for i, v in enumerate(vertices):
+        position[v] = i
+    adj = [[position[u] for u in graph.neighbors(v) if graph.alive[u]] for v in vertices]
+    labels = graph.labels[vertices].tolist()
     num_whole_edge = graph.get_num_edges()
-    num_whole_node = graph.get_num_nodes()
     # get initial temperature
     if T0_P is None:
         T0 = num_whole_edge * 200 + 1000
@@ -71,52 +283,21 @@ def local_search_1(graph, seed, cutoff_time, T0_P=None):
     T = T0
 
     # initialization
-    uncov, cov = empty_init(graph)
-    score = cost_f(len(uncov), len(cov))
-    best_score = score
-    start_time = time.time()
-    trace = [[time.time() - start_time, score]]
-    solution = cov.copy()
-
-    while (time.time() - start_time) < cutoff_time and T >= Tmin:
-        for _ in range(inner_round):
-            # pick a random node
-            node = random.sample(original_v, 1)[0]
-            former_cov = cov.copy()
-            former_uncov = uncov.copy()
-            # explore neighborhood
-            neighbors = graph.get_neighbors_as_list(node)
-            if node in cov:
-                for nei in neighbors:
-                    if nei not in cov:
-                        uncov.add((node, nei))
-                        uncov.add((nei, node))
-                cov.remove(node)
-            else:
-                for nei in neighbors:
-                    if nei not in cov:
-                        uncov.remove((node, nei))
-                        uncov.remove((nei, node))
-                cov.add(node)
-            # evaluate candidate
-            former_score = score
-            score = cost_f(len(uncov), len(cov))
-            # decide whether to update solution
-            update = True
-            if score > former_score:
-                gap = score - former_score
-                p = prob(gap, T)
-                rand = random.uniform(0, 1)
-                update = True if rand < p else False
-            if not update:
-                # back to last step
-                cov, uncov, score = former_cov, former_uncov, former_score
-            
-            # form a vertex set
-            if not len(uncov):
-                if score < best_score:
-                    best_score = score
-                    trace.append([time.time() - start_time, score])
-                    solution = cov.copy()
+    in_cov = empty_init() if initial_cover is None else cover_init()
+    chain = _Chain(adj, in_cov.copy())
+    budget = as_budget(cutoff_time)
+    trace = [[budget.elapsed(), chain.score]]
+    if replicas > 1:
+        return _replica_exchange(adj, labels, seed, in_cov, budget, replicas, trace, on_improve, stats)
+
+    sweeps = 0
+    while not budget.expired() and T >= Tmin:
+        sweeps += 1
+        if chain.sweep(T, inner_round):
+            trace.append([budget.elapsed(), chain.best_score])
+            if on_improve is not None:
+                on_improve(chain.best_score)
         T *= alpha
+    _fill_stats(stats, sweeps * inner_round, budget)
+    solution = _cover(adj, labels, chain.solution, budget, trace)
     return solution, trace
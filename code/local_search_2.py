@@ -1,29 +1,46 @@
 """
 This file contains the implementation of our second choice of Local Search (LS) algorithm for MVC.
 We choose to implement the Hill Climbing (HC) algorithm.
+
+Every vertex keeps the number of its neighbors out of the cover (free), i.e. the number of edges
+its removal from the cover would uncover: a covered vertex can be removed iff free is 0, an O(1)
+test, and a removal updates the counters of its neighbors in O(deg).
 """
 
 import numpy as np
-import time
 import heapq
+from budget import as_budget
 
-def local_search_2(graph, seed, cutoff_time):
-
-    def check_cover(covered_nodes, graph):
-        for edge in graph.get_edges_set():
-            if covered_nodes[edge[0]-1] + covered_nodes[edge[1]-1] == 0: # Neither of the two ends is covered
-                return False
-        return True
+def local_search_2(graph, seed, cutoff_time, on_improve=None, initial_cover=None, stats=None):
+    # on_improve (if given) is called with the size of every new best cover,
+    # initial_cover (if given) is a known vertex cover (labels) to start from instead of the random one,
+    # stats (if given) is filled with the number of moves (vertices popped) and the moves per second
 
     def convert_to_set(array):
         result = set()
         for i,l in enumerate(array):
-            if l: result.add(i+1)
+            if l: result.add(labels[i])
         return result
 
+    def fill_stats():
+        if stats is not None:
+            elapsed = budget.elapsed()
+            stats['moves'] = moves
+            stats['time'] = elapsed
+            stats['moves_per_second'] = moves / elapsed if elapsed > 0 else float('inf')
+
+    def remove(node):
+        covered_nodes[node] = 0
+        for neighbor in adj[node]:
+            free[neighbor] += 1
+
     np.random.seed(seed)
-    nodes = graph.get_vertices_set()
-    nodes_num = graph.get_num_nodes()
+    # the alive vertices, numbered 0..n-1, with their CSR adjacency
+    vertices = [v for v in range(len(graph.alive)) if graph.alive[v]]
+    position = {v: i for i, v in enumerate(vertices)}
+    adj = [[position[u] for u in graph.neighbors(v) if graph.alive[u]] for v in vertices]
+    labels = graph.labels[vertices].tolist()
+    nodes_num = len(vertices)
 
     # set up different init ratio for network size
     initialize_ratio = 0
@@ -34,39 +51,49 @@ def local_search_2(graph, seed, cutoff_time):
     else:
         initialize_ratio = 0.01
 
-    max_init_iter = 1000
-    i = 0
-    # Try initialization for max iter times
-    while(True):
-        covered_nodes = np.zeros(nodes_num, dtype=int)+1
-        covered_nodes[:int(initialize_ratio*nodes_num)] = 0
-        np.random.shuffle(covered_nodes) # initialization, set some of the nodes to be 0
-
-        if check_cover(covered_nodes, graph):
+    # initialization: all the nodes are covered but a random independent set of the ratio size,
+    # built directly by taking the nodes in random order when none of their neighbors is taken yet
+    covered_nodes = [1] * nodes_num
+    free = [0] * nodes_num
+    to_remove = int(initialize_ratio*nodes_num)
+    if initial_cover is not None and graph.is_cover(initial_cover):
+        # or all the nodes but the ones out of the initial cover (if it is one)
+        in_cover = set(initial_cover)
+        for node in range(nodes_num):
+            if labels[node] not in in_cover:
+                remove(node)
+        to_remove = 0
+    for node in np.random.permutation(nodes_num).tolist():
+        if to_remove == 0:
             break
-        i += 1
-        if i == max_init_iter:
-            print("Initialization Error!")
-            return None
-    
-    heap = [(len(graph.get_neighbors_as_list(node)), node) for node in nodes] # create heap, degree as key
+        if free[node] == 0:
+            remove(node)
+            to_remove -= 1
+
+    heap = [(len(adj[node]), labels[node], node) for node in range(nodes_num)] # create heap, degree as key
     heapq.heapify(heap)
 
-    trace = []
-    start_time = time.time()
+    budget = as_budget(cutoff_time)
+    num_covered = sum(covered_nodes)
+    # the initial vertex set is already a cover
+    trace = [(budget.elapsed(), num_covered)]
+    moves = 0
 
-    while((time.time() - start_time) < cutoff_time):
+    while not budget.expired():
         # every iteration, delete the node with lowest degree
         if len(heap)==0:
+            fill_stats()
             return convert_to_set(covered_nodes), trace
-        min_node = heapq.heappop(heap)[1]
-        if covered_nodes[min_node-1] == 0:
+        min_node = heapq.heappop(heap)[2]
+        moves += 1
+        # the node can be removed iff all its neighbors are covered
+        if covered_nodes[min_node] == 0 or free[min_node] > 0:
             continue
-        covered_nodes[min_node-1] = 0
-
-        if not check_cover(covered_nodes, graph):
-            covered_nodes[min_node-1] = 1 #restore
-        else:
-            trace.append((time.time()-start_time, np.sum(covered_nodes)))
+        remove(min_node)
+        num_covered -= 1
+        trace.append((budget.elapsed(), num_covered))
+        if on_improve is not None:
+            on_improve(num_covered)
     print("Timeout!")
+    fill_stats()
     return convert_to_set(covered_nodes), trace
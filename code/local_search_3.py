@@ -0,0 +1,268 @@
+"""
+This file contains the implementation of our third choice of Local Search (LS) algorithm for MVC.
+We choose to implement a two-stage exchange local search with edge weighting (NuMVC), i.e.
+- two-stage exchange: every step removes a vertex from the cover, then adds an endpoint of a
+  random uncovered edge, instead of swapping a pair of vertices at once;
+- edge weighting: the weight of every uncovered edge grows at every step, the score of a vertex
+  (dscore) is the weight of the uncovered edges its move would cover, minus the weight of the
+  covered edges it would uncover;
+- configuration checking: a vertex outside the cover can only be added if one of its neighbors
+  has moved since it was removed, which avoids cycling;
+- forgetting: once the average weight reaches GAMMA * n, all the weights are scaled by RHO;
+- BMS (best from multiple selections, as in FastVC): on huge graphs the vertex to remove is the
+  best of BMS_SAMPLES random vertices of the cover instead of the best of the whole cover;
+  otherwise the cover is kept in a lazy max-heap of (dscore, -age), so the best vertex is found
+  in O(log n) instead of a scan of the whole cover.
+Every time all the edges are covered, the cover is recorded and its best vertex removed.
+"""
+import heapq
+import random
+from heuristics import best_of
+from budget import as_budget
+
+GAMMA = 0.5  # the weights are forgotten when the average weight reaches GAMMA * n
+RHO = 0.3  # forgetting scale of the weights
+BMS_SAMPLES = 50  # the number of picks of the BMS selection
+BMS_MIN_NODES = 20000  # the BMS selection is used by default for graphs with more nodes
+
+
+def local_search_3(graph, seed, cutoff_time, bms=None, on_improve=None, initial_cover=None, stats=None):
+    """
+    Local Search 3: two-stage exchange with edge weighting, configuration checking and forgetting
+
+    Parameters
+    ----------
+    graph : Graph
+        The graph object of the predefined Graph class
+    seed : int
+        The random seed
+    cutoff_time : int or Budget
+        The cutoff time in seconds
+    bms : int (None by default)
+        The number of picks of the BMS selection, 0 to remove the best vertex of the whole cover,
+        by default BMS_SAMPLES for graphs of more than BMS_MIN_NODES nodes and 0 otherwise
+    on_improve : callable (None by default)
+        Called with the size of every new best cover
+    initial_cover : list (None by default)
+        A known vertex cover (labels) to start from if it is smaller than the heuristic one
+    stats : dict (None by default)
+        Filled with the number of moves (steps) and the moves per second if given
+
+    Returns
+    -------
+    solution : set
+        The best vertex cover found (vertex IDs)
+    trace : list
+        [time, size] of every improvement
+    """
+    random.seed(seed)
+    budget = as_budget(cutoff_time)
+
+    # the alive vertices numbered 0..n-1, every edge has an id and both of its adjacency entries point to it
+    vertices = [v for v in range(len(graph.alive)) if graph.alive[v]]
+    num_nodes = len(vertices)
+    position = {v: i for i, v in enumerate(vertices)}
+    labels = graph.labels[vertices].tolist()
+    adj = [[] for _ in range(num_nodes)]
+    adj_edge = [[] for _ in range(num_nodes)]
+    edge_u, edge_v = [], []
+    for i, v in enumerate(vertices):
+        for u in graph.neighbors(v):
+            if graph.alive[u] and v < u:
+                j = position[u]
+                e = len(edge_u)
+                edge_u.append(i)
+                edge_v.append(j)
+                adj[i].append(j)
+                adj_edge[i].append(e)
+                adj[j].append(i)
+                adj_edge[j].append(e)
+    num_edges = len(edge_u)
+    if bms is None:
+        bms = BMS_SAMPLES if num_nodes > BMS_MIN_NODES else 0
+
+    weight = [1] * num_edges
+    total_weight = num_edges
+    threshold = GAMMA * num_nodes * num_edges
+    dscore = [0] * num_nodes
+    conf_change = [1] * num_nodes
+    age = [0] * num_nodes
+    in_cover = [False] * num_nodes
+    # the cover and the uncovered edges as lists with the position of every member, for O(1) removal
+    cover, cover_pos = [], [-1] * num_nodes
+    uncov, uncov_pos = list(range(num_edges)), list(range(num_edges))
+    # without BMS, the (-dscore, age, v) entries of the cover vertices: an entry is stale once v has left
+    # the cover or its dscore has changed, a new entry is pushed at every change (only add and remove
+    # change the dscores of the cover vertices, the weighting only those of the uncovered edges' ends)
+    heap = []
+
+    def push(v):
+        heapq.heappush(heap, (-dscore[v], age[v], v))
+        if len(heap) > 4 * len(cover) + 64:
+            rebuild_heap()
+
+    def rebuild_heap():
+        heap[:] = [(-dscore[v], age[v], v) for v in cover]
+        heapq.heapify(heap)
+
+    def add(v):
+        in_cover[v] = True
+        cover_pos[v] = len(cover)
+        cover.append(v)
+        dscore[v] = -dscore[v]
+        for u, e in zip(adj[v], adj_edge[v]):
+            conf_change[u] = 1
+            if in_cover[u]:
+                dscore[u] += weight[e]
+                if not bms:
+                    push(u)
+            else:
+                dscore[u] -= weight[e]
+                # e is covered now
+                last = uncov.pop()
+                if last != e:
+                    uncov[uncov_pos[e]] = last
+                    uncov_pos[last] = uncov_pos[e]
+                uncov_pos[e] = -1
+        if not bms:
+            push(v)
+
+    def remove(v):
+        in_cover[v] = False
+        last = cover.pop()
+        if last != v:
+            cover[cover_pos[v]] = last
+            cover_pos[last] = cover_pos[v]
+        cover_pos[v] = -1
+        dscore[v] = -dscore[v]
+        conf_change[v] = 0
+        for u, e in zip(adj[v], adj_edge[v]):
+            conf_change[u] = 1
+            if in_cover[u]:
+                dscore[u] -= weight[e]
+                if not bms:
+                    push(u)
+            else:
+                dscore[u] += weight[e]
+                # e is uncovered now
+                uncov_pos[e] = len(uncov)
+                uncov.append(e)
+
+    def select_from_cover(tabu):
+        """ the vertex of the cover with the highest dscore (oldest first), other than tabu """
+        if not bms:
+            return pop_best(tabu)
+        candidates = (cover[random.randrange(len(cover))] for _ in range(bms))
+        best, best_key = -1, None
+        for v in candidates:
+            if v == tabu:
+                continue
+            key = (dscore[v], -age[v])
+            if best_key is None or key > best_key:
+                best, best_key = v, key
+        return best if best != -1 else tabu
+
+    def pop_best(tabu):
+        """ the best entry of the heap other than tabu, the stale entries on top are dropped """
+        skipped = None
+        best = tabu
+        while heap:
+            key, v_age, v = heap[0]
+            if not in_cover[v] or -key != dscore[v] or v_age != age[v]:
+                heapq.heappop(heap)
+            elif v == tabu:
+                skipped = heapq.heappop(heap)
+            else:
+                best = v
+                break
+        if skipped is not None:
+            heapq.heappush(heap, skipped)
+        return best
+
+    def forget():
+        """ scale all the weights by RHO and recompute the dscores """
+        nonlocal total_weight
+        for v in range(num_nodes):
+            dscore[v] = 0
+        total_weight = 0
+        for e in range(num_edges):
+            w = max(1, int(RHO * weight[e]))
+            weight[e] = w
+            total_weight += w
+            u, v = edge_u[e], edge_v[e]
+            if in_cover[u] != in_cover[v]:
+                # only one end covers e: it would lose e
+                dscore[u if in_cover[u] else v] -= w
+            elif not in_cover[u]:
+                dscore[u] += w
+                dscore[v] += w
+        if not bms:
+            rebuild_heap()
+
+    # initialization: the constructive heuristics give the initial cover
+    for e in range(num_edges):
+        dscore[edge_u[e]] += 1
+        dscore[edge_v[e]] += 1
+    initial, _ = best_of(graph, budget)
+    if initial_cover is not None and len(initial_cover) < len(initial) and graph.is_cover(initial_cover):
+        initial = initial_cover
+    for label in initial:
+        add(position[graph.index_of(label)])
+    best_cover = in_cover.copy()
+    best_size = len(cover)
+    trace = [[budget.elapsed(), best_size]]
+    if on_improve is not None:
+        on_improve(best_size)
+
+    step = 0
+    tabu = -1
+    while cover and not budget.expired():
+        step += 1
+        if not uncov:
+            # a cover: record it, then look for a smaller one
+            if len(cover) < best_size:
+                best_size = len(cover)
+                best_cover = in_cover.copy()
+                trace.append([budget.elapsed(), best_size])
+                if on_improve is not None:
+                    on_improve(best_size)
+            v = select_from_cover(-1)
+            remove(v)
+            age[v] = step
+            continue
+
+        # stage 1: remove the best vertex of the cover
+        u = select_from_cover(tabu)
+        remove(u)
+        age[u] = step
+
+        # stage 2: add the best endpoint of a random uncovered edge, whose configuration has changed
+        e = uncov[random.randrange(len(uncov))]
+        a, b = edge_u[e], edge_v[e]
+        if not conf_change[a]:
+            v = b
+        elif not conf_change[b]:
+            v = a
+        else:
+            v = a if (dscore[a], -age[a]) > (dscore[b], -age[b]) else b
+        # the age first: add pushes the heap entry of v
+        age[v] = step
+        add(v)
+        tabu = v
+
+        # edge weighting with forgetting
+        for e in uncov:
+            weight[e] += 1
+            dscore[edge_u[e]] += 1
+            dscore[edge_v[e]] += 1
+        total_weight += len(uncov)
+        if total_weight >= threshold:
+            forget()
+
+    if stats is not None:
+        elapsed = budget.elapsed()
+        stats['moves'] = step
+        stats['time'] = elapsed
+        stats['moves_per_second'] = step / elapsed if elapsed > 0 else float('inf')
+    solution = {labels[v] for v in range(num_nodes) if best_cover[v]}
+    return solution, trace
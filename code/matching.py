@@ -0,0 +1,298 @@
+"""
+This file contains the implementation of maximum bipartite matching, used by the reductions and the lower bounds for MVC.
+We choose to implement the Hopcroft-Karp algorithm, which runs in O(m * sqrt(n)).
+On the bipartite double cover of the graph, a maximum matching gives the half-integral optimum of
+the LP relaxation of MVC, hence the Nemhauser-Trotter kernel (lp_kernel) and a lower bound that
+Branch-and-Bound can maintain incrementally (MatchingBound).
+"""
+
+
+def hopcroft_karp(adj, num_right, match_left=None, match_right=None):
+    """
+    Maximum matching of a bipartite graph by the Hopcroft-Karp algorithm.
+
+    Parameters
+    ----------
+    adj : list of lists
+        adj[u] is the list of right vertices adjacent to the left vertex u
+    num_right : int
+        The number of right vertices
+    match_left, match_right : list (None by default)
+        A matching to start from (it is extended in place), empty by default
+
+    Returns
+    -------
+    match_left : list
+        match_left[u] is the right vertex matched to u, -1 if u is free
+    match_right : list
+        match_right[v] is the left vertex matched to v, -1 if v is free
+
+    """
+    num_left = len(adj)
+    if match_left is None:
+        match_left = [-1] * num_left
+        match_right = [-1] * num_right
+    while True:
+        # BFS from the free left vertices builds the layered graph of shortest augmenting paths
+        dist = [-1] * num_left
+        queue = [u for u in range(num_left) if match_left[u] == -1]
+        for u in queue:
+            dist[u] = 0
+        found = False
+        head = 0
+        while head < len(queue):
+            u = queue[head]
+            head += 1
+            for v in adj[u]:
+                w = match_right[v]
+                if w == -1:
+                    found = True
+                elif dist[w] == -1:
+                    dist[w] = dist[u] + 1
+                    queue.append(w)
+        if not found:
+            return match_left, match_right
+        # iterative DFS along the layers finds a maximal set of vertex-disjoint augmenting paths
+        pointer = [0] * num_left
+        for root in range(num_left):
+            if match_left[root] != -1 or dist[root] != 0:
+                continue
+            stack = [root]
+            while stack:
+                u = stack[-1]
+                if pointer[u] < len(adj[u]):
+                    v = adj[u][pointer[u]]
+                    pointer[u] += 1
+                    w = match_right[v]
+                    if w == -1:
+                        # augment: every left vertex on the stack takes the right vertex it went through
+                        for x in stack:
+                            r = adj[x][pointer[x] - 1]
+                            match_left[x] = r
+                            match_right[r] = x
+                        break
+                    if dist[w] == dist[u] + 1:
+                        stack.append(w)
+                else:
+                    # dead end, drop u from the layered graph
+                    dist[u] = -1
+                    stack.pop()
+
+
+def lp_relaxation(adj, active=None):
+    """
+    Half-integral optimum of the LP relaxation of MVC from a maximum matching of the bipartite double cover.
+
+    The double cover has a left and a right copy of every vertex and the edges (u_L, v_R), (v_L, u_R)
+    for every edge (u, v). By Konig's theorem its minimum vertex cover C has the size of its maximum
+    matching M, and x_v = (|{v_L, v_R} & C|) / 2 is an optimal LP solution with value |M| / 2.
+
+    Parameters
+    ----------
+    adj : list of iterables
+        adj[v] contains the neighbors of v
+    active : list of bool (None by default)
+        Only the subgraph induced by the active vertices is considered, all vertices by default
+
+    Returns
+    -------
+    x : list
+        2 * x_v for every vertex, i.e. 0, 1 (x_v = 1/2) or 2; inactive vertices get 0
+    matching_size : int
+        The size of the maximum matching of the double cover, the LP optimum is matching_size / 2
+
+    """
+    num_nodes = len(adj)
+    if active is None:
+        active = [True] * num_nodes
+    left_adj = [[u for u in adj[v] if active[u]] if active[v] else [] for v in range(num_nodes)]
+    match_left, match_right = hopcroft_karp(left_adj, num_nodes)
+    # alternating BFS from the free left vertices: Z_L and Z_R
+    reached_left = [False] * num_nodes
+    reached_right = [False] * num_nodes
+    queue = [v for v in range(num_nodes) if active[v] and match_left[v] == -1]
+    for v in queue:
+        reached_left[v] = True
+    head = 0
+    while head < len(queue):
+        v = queue[head]
+        head += 1
+        for u in left_adj[v]:
+            if not reached_right[u]:
+                reached_right[u] = True
+                w = match_right[u]
+                if w != -1 and not reached_left[w]:
+                    reached_left[w] = True
+                    queue.append(w)
+    # C = (L \ Z_L) | (R & Z_R)
+    x = [(not reached_left[v]) + reached_right[v] if active[v] else 0 for v in range(num_nodes)]
+    matching_size = sum(1 for v in range(num_nodes) if match_left[v] != -1)
+    return x, matching_size
+
+
+def lp_kernel(graph):
+    """
+    Nemhauser-Trotter kernel of the graph: there is a minimum vertex cover containing every vertex
+    with x_v = 1 and no vertex with x_v = 0, so only the vertices with x_v = 1/2 remain to be decided.
+
+    Parameters
+    ----------
+    graph : Graph
+        The graph object of the predefined Graph class
+
+    Returns
+    -------
+    ones : list
+        The vertices fixed into the cover
+    zeros : list
+        The vertices fixed out of the cover
+    halves : list
+        The vertices of the kernel
+    lower_bound : int
+        The LP lower bound ceil(|M| / 2) on the size of a minimum vertex cover
+
+    """
+    indptr, indices = graph.indptr.tolist(), graph.indices.tolist()
+    adj = [indices[indptr[v]:indptr[v + 1]] for v in range(len(indptr) - 1)]
+    x, matching_size = lp_relaxation(adj, graph.alive.tolist())
+    labels = graph.labels.tolist()
+    alive = graph.alive.tolist()
+    ones = [labels[v] for v in range(len(x)) if alive[v] and x[v] == 2]
+    zeros = [labels[v] for v in range(len(x)) if alive[v] and x[v] == 0]
+    halves = [labels[v] for v in range(len(x)) if alive[v] and x[v] == 1]
+    return ones, zeros, halves, (matching_size + 1) // 2
+
+
+class MatchingBound:
+    """
+    Incremental matching lower bound for Branch-and-Bound.
+
+    Any matching M of the bipartite double cover of the residual graph proves that every vertex
+    cover of the residual graph has at least ceil(|M| / 2) vertices, M does not need to be maximum.
+    Removing a vertex only drops the (at most two) matched pairs of its copies; bound() then tries
+    to re-augment from the freed left copies with a bounded search, so it stays cheap after each
+    branching decision. Every change is recorded on a trail, undo(mark) restores the exact state.
+
+    Parameters
+    ----------
+    indptr, indices : list
+        The CSR arrays of the graph (as lists)
+    alive : list of bool
+        The vertices of the residual graph, copied
+    budget : int (64 by default)
+        The maximum number of vertices one augmenting path search may visit
+    """
+    def __init__(self, indptr, indices, alive, budget=64):
+        self.indptr = indptr
+        self.indices = indices
+        self.alive = list(alive)
+        self.budget = budget
+        adj = [indices[indptr[v]:indptr[v + 1]] for v in range(len(indptr) - 1)]
+        left_adj = [[u for u in adj[v] if self.alive[u]] if self.alive[v] else [] for v in range(len(adj))]
+        self.match_left, self.match_right = hopcroft_karp(left_adj, len(adj))
+        self.size = sum(1 for m in self.match_left if m != -1)
+        self.trail = []
+        # left copies and right copies freed since the last bound()
+        self.dirty_left = []
+        self.dirty_right = []
+
+    # the current lower bound on the vertex cover of the residual graph
+    def bound(self):
+        alive, match_left, match_right = self.alive, self.match_left, self.match_right
+        if self.dirty_right:
+            # a freed right copy is matched directly to a free neighbor, if any
+            dirty, self.dirty_right = self.dirty_right, []
+            for r in dirty:
+                if not alive[r] or match_right[r] != -1:
+                    continue
+                for k in range(self.indptr[r], self.indptr[r + 1]):
+                    l = self.indices[k]
+                    if alive[l] and match_left[l] == -1:
+                        self._set(l, r, r, l)
+                        self.size += 1
+                        break
+        if self.dirty_left:
+            dirty, self.dirty_left = self.dirty_left, []
+            for l in dirty:
+                if alive[l] and match_left[l] == -1:
+                    self._augment(l)
+        return (self.size + 1) // 2
+
+    # remove the vertex v from the residual graph
+    def remove(self, v):
+        alive, match_left, match_right, trail = self.alive, self.match_left, self.match_right, self.trail
+        alive[v] = False
+        trail.append((0, v, True))
+        r = match_left[v]
+        if r != -1:
+            self._set(v, -1, r, -1)
+            self.size -= 1
+            self.dirty_right.append(r)
+        l = match_right[v]
+        if l != -1:
+            self._set(l, -1, v, -1)
+            self.size -= 1
+            self.dirty_left.append(l)
+
+    # the position on the trail to undo to
+    def mark(self):
+        return len(self.trail), self.size
+
+    # undo every change made after the mark
+    def undo(self, mark):
+        position, size = mark
+        alive, match_left, match_right, trail = self.alive, self.match_left, self.match_right, self.trail
+        while len(trail) > position:
+            kind, a, b = trail.pop()
+            if kind == 0:
+                alive[a] = b
+            elif kind == 1:
+                match_left[a] = b
+            else:
+                match_right[a] = b
+        self.size = size
+        self.dirty_left = []
+        self.dirty_right = []
+
+    # set match_left[l] and match_right[r], recording the old values on the trail
+    def _set(self, l, new_right, r, new_left):
+        if l != -1:
+            self.trail.append((1, l, self.match_left[l]))
+            self.match_left[l] = new_right
+        if r != -1:
+            self.trail.append((2, r, self.match_right[r]))
+            self.match_right[r] = new_left
+
+    # bounded DFS for an augmenting path from the free left copy of root
+    def _augment(self, root):
+        indptr, indices, alive = self.indptr, self.indices, self.alive
+        match_right = self.match_right
+        visited = {root}
+        # stack of (left vertex, position in its neighbor list)
+        stack = [[root, indptr[root]]]
+        path = []
+        while stack and len(visited) <= self.budget:
+            frame = stack[-1]
+            l, k = frame
+            if k == indptr[l + 1]:
+                stack.pop()
+                if path:
+                    path.pop()
+                continue
+            frame[1] += 1
+            r = indices[k]
+            if not alive[r]:
+                continue
+            w = match_right[r]
+            if w == -1:
+                path.append(r)
+                # flip the path: stack[i] gets matched to path[i]
+                for (left, _), right in zip(stack, path):
+                    self._set(left, right, right, left)
+                self.size += 1
+                return True
+            if w not in visited and alive[w]:
+                visited.add(w)
+                path.append(r)
+                stack.append([w, indptr[w]])
+        return False
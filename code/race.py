@@ -0,0 +1,124 @@
+"""
+This file contains the race of seeded local search runs on one graph.
+
+N runs of the same LS algorithm with different seeds start at once, one process each, on the graph
+published in shared memory (see shared_graph.py). The size of the global incumbent is a shared value:
+a run only reports the covers that beat it to the parent, which keeps the global incumbent and stops all the runs (through the cancel event of their shared Budget)
+as soon as one of them reaches the target, i.e. a known optimum or a proven lower bound, or when the
+incumbent has not improved for the stagnation budget. The result is the best cover of all the runs,
+the trace of the incumbent, and the cover and trace of every seed.
+"""
+
+import queue
+import multiprocessing as mp
+from budget import Budget
+from local_search_1 import local_search_1
+from local_search_2 import local_search_2
+from local_search_3 import local_search_3
+from shared_graph import publish, attach, _unlink
+
+RACE_ALGORITHMS = {'LS1': local_search_1, 'LS2': local_search_2, 'LS3': local_search_3}
+
+POLL_INTERVAL = 0.05  # the time in seconds between two checks of the stagnation budget
+
+
+def race(graph, algorithm, seeds, cutoff_time, target=None, stagnation=None, initial_cover=None):
+    """
+    Race seeded runs of a local search algorithm in parallel processes
+
+    Parameters
+    ----------
+    graph : Graph
+        The graph object of the predefined Graph class
+    algorithm : str
+        The name of the algorithm, a key of RACE_ALGORITHMS
+    seeds : list
+        The seeds of the runs, one process each
+    cutoff_time : float
+        The cutoff time in seconds, shared by all the runs
+    target : int (None by default)
+        A cover size no run can beat (a known optimum or a lower bound): the race stops when it is reached
+    stagnation : float (None by default)
+        The race stops when the incumbent has not improved for this many seconds
+    initial_cover : list (None by default)
+        A known vertex cover (labels) every run starts from
+
+    Returns
+    -------
+    solution : list
+        The best cover found by the runs
+    trace : list
+        The (time, size) improvements of the global incumbent
+    seed_results : dict
+        The (solution, trace) of every seed
+    """
+    context = mp.get_context()
+    budget = Budget(cutoff_time, cancel=context.Event())
+    results = context.Queue()
+    incumbent = context.Value('q', graph.get_num_nodes() + 1)
+    shm, handle = publish(graph)
+    processes = []
+    try:
+        for seed in seeds:
+            process = context.Process(target=_racer, args=(handle, algorithm, seed, budget, results, incumbent,
+                                                           initial_cover))
+            process.start()
+            processes.append(process)
+        improvements, finished = [], {}
+        best, last_improvement = None, 0.0
+        while len(finished) < len(processes):
+            try:
+                message = results.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                message = None
+                if any(process.exitcode not in (None, 0) for process in processes):
+                    raise RuntimeError('a race process died without its result')
+            if message is not None and message[0] == 'improve':
+                _, elapsed, seed, size = message
+                if best is None or size < best:
+                    best, last_improvement = size, elapsed
+                    improvements.append((elapsed, size))
+                    if target is not None and size <= target:
+                        print('Seed {} reached the target {} in {:.2f} s'.format(seed, target, elapsed))
+                        budget.cancel()
+            elif message is not None:
+                _, seed, solution, seed_trace = message
+                finished[seed] = (solution, seed_trace)
+            if stagnation is not None and not budget.done and budget.elapsed() - last_improvement > stagnation:
+                print('No improvement for {} s, stopping the race'.format(stagnation))
+                budget.cancel()
+        budget.cancel()
+        for process in processes:
+            process.join()
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        _unlink(shm)
+    solution = min((solution for solution, _ in finished.values()), key=len)
+    # the messages of different runs may arrive out of order: keep the strict improvements in time order
+    trace = []
+    for elapsed, size in sorted(improvements):
+        if not trace or size < trace[-1][1]:
+            trace.append([elapsed, size])
+    return solution, trace, {seed: finished[seed] for seed in seeds}
+
+
+# run one seed of the race in its own process on the shared graph
+def _racer(handle, algorithm, seed, budget, results, incumbent, initial_cover):
+    graph = attach(handle)
+
+    def on_improve(size):
+        # a racy read is enough to skip most of the covers, the lock settles the close calls
+        if size >= incumbent.value:
+            return
+        with incumbent.get_lock():
+            if size >= incumbent.value:
+                return
+            incumbent.value = size
+        results.put(('improve', budget.elapsed(), seed, size))
+
+    solution, trace = RACE_ALGORITHMS[algorithm](graph.copy(), seed, budget, on_improve=on_improve,
+                                                 initial_cover=initial_cover)
+    results.put(('done', seed, sorted(solution), trace))
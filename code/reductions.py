@@ -0,0 +1,261 @@
+"""
+This file contains the kernelization (reduction) stage applied to the graph before a solver runs.
+The following reduction rules are applied exhaustively:
+- degree-0: an isolated vertex is never needed in the cover;
+- degree-1: the neighbor of a leaf can always be put into the cover;
+- degree-2: the two neighbors of a degree-2 vertex in a triangle go into the cover, otherwise
+  the vertex and its two neighbors are folded into a single new vertex;
+- dominance: if N[v] is a subset of N[u] for a neighbor u of v, u can be put into the cover;
+- crown: a crown (I, H) found from a maximal matching, H can be put into the cover;
+- lp: the Nemhauser-Trotter reduction, the vertices with x_v = 1 in the half-integral LP optimum
+  can be put into the cover and the ones with x_v = 0 removed.
+Every rule keeps the undo information, so that a cover of the reduced graph can be lifted
+back to a cover of the original graph of size |cover| + offset.
+"""
+
+import time
+from graph import Graph
+from matching import hopcroft_karp, lp_relaxation
+
+REDUCTION_RULES = ('degree0', 'degree1', 'degree2', 'dominance', 'crown', 'lp')
+
+
+class Reduction:
+    """
+    The result of the reduction stage.
+
+    Attributes
+    ----------
+    graph : Graph
+        The reduced graph, relabelled 1..n'
+    offset : int
+        The number of vertices the lift adds to any cover of the reduced graph
+    stats : dict
+        The number of vertices each rule removed from the graph
+    """
+    def __init__(self, graph, origin, forced, folds, labels, stats):
+        self.graph = graph
+        # origin[i] is the internal id (original index or fold id) of the reduced vertex i
+        self.origin = origin
+        # internal ids put into the cover by the rules
+        self.forced = forced
+        # (v, a, b, w) for every degree-2 fold of v with its neighbors a and b into w, in order
+        self.folds = folds
+        self.labels = labels
+        self.stats = stats
+        self.offset = len(forced) + len(folds)
+        self.time = 0.0
+
+    def lift(self, solution):
+        """
+        Lift a cover of the reduced graph back to a cover of the original graph
+
+        Parameters
+        ----------
+        solution : list
+            A vertex cover of the reduced graph (vertex IDs of the reduced graph)
+
+        Returns
+        -------
+        solution : list
+            A vertex cover of the original graph (vertex IDs of the original graph)
+        """
+        cover = {self.origin[self.graph.index_of(node)] for node in solution}
+        cover.update(self.forced)
+        # undo the folds in the reverse order: the folded vertex stands for both of its neighbors
+        for v, a, b, w in reversed(self.folds):
+            if w in cover:
+                cover.remove(w)
+                cover.add(a)
+                cover.add(b)
+            else:
+                cover.add(v)
+        return sorted(self.labels[v] for v in cover)
+
+    def lift_trace(self, trace):
+        """
+        Shift the trace of the reduced graph to the original graph: the qualities by the offset
+        and the timestamps by the time spent in the reduction
+        """
+        return [[t + self.time, quality + self.offset] for t, quality in trace]
+
+    def report(self):
+        """
+        Summarize how much of the graph each rule removed
+        """
+        removed = ', '.join('{}: {}'.format(rule, count) for rule, count in self.stats.items())
+        return 'Reduced to {} nodes, {} edges (offset {}); removed {}'.format(
+            self.graph.get_num_nodes(), self.graph.get_num_edges(), self.offset, removed)
+
+
+def reduce_graph(graph, rules=REDUCTION_RULES):
+    """
+    Apply the reduction rules exhaustively to the graph
+
+    Parameters
+    ----------
+    graph : Graph
+        The graph object of the predefined Graph class, it is not modified
+    rules : tuple
+        The subset of REDUCTION_RULES to apply
+
+    Returns
+    -------
+    reduction : Reduction
+        The reduced graph with the information to lift its solutions back
+    """
+    start_time = time.perf_counter()
+    indptr, indices = graph.indptr.tolist(), graph.indices.tolist()
+    alive = graph.alive.tolist()
+    adj = [{u for u in indices[indptr[v]:indptr[v + 1]] if alive[u]} if alive[v] else set()
+           for v in range(len(alive))]
+    removed = [not a for a in alive]
+    labels = graph.labels.tolist()
+    forced, folds = [], []
+    stats = {rule: 0 for rule in rules}
+
+    def remove(v):
+        removed[v] = True
+        for u in adj[v]:
+            adj[u].discard(v)
+            worklist.append(u)
+        adj[v] = set()
+
+    def take(v):
+        forced.append(v)
+        remove(v)
+
+    def fold(v, a, b):
+        w = len(adj)
+        nbrs = (adj[a] | adj[b]) - {v, a, b}
+        for u in (v, a, b):
+            remove(u)
+        adj.append(nbrs)
+        removed.append(False)
+        for u in nbrs:
+            adj[u].add(w)
+        worklist.append(w)
+        folds.append((v, a, b, w))
+
+    worklist = list(range(len(adj) - 1, -1, -1))
+    changed = True
+    while changed:
+        changed = False
+        # degree rules, driven by a worklist of the vertices whose degree changed
+        while worklist:
+            v = worklist.pop()
+            if removed[v]:
+                continue
+            degree = len(adj[v])
+            if degree == 0 and 'degree0' in stats:
+                remove(v)
+                stats['degree0'] += 1
+            elif degree == 1 and 'degree1' in stats:
+                take(next(iter(adj[v])))
+                remove(v)
+                stats['degree1'] += 2
+            elif degree == 2 and 'degree2' in stats:
+                a, b = adj[v]
+                if b in adj[a]:
+                    take(a)
+                    take(b)
+                    remove(v)
+                    stats['degree2'] += 3
+                else:
+                    fold(v, a, b)
+                    stats['degree2'] += 2
+        if 'dominance' in stats:
+            for v in range(len(adj)):
+                if removed[v]:
+                    continue
+                for u in adj[v]:
+                    if len(adj[u]) >= len(adj[v]) and adj[v] - {u} <= adj[u]:
+                        take(u)
+                        stats['dominance'] += 1
+                        changed = True
+                        break
+        if not changed and not worklist and 'crown' in stats:
+            num_removed = _crown(adj, removed, take, remove)
+            stats['crown'] += num_removed
+            changed = num_removed > 0
+        if not changed and not worklist and 'lp' in stats:
+            num_removed = _nemhauser_trotter(adj, removed, take, remove)
+            stats['lp'] += num_removed
+            changed = num_removed > 0
+        changed = changed or bool(worklist)
+
+    # build the reduced graph, relabelled 1..n'
+    origin = [v for v in range(len(adj)) if not removed[v]]
+    position = {v: i for i, v in enumerate(origin)}
+    src = [position[v] for v in origin for u in adj[v] if v < u]
+    dst = [position[u] for v in origin for u in adj[v] if v < u]
+    reduced = Graph.from_edges(len(origin), src, dst)
+    # fold ids have no label of their own, they never reach the lifted solution
+    labels += [None] * (len(adj) - len(labels))
+    reduction = Reduction(reduced, origin, forced, folds, labels, stats)
+    reduction.time = time.perf_counter() - start_time
+    return reduction
+
+
+# find and apply a crown reduction, return the number of removed vertices
+def _crown(adj, removed, take, remove):
+    """
+    Crown reduction from a maximal matching.
+
+    The vertices O left free by a maximal matching are independent. A maximum matching M
+    between O and N(O) is computed; starting from the vertices I of O that M leaves free,
+    I is grown by the M-partners of H = N(I) until it is stable. Then (I, H) is a crown,
+    H can be put into the cover and I removed.
+    """
+    matched = [False] * len(adj)
+    for v in range(len(adj)):
+        if removed[v] or matched[v]:
+            continue
+        for u in adj[v]:
+            if not matched[u]:
+                matched[u] = matched[v] = True
+                break
+    outsiders = [v for v in range(len(adj)) if not removed[v] and not matched[v]]
+    if not outsiders:
+        return 0
+    # maximum matching between O (left) and N(O) (right)
+    right = {}
+    left_adj = []
+    for v in outsiders:
+        left_adj.append([right.setdefault(u, len(right)) for u in adj[v]])
+    match_left, match_right = hopcroft_karp(left_adj, len(right))
+    right_vertices = [None] * len(right)
+    for u, r in right.items():
+        right_vertices[r] = u
+    if all(m != -1 for m in match_right):
+        crown = set(range(len(outsiders)))
+    else:
+        crown = {i for i, m in enumerate(match_left) if m == -1}
+        if not crown:
+            return 0
+        frontier = list(crown)
+        while frontier:
+            head = set()
+            for i in frontier:
+                head.update(left_adj[i])
+            frontier = [match_right[r] for r in head if match_right[r] != -1 and match_right[r] not in crown]
+            crown.update(frontier)
+    head = {right_vertices[r] for i in crown for r in left_adj[i]}
+    for u in head:
+        take(u)
+    for i in crown:
+        remove(outsiders[i])
+    return len(head) + len(crown)
+
+
+# apply the Nemhauser-Trotter reduction, return the number of removed vertices
+def _nemhauser_trotter(adj, removed, take, remove):
+    x, _ = lp_relaxation(adj, [not r for r in removed])
+    ones = [v for v in range(len(adj)) if not removed[v] and x[v] == 2]
+    zeros = [v for v in range(len(adj)) if not removed[v] and x[v] == 0]
+    for v in ones:
+        take(v)
+    # the vertices with x_v = 0 only have neighbors with x_v = 1, so they are isolated by now
+    for v in zeros:
+        remove(v)
+    return len(ones) + len(zeros)
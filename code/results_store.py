@@ -0,0 +1,266 @@
+"""
+This file contains the results store: an append-only SQLite database of the runs (configuration, solution
+and trace), which replaces the two small text files per run of io_utils.write_output for the experiment grid.
+
+The database is in WAL mode, so the worker processes of a sweep append concurrently (every run is one short
+transaction) while readers keep reading. A run is one row; its solution and trace are stored column-wise as
+the raw bytes of numpy arrays (solution: int64 labels, trace: float64 times and int64 qualities), so a whole
+sweep is loaded as one DataFrame by a single query and a few np.frombuffer calls, without parsing any text.
+A rerun of an experiment appends a new row, the queries only see the latest run of every experiment.
+
+The legacy layout can be exported (export_files) to, and imported (import_files) from, the output folder.
+"""
+
+import os
+import time
+import sqlite3
+import numpy as np
+import pandas as pd
+from io_utils import OUTPUT_PATH, write_output
+
+RESULTS_DB_PATH = OUTPUT_PATH + 'results.sqlite'
+T0_P_DIR = 'Exp_T0_P/'  # the subfolder of the legacy layout holding the runs with a T0_P
+BUSY_TIMEOUT = 60  # the time in seconds a writer waits for the lock of the database
+
+RUN_COLUMNS = ['run_id', 'graph', 'algorithm', 'cutoff_time', 'seed', 'T0_P', 'quality', 'time', 'created']
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    graph TEXT NOT NULL,
+    algorithm TEXT NOT NULL,
+    cutoff_time NUMERIC NOT NULL,
+    seed NUMERIC NOT NULL,
+    T0_P INTEGER NOT NULL,
+    quality INTEGER NOT NULL,
+    time REAL NOT NULL,
+    created REAL NOT NULL,
+    solution BLOB NOT NULL,
+    trace_time BLOB NOT NULL,
+    trace_quality BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_experiment ON runs (graph, algorithm, cutoff_time, seed, T0_P);
+CREATE VIEW IF NOT EXISTS latest_runs AS
+    SELECT * FROM runs WHERE run_id IN
+        (SELECT MAX(run_id) FROM runs GROUP BY graph, algorithm, cutoff_time, seed, T0_P);
+'''
+
+
+class ResultsStore:
+    """
+    The append-only store of the runs
+
+    Parameters
+    ----------
+    path : str (RESULTS_DB_PATH by default)
+        The path of the SQLite database, created on first use
+    """
+    def __init__(self, path=RESULTS_DB_PATH):
+        self.path = path
+
+    def _connect(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.executescript(_SCHEMA)
+        return connection
+
+    def append(self, config, solution, trace, T0_P=None):
+        """
+        Append a run
+
+        Parameters
+        ----------
+        config : dict
+            The configuration of the experiment (graph, algorithm, cutoff_time, seed)
+        solution : list
+            The vertex cover
+        trace : list
+            The (time, quality) pairs of the run
+        T0_P : int (None by default)
+            The T0_P of the LS1 experiments
+        """
+        trace = np.asarray(trace, dtype=np.float64).reshape(-1, 2)
+        row = (config['graph'], config['algorithm'], config['cutoff_time'], config['seed'], T0_P or 0,
+               len(solution), float(trace[-1, 0]) if len(trace) else 0.0, time.time(),
+               np.asarray(sorted(solution), dtype=np.int64).tobytes(),
+               np.ascontiguousarray(trace[:, 0]).tobytes(), trace[:, 1].astype(np.int64).tobytes())
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute('INSERT INTO runs (graph, algorithm, cutoff_time, seed, T0_P, quality, time, '
+                                   'created, solution, trace_time, trace_quality) '
+                                   'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', row)
+        finally:
+            connection.close()
+
+    def _query(self, sql, parameters=()):
+        connection = self._connect()
+        try:
+            return connection.execute(sql, parameters).fetchall()
+        finally:
+            connection.close()
+
+    def contains(self, config, T0_P=None):
+        """
+        Whether the experiment has a run in the store
+        """
+        return bool(self._query('SELECT 1 FROM runs WHERE graph = ? AND algorithm = ? AND cutoff_time = ? '
+                                'AND seed = ? AND T0_P = ? LIMIT 1', _key(config, T0_P)))
+
+    def experiments(self):
+        """
+        The set of the (graph, algorithm, cutoff_time, seed, T0_P) experiments with a run, T0_P is None if unset
+        """
+        rows = self._query('SELECT DISTINCT graph, algorithm, cutoff_time, seed, T0_P FROM runs')
+        return {(graph, algorithm, cutoff_time, seed, T0_P or None)
+                for graph, algorithm, cutoff_time, seed, T0_P in rows}
+
+    def load_runs(self, **where):
+        """
+        Load the latest run of every experiment as a DataFrame
+
+        Parameters
+        ----------
+        where : dict
+            Equality filters on the columns of RUN_COLUMNS, e.g. algorithm='LS1'
+
+        Returns
+        -------
+        runs : pandas.DataFrame
+            One row per run with the columns RUN_COLUMNS, T0_P is 0 if unset
+        """
+        sql, parameters = _select(RUN_COLUMNS, where)
+        return pd.DataFrame(self._query(sql, parameters), columns=RUN_COLUMNS)
+
+    def load_traces(self, **where):
+        """
+        Load the traces of the latest run of every experiment as one long DataFrame
+
+        Parameters
+        ----------
+        where : dict
+            Equality filters on the columns of RUN_COLUMNS, e.g. graph='power'
+
+        Returns
+        -------
+        traces : pandas.DataFrame
+            One row per trace point, with the columns run_id, graph, algorithm, cutoff_time, seed, T0_P,
+            time and quality; the text columns (graph, algorithm) are categorical
+        """
+        key_columns = ['run_id', 'graph', 'algorithm', 'cutoff_time', 'seed', 'T0_P']
+        sql, parameters = _select(key_columns + ['trace_time', 'trace_quality'], where)
+        rows = self._query(sql, parameters)
+        if not rows:
+            return pd.DataFrame(columns=key_columns + ['time', 'quality'])
+        times = [np.frombuffer(row[-2], dtype=np.float64) for row in rows]
+        lengths = np.fromiter((len(t) for t in times), dtype=np.int64, count=len(rows))
+        traces = pd.DataFrame({column: _repeat_column([row[k] for row in rows], lengths)
+                               for k, column in enumerate(key_columns)})
+        traces['time'] = np.concatenate(times)
+        traces['quality'] = np.concatenate([np.frombuffer(row[-1], dtype=np.int64) for row in rows])
+        return traces
+
+    def load_solution(self, config, T0_P=None):
+        """
+        The solution of the latest run of the experiment, None if there is none
+        """
+        rows = self._query('SELECT solution FROM latest_runs WHERE graph = ? AND algorithm = ? AND cutoff_time = ? '
+                           'AND seed = ? AND T0_P = ?', _key(config, T0_P))
+        return np.frombuffer(rows[0][0], dtype=np.int64).tolist() if rows else None
+
+    def export_files(self, output_path=OUTPUT_PATH):
+        """
+        Write the latest run of every experiment in the legacy layout: a .sol and a .trace file per run,
+        in output_path (or its T0_P_DIR subfolder for the runs with a T0_P)
+
+        Returns
+        -------
+        count : int
+            The number of runs written
+        """
+        columns = ['graph', 'algorithm', 'cutoff_time', 'seed', 'T0_P', 'solution', 'trace_time', 'trace_quality']
+        rows = self._query(_select(columns, {})[0])
+        os.makedirs(output_path + T0_P_DIR, exist_ok=True)
+        for graph, algorithm, cutoff_time, seed, T0_P, solution, trace_time, trace_quality in rows:
+            config = {'graph': graph, 'algorithm': algorithm, 'cutoff_time': cutoff_time, 'seed': seed}
+            trace = zip(np.frombuffer(trace_time, dtype=np.float64).tolist(),
+                        np.frombuffer(trace_quality, dtype=np.int64).tolist())
+            write_output(config, np.frombuffer(solution, dtype=np.int64).tolist(), list(trace),
+                         OUTPUT_PATH=output_path + T0_P_DIR if T0_P else output_path, T0_P=T0_P or None)
+        return len(rows)
+
+    def import_files(self, output_path=OUTPUT_PATH):
+        """
+        Append the runs of the legacy layout (the .sol files with their .trace files in output_path
+        and its T0_P_DIR subfolder) that are not in the store yet
+
+        Returns
+        -------
+        count : int
+            The number of runs appended
+        """
+        known = self.experiments()
+        count = 0
+        for directory, with_T0_P in ((output_path, False), (output_path + T0_P_DIR, True)):
+            if not os.path.isdir(directory):
+                continue
+            for file_name in sorted(os.listdir(directory)):
+                name = file_name.removesuffix('.sol')
+                if name == file_name or not os.path.exists(directory + name + '.trace'):
+                    continue
+                # the graph names may contain '_', the other fields may not
+                fields = name.rsplit('_', 4 if with_T0_P else 3)
+                graph, algorithm, cutoff_time, seed = fields[:4]
+                T0_P = int(fields[4]) if with_T0_P else None
+                config = {'graph': graph, 'algorithm': algorithm, 'cutoff_time': _number(cutoff_time),
+                          'seed': _number(seed)}
+                if (graph, algorithm, config['cutoff_time'], config['seed'], T0_P) in known:
+                    continue
+                with open(directory + file_name, 'r') as f:
+                    f.readline()
+                    solution = [int(v) for v in f.readline().split(',') if v.strip()]
+                with open(directory + name + '.trace', 'r') as f:
+                    trace = [list(map(float, line.split(','))) for line in f if line.strip()]
+                self.append(config, solution, trace, T0_P)
+                count += 1
+        return count
+
+
+# repeat the value of a column of every run for its trace points, numbers stay numbers and text is categorical
+def _repeat_column(values, lengths):
+    array = np.asarray(values)
+    if array.dtype.kind in 'iuf':
+        return np.repeat(array, lengths)
+    categories, codes = np.unique(array.astype(str), return_inverse=True)
+    return pd.Categorical.from_codes(np.repeat(codes, lengths), categories)
+
+
+# the values of the key columns of an experiment
+def _key(config, T0_P):
+    return config['graph'], config['algorithm'], config['cutoff_time'], config['seed'], T0_P or 0
+
+
+# the query of the given columns of the latest runs matching the equality filters
+def _select(columns, where):
+    sql = 'SELECT {} FROM latest_runs'.format(', '.join(columns))
+    for column in where:
+        if column not in RUN_COLUMNS:
+            raise ValueError('Unknown column: {}'.format(column))
+    if where:
+        sql += ' WHERE ' + ' AND '.join('{} = ?'.format(column) for column in where)
+    return sql + ' ORDER BY run_id', tuple(where.values())
+
+
+# a number field of a legacy file name, kept as a string if it is not a number (e.g. the seeds of a race)
+def _number(field):
+    try:
+        return int(field)
+    except ValueError:
+        try:
+            return float(field)
+        except ValueError:
+            return field
@@ -0,0 +1,139 @@
+"""
+This file contains the scheduler of the experiments, which can:
+- run a list of jobs (experiment configurations) across a pool of worker processes;
+- skip the jobs whose results already exist, so that an interrupted grid can be resumed;
+- pin every worker to its own CPU, so that the timings of concurrent runs stay comparable;
+- publish the graphs in shared memory (see shared_graph.py), which the workers attach without copying.
+
+The jobs are submitted graph by graph, a few per worker at a time, so only the graphs of the jobs in flight
+are published: a graph is published with its first job and unlinked as soon as its last job is done, and
+the memory in use is about that of the graphs being solved rather than of the whole grid. A worker that
+dies (e.g. killed by the OOM killer) breaks the pool: the jobs in flight are reported as failed (a resumed
+run retries them) and the other jobs go on in a new pool.
+"""
+
+import os
+import time
+import collections
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from shared_graph import SharedGraphStore, attach
+
+# the number of jobs in flight per worker: the one it runs and the next one
+JOBS_PER_WORKER = 2
+
+# the state of a worker process: the job function, the CPU it is pinned to and the graph of its last job
+_worker = {'run': None, 'cpu': None, 'graphs': {}}
+
+
+def run_jobs(jobs, run, done=None, processes=None, pin=False):
+    """
+    Run the jobs across a pool of worker processes
+
+    Parameters
+    ----------
+    jobs : list
+        The jobs as (config, T0_P) pairs
+    run : callable
+        The job function, called as run(config, T0_P, graph) in a worker; it has to write its
+        results atomically, and be importable by the workers (a module-level function)
+    done : callable (None by default)
+        done(config, T0_P) tells whether the results of a job already exist, such jobs are skipped
+    processes : int (None by default)
+        The number of worker processes, os.cpu_count() by default
+    pin : bool (False by default)
+        Whether to pin every worker to its own CPU (where os.sched_setaffinity is available)
+
+    Returns
+    -------
+    failed : list
+        The (job, error message) pairs of the jobs that raised an exception or whose worker died
+    """
+    pending = [job for job in jobs if done is None or not done(*job)]
+    print('{} jobs, {} already done, {} to run'.format(len(jobs), len(jobs) - len(pending), len(pending)))
+    if not pending:
+        return []
+    # the jobs grouped by graph, in the order of the first job of every graph
+    groups = {}
+    for job in pending:
+        groups.setdefault(job[0]['graph'], []).append(job)
+    queue = collections.deque(job for group in groups.values() for job in group)
+    processes = min(processes or os.cpu_count(), len(pending))
+    cpus = sorted(os.sched_getaffinity(0)) if pin and hasattr(os, 'sched_setaffinity') else None
+    context = mp.get_context()
+    failed = []
+    count = 0
+    start_time = time.perf_counter()
+
+    def report(job, error):
+        nonlocal count
+        count += 1
+        config, T0_P = job
+        print('[{}/{}] {:.0f} s, Graph: {}, Algorithm: {}, Seed: {}, T0_P: {} {}'.format(
+            count, len(pending), time.perf_counter() - start_time,
+            config['graph'], config['algorithm'], config['seed'], T0_P, 'failed: ' + error if error else 'done'))
+        if error:
+            failed.append((job, error))
+
+    # every job in flight holds a reference to its graph until it is done
+    with SharedGraphStore() as store:
+        while queue:
+            broken = False
+            counter = context.Value('i', 0)
+            with ProcessPoolExecutor(processes, mp_context=context, initializer=_init_worker,
+                                     initargs=(run, counter, cpus)) as executor:
+                running = {}
+                while running or (queue and not broken):
+                    while queue and not broken and len(running) < JOBS_PER_WORKER * processes:
+                        job = queue.popleft()
+                        try:
+                            handle = store.acquire(job[0]['graph'])
+                        except Exception as error:
+                            report(job, '{}: {}'.format(type(error).__name__, error))
+                            continue
+                        try:
+                            running[executor.submit(_run_job, job, handle)] = job
+                        except BrokenProcessPool:
+                            store.release(job[0]['graph'])
+                            queue.appendleft(job)
+                            broken = True
+                    for future in wait(running, return_when=FIRST_COMPLETED).done:
+                        job = running.pop(future)
+                        store.release(job[0]['graph'])
+                        try:
+                            error = future.result()
+                        except BrokenProcessPool:
+                            # the other jobs in flight are lost as well, the pool is replaced once they are reported
+                            broken = True
+                            error = 'BrokenProcessPool: a worker process died'
+                        report(job, error)
+    return failed
+
+
+# set up a worker process: remember the job function and pin the worker to the next CPU
+def _init_worker(run, counter, cpus):
+    _worker['run'] = run
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    if cpus:
+        _worker['cpu'] = cpus[index % len(cpus)]
+        os.sched_setaffinity(0, {_worker['cpu']})
+
+
+# run a job in a worker process on the shared graph, which the worker keeps attached for its next job;
+# return the error message of the job, None if it succeeded
+def _run_job(job, handle):
+    config, T0_P = job
+    try:
+        graphs = _worker['graphs']
+        if handle.name not in graphs:
+            # unmap the graph of the previous job, the jobs come graph by graph
+            graphs.clear()
+            graphs[handle.name] = attach(handle)
+        # every job gets its own copy of the mutable state of the graph (degrees, alive vertices)
+        _worker['run'](config, T0_P, graphs[handle.name].copy())
+        return None
+    except Exception as error:
+        return '{}: {}'.format(type(error).__name__, error)
@@ -0,0 +1,196 @@
+"""
+This file contains the distribution of graphs to worker processes through shared memory.
+
+A graph is published once: its read-only CSR arrays (indptr, labels, indices) are copied into
+one multiprocessing.shared_memory block, described by a small picklable SharedGraphHandle.
+A worker attaches the block and gets a Graph whose adjacency arrays are zero-copy views of it;
+only the mutable state of the graph (degree, alive) is private to the worker.
+
+SharedGraphStore owns the published blocks of a sweep: every job acquires the graph it needs
+and releases it when it is done, and a block is unlinked as soon as its last job released it.
+Closing the store (it is a context manager) unlinks whatever is left, so an exception in the
+parent does not leak shared memory; if the parent is killed outright, the resource tracker of
+multiprocessing unlinks the blocks it created. Only the owner registers a block with the resource
+tracker: a worker attaching it does not, otherwise a worker with a tracker of its own (e.g. forked
+before the first block was published) would unlink the block under the owner when it exits.
+Before Python 3.13 this takes a process-wide patch of the resource tracker, so the blocks are
+created and attached under a lock.
+"""
+
+import threading
+from multiprocessing import shared_memory, resource_tracker
+import numpy as np
+from graph import Graph, INDEX_DTYPE
+from io_utils import load_graph
+
+# held while the resource tracker is patched (see _open_untracked), and while a block is created, so that
+# another thread never registers or attaches a block during the patch
+_TRACKER_LOCK = threading.Lock()
+
+
+class SharedGraphHandle:
+    """
+    The picklable description of a published graph
+
+    Parameters
+    ----------
+    name : str
+        The name of the shared memory block
+    num_nodes : int
+        The number of vertices
+    num_indices : int
+        The length of the indices array, i.e. twice the number of edges
+    """
+    def __init__(self, name, num_nodes, num_indices):
+        self.name = name
+        self.num_nodes = num_nodes
+        self.num_indices = num_indices
+
+    # the (dtype, length) of the arrays in the order of the block layout
+    def layout(self):
+        return (('indptr', np.int64, self.num_nodes + 1), ('labels', np.int64, self.num_nodes),
+                ('indices', INDEX_DTYPE, self.num_indices))
+
+    # the size of the block in bytes
+    def size(self):
+        return sum(np.dtype(dtype).itemsize * length for _, dtype, length in self.layout())
+
+
+def _views(handle, buffer):
+    """
+    The arrays of the block as numpy views of the buffer
+    """
+    arrays = {}
+    offset = 0
+    for name, dtype, length in handle.layout():
+        arrays[name] = np.ndarray((length,), dtype=dtype, buffer=buffer, offset=offset)
+        offset += np.dtype(dtype).itemsize * length
+    return arrays
+
+
+def publish(graph):
+    """
+    Copy the CSR arrays of the graph into a new shared memory block
+
+    Parameters
+    ----------
+    graph : Graph
+        The graph object of the predefined Graph class
+
+    Returns
+    -------
+    shm : SharedMemory
+        The block, the caller owns it and has to close and unlink it
+    handle : SharedGraphHandle
+        The description of the block to send to the workers
+    """
+    handle = SharedGraphHandle(None, len(graph.indptr) - 1, len(graph.indices))
+    with _TRACKER_LOCK:
+        shm = shared_memory.SharedMemory(create=True, size=max(1, handle.size()))
+    handle.name = shm.name
+    arrays = _views(handle, shm.buf)
+    arrays['indptr'][:] = graph.indptr
+    arrays['labels'][:] = graph.labels
+    arrays['indices'][:] = graph.indices
+    del arrays
+    return shm, handle
+
+
+def attach(handle):
+    """
+    Attach a published graph without copying its adjacency arrays
+
+    Parameters
+    ----------
+    handle : SharedGraphHandle
+        The description of the block
+
+    Returns
+    -------
+    graph : Graph
+        The graph, whose indptr, indices and labels are read-only views of the block;
+        the graph keeps the block mapped as long as it (or a copy of it) is alive
+    """
+    shm = _open_untracked(handle.name)
+    arrays = _views(handle, shm.buf)
+    for array in arrays.values():
+        array.flags.writeable = False
+    graph = Graph(arrays['indptr'], arrays['indices'], arrays['labels'])
+    graph.shared_memory = shm
+    return graph
+
+
+class SharedGraphStore:
+    """
+    The graphs published for a sweep of jobs, with reference counting
+
+    Parameters
+    ----------
+    loader : callable (load_graph by default)
+        loader(name) loads the graph of the given name
+    """
+    def __init__(self, loader=load_graph):
+        self.loader = loader
+        # graph name -> [shm, handle, number of jobs holding it]
+        self.blocks = {}
+
+    def acquire(self, name):
+        """
+        Get the handle of the graph, publishing it on first use
+        """
+        if name not in self.blocks:
+            shm, handle = publish(self.loader(name))
+            self.blocks[name] = [shm, handle, 0]
+        block = self.blocks[name]
+        block[2] += 1
+        return block[1]
+
+    def release(self, name):
+        """
+        Give up a reference to the graph, unlinking its block after the last one
+        """
+        block = self.blocks[name]
+        block[2] -= 1
+        if block[2] == 0:
+            del self.blocks[name]
+            _unlink(block[0])
+
+    def close(self):
+        """
+        Unlink every block left
+        """
+        blocks, self.blocks = self.blocks, {}
+        for shm, _, _ in blocks.values():
+            _unlink(shm)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# open an existing block without registering it with the resource tracker of this process
+def _open_untracked(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+    # before Python 3.13 the block is always registered; unregistering it afterwards is not an option,
+    # it would also drop the registration of the owner when both processes share a tracker
+    with _TRACKER_LOCK:
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+# close and unlink a block owned by this process
+def _unlink(shm):
+    shm.close()
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        pass
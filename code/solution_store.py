@@ -0,0 +1,180 @@
+"""
+This file contains the solution store: the best known vertex cover and lower bound of every graph seen so far,
+so that a run can start from the best cover of the earlier runs instead of from scratch.
+
+The entries are keyed by a fingerprint of the graph content (see graph_fingerprint), not by its name, so a
+reduced graph, a component or a renamed file gets its own entry, and an entry is never applied to a graph
+it was not computed on. Every entry is one small JSON file in STORE_PATH, replaced atomically; an update
+rereads the entry under an exclusive file lock (where fcntl is available), so concurrent runs only ever
+improve it. The store is evicted by age (the entries not updated for max_age seconds) and by size
+(the least recently updated entries go first once the store is larger than max_bytes).
+"""
+
+import os
+import time
+import json
+import hashlib
+import numpy as np
+from io_utils import OUTPUT_PATH, _atomic_write
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+STORE_PATH = OUTPUT_PATH + '.store/'
+STORE_MAX_AGE = 90 * 24 * 3600  # the entries not updated for this many seconds are evicted
+STORE_MAX_BYTES = 64 * 2 ** 20  # the least recently updated entries are evicted beyond this total size
+
+
+def graph_fingerprint(graph):
+    """
+    The content hash of the alive part of the graph: its vertex labels and its edges
+
+    Parameters
+    ----------
+    graph : Graph
+        The graph object of the predefined Graph class
+
+    Returns
+    -------
+    fingerprint : str
+        The SHA-1 hex digest
+    """
+    src, dst = graph.get_edge_arrays()
+    sha1 = hashlib.sha1()
+    for array in (graph.labels[graph.alive], graph.labels[src], graph.labels[dst]):
+        sha1.update(np.ascontiguousarray(array, dtype=np.int64).tobytes())
+        sha1.update(b'|')
+    return sha1.hexdigest()
+
+
+class SolutionStore:
+    """
+    The best known covers and lower bounds, keyed by graph fingerprint
+
+    Parameters
+    ----------
+    path : str (STORE_PATH by default)
+        The directory of the store
+    max_age : float (STORE_MAX_AGE by default)
+        The age in seconds beyond which an entry is evicted
+    max_bytes : int (STORE_MAX_BYTES by default)
+        The size in bytes beyond which the least recently updated entries are evicted
+    """
+    def __init__(self, path=STORE_PATH, max_age=STORE_MAX_AGE, max_bytes=STORE_MAX_BYTES):
+        self.path = path
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+
+    def _entry_path(self, fingerprint):
+        return os.path.join(self.path, fingerprint + '.json')
+
+    def _read(self, fingerprint):
+        try:
+            with open(self._entry_path(fingerprint), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def get(self, graph):
+        """
+        The entry of the graph, None if there is none (or it is not a vertex cover of the graph anymore)
+
+        Returns
+        -------
+        entry : dict
+            'cover' (the best known cover, as labels), 'lower_bound', 'source' (the run that found the cover)
+            and 'updated' (the time of the last update)
+        """
+        entry = self._read(graph_fingerprint(graph))
+        if entry is None or not graph.is_cover(entry['cover']):
+            return None
+        return entry
+
+    def best_cover(self, graph):
+        """
+        The best known cover of the graph (labels), None if there is none
+        """
+        entry = self.get(graph)
+        return entry['cover'] if entry is not None else None
+
+    def lower_bound(self, graph):
+        """
+        The best known lower bound on the size of a cover of the graph, 0 if there is none
+        """
+        entry = self.get(graph)
+        return entry['lower_bound'] if entry is not None else 0
+
+    def update(self, graph, cover, lower_bound=0, source=None):
+        """
+        Record a cover and a lower bound of the graph, keeping the best ones known
+
+        Parameters
+        ----------
+        graph : Graph
+            The graph object of the predefined Graph class
+        cover : list
+            A vertex cover of the graph (labels)
+        lower_bound : int (0 by default)
+            A lower bound on the size of a cover of the graph (e.g. the size of a cover proven optimal)
+        source : str (None by default)
+            A description of the run that found the cover
+
+        Returns
+        -------
+        improved : bool
+            Whether the entry changed
+        """
+        fingerprint = graph_fingerprint(graph)
+        os.makedirs(self.path, exist_ok=True)
+        with open(self._entry_path(fingerprint) + '.lock', 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            entry = self._read(fingerprint)
+            if entry is None:
+                entry = {'cover': None, 'lower_bound': 0, 'source': None}
+            improved = False
+            if entry['cover'] is None or len(cover) < len(entry['cover']):
+                entry['cover'], entry['source'] = sorted(int(v) for v in cover), source
+                improved = True
+            if lower_bound > entry['lower_bound']:
+                entry['lower_bound'] = int(lower_bound)
+                improved = True
+            if improved:
+                entry['updated'] = time.time()
+                _atomic_write(self._entry_path(fingerprint), json.dumps(entry).encode())
+        return improved
+
+    def evict(self):
+        """
+        Remove the entries older than max_age, then the least recently updated ones beyond max_bytes
+
+        Returns
+        -------
+        removed : int
+            The number of entries removed
+        """
+        try:
+            names = [name for name in os.listdir(self.path) if name.endswith('.json')]
+        except FileNotFoundError:
+            return 0
+        entries = []
+        for name in names:
+            try:
+                stat = os.stat(os.path.join(self.path, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+        entries.sort(reverse=True)
+        now = time.time()
+        removed, total = 0, 0
+        for mtime, size, name in entries:
+            total += size
+            if now - mtime > self.max_age or total > self.max_bytes:
+                for path in (name, name + '.lock'):
+                    try:
+                        os.remove(os.path.join(self.path, path))
+                    except FileNotFoundError:
+                        pass
+                removed += 1
+        return removed
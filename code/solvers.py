@@ -0,0 +1,66 @@
+"""
+This file contains the list of the algorithms and their dispatch: run_algorithm runs the algorithm
+of an experiment configuration on a graph with the arguments it takes.
+
+It only imports the solvers, so it is cheap to import (e.g. by benchmarks.py) compared to exec.py.
+"""
+
+from heuristics import heuristic, max_degree_greedy, leaf_first_greedy, matching_approx, best_of
+from BnB import branch_and_bound
+from bitset_bnb import bitset_branch_and_bound, BITSET_MAX_NODES
+from local_search_1 import local_search_1
+from local_search_2 import local_search_2
+from local_search_3 import local_search_3
+
+
+ALGORITHM_LIST = {'Approx': heuristic, 'BnB': branch_and_bound, 'LS1': local_search_1, 'LS2': local_search_2,
+                  'LS3': local_search_3, 'MaxDeg': max_degree_greedy, 'Leaf': leaf_first_greedy,
+                  'Match': matching_approx, 'BestOf': best_of}
+
+
+def get_algorithm_list():
+    return ALGORITHM_LIST
+
+# run the algorithm of the configuration on the graph
+def run_algorithm(config, graph, cutoff_time, T0_P = None, initial_cover = None, stats = None):
+    """
+    Run the algorithm of the configuration on the graph
+
+    Parameters
+    ----------
+    config : dict
+        The configuration of the experiment, see single_round_experiment
+    graph : Graph
+        The graph object of the predefined Graph class
+    cutoff_time : float or Budget
+        The cutoff time in seconds, or the budget, of the run
+    T0_P : int (None by default)
+        The T0_P of LS1
+    initial_cover : list (None by default)
+        A known vertex cover to start the LS algorithms from / to seed the upper bound of BnB with
+    stats : dict (None by default)
+        Filled with the search statistics of BnB and of the LS algorithms if given; for BnB, stats['engine']
+        tells the engine that ran ('bitset' for the graphs handed to bitset_branch_and_bound, 'bnb' otherwise)
+
+    Returns
+    -------
+    solution, trace : list
+        The solution and the trace of the algorithm
+    """
+    algorithm = ALGORITHM_LIST[config['algorithm']]
+    if graph.get_num_edges() == 0:
+        # nothing left to cover (e.g. the reductions solved the instance)
+        return [], [[0.0, 0]]
+    elif algorithm == ALGORITHM_LIST['LS1']:
+        return algorithm(graph, config['seed'], cutoff_time, T0_P, replicas=config.get('replicas', 1),
+                         initial_cover=initial_cover, stats=stats)
+    elif algorithm in (ALGORITHM_LIST['LS2'], ALGORITHM_LIST['LS3']):
+        return algorithm(graph, config['seed'], cutoff_time, initial_cover=initial_cover, stats=stats)
+    elif algorithm == ALGORITHM_LIST['BnB'] and config.get('workers', 1) == 1 \
+            and graph.get_num_nodes() <= BITSET_MAX_NODES:
+        return bitset_branch_and_bound(graph, cutoff_time, stats, initial_cover=initial_cover)
+    elif algorithm == ALGORITHM_LIST['BnB']:
+        return algorithm(graph, cutoff_time, stats, workers=config.get('workers', 1), initial_cover=initial_cover)
+    else:
+        # Approx and the other constructive heuristics only take the cutoff time
+        return algorithm(graph, cutoff_time)
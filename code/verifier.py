@@ -0,0 +1,145 @@
+"""
+This file contains the verification of vertex covers.
+
+A cover is checked against the CSR edge arrays of the graph with vectorized boolean masks, in O(n + m + |S|),
+so it can run after every solver call. The solution files of the output folder are grouped by graph, so
+every graph is loaded once, and the groups are verified across a pool of processes.
+"""
+
+import os
+import multiprocessing as mp
+import numpy as np
+from io_utils import load_graph, OUTPUT_PATH
+
+
+def verify_cover(graph, solution, num_sol=None):
+    """
+    Verify that a solution is a vertex cover of the graph
+
+    Parameters
+    ----------
+    graph : Graph
+        The graph object of the predefined Graph class
+    solution : iterable
+        The vertex IDs of the solution (a list, a set or an array)
+    num_sol : int (None by default)
+        The size of the solution as reported (e.g. on the first line of a .sol file), checked if given
+
+    Returns
+    -------
+    result : dict
+        'valid' (bool), 'size' (the number of vertices), 'uncovered' (the number of uncovered alive edges)
+        and 'error' (a description of the first problem found, None if the cover is valid)
+    """
+    solution = np.fromiter(solution, dtype=np.int64, count=len(solution))
+    result = {'valid': False, 'size': len(solution), 'uncovered': 0, 'error': None}
+    if num_sol is not None and num_sol != len(solution):
+        result['error'] = 'The number of vertices ({}) in the solution does not match the number of solution ({})'\
+            .format(len(solution), num_sol)
+        return result
+    if len(np.unique(solution)) != len(solution):
+        result['error'] = 'The solution contains duplicate vertices'
+        return result
+    # the position of every vertex of the solution in the labels (sorted for the lookup)
+    order = np.argsort(graph.labels, kind='stable')
+    sorted_labels = graph.labels[order]
+    if len(sorted_labels) == 0:
+        position, known = np.zeros(len(solution), dtype=np.int64), np.zeros(len(solution), dtype=bool)
+    else:
+        position = np.minimum(np.searchsorted(sorted_labels, solution), len(sorted_labels) - 1)
+        known = sorted_labels[position] == solution
+    if not np.all(known):
+        result['error'] = 'The solution contains vertices that are not in the graph: {}'\
+            .format(solution[~known][:5].tolist())
+        return result
+    in_cover = np.zeros(len(graph.labels), dtype=bool)
+    in_cover[order[position]] = True
+    src, dst = graph.get_edge_arrays()
+    uncovered = ~(in_cover[src] | in_cover[dst])
+    result['uncovered'] = int(np.count_nonzero(uncovered))
+    if result['uncovered']:
+        first = np.flatnonzero(uncovered)[0]
+        result['error'] = 'Edge {} is not covered by the solution ({} uncovered edges)'\
+            .format((int(graph.labels[src[first]]), int(graph.labels[dst[first]])), result['uncovered'])
+        return result
+    result['valid'] = True
+    return result
+
+
+def parse_solution_name(file_name):
+    """
+    Split the name of a solution file '<graph>_<algorithm>_<cutoff>_<seed>[.sol]' into its fields;
+    the graph name may contain '_', the other fields may not
+
+    Returns
+    -------
+    graph, algorithm, cutoff_time, seed : str
+    """
+    return tuple(file_name.removesuffix('.sol').rsplit('_', 3))
+
+
+def verify_files(files=None, output_path=OUTPUT_PATH, processes=None):
+    """
+    Verify the solution files, every graph is loaded once
+
+    Parameters
+    ----------
+    files : list (None by default)
+        The names of the solution files in output_path, all the .sol files of output_path by default
+    output_path : str (OUTPUT_PATH by default)
+        The folder of the solution files
+    processes : int (None by default)
+        The number of processes, os.cpu_count() by default (capped by the number of graphs), 1 to verify inline
+
+    Returns
+    -------
+    results : list
+        One dict per file, sorted by file name: the fields of verify_cover and 'file', 'graph', 'algorithm',
+        'cutoff_time' and 'seed' ('error' also reports the files that cannot be read or whose graph cannot be loaded)
+    """
+    if files is None:
+        files = [name for name in os.listdir(output_path) if name.endswith('.sol')]
+    groups = {}
+    for file_name in files:
+        groups.setdefault(parse_solution_name(file_name)[0], []).append(file_name)
+    tasks = [(graph_name, sorted(names), output_path) for graph_name, names in sorted(groups.items())]
+    processes = min(processes or os.cpu_count(), len(tasks))
+    if processes <= 1:
+        batches = list(map(_verify_group, tasks))
+    else:
+        with mp.get_context().Pool(processes) as pool:
+            batches = pool.map(_verify_group, tasks)
+    return sorted((result for batch in batches for result in batch), key=lambda result: result['file'])
+
+
+# verify the solution files of one graph
+def _verify_group(task):
+    graph_name, file_names, output_path = task
+    try:
+        graph = load_graph(graph_name)
+        graph_error = None
+    except (OSError, ValueError) as error:
+        graph, graph_error = None, 'The graph cannot be loaded: {}'.format(error)
+    results = []
+    for file_name in file_names:
+        name_fields = parse_solution_name(file_name)
+        fields = {'file': file_name, 'graph': graph_name, 'algorithm': None, 'cutoff_time': None, 'seed': None}
+        if len(name_fields) != 4:
+            results.append(dict(fields, valid=False, size=None, uncovered=None,
+                                error='The file name does not match <graph>_<algorithm>_<cutoff>_<seed>.sol'))
+            continue
+        fields.update(zip(('algorithm', 'cutoff_time', 'seed'), name_fields[1:]))
+        if graph is None:
+            results.append(dict(fields, valid=False, size=None, uncovered=None, error=graph_error))
+            continue
+        try:
+            with open(os.path.join(output_path, file_name), 'r') as f:
+                num_sol = int(f.readline())
+                line = f.readline().strip()
+            solution = np.array(line.split(','), dtype=np.int64) if line else np.zeros(0, dtype=np.int64)
+        except (OSError, ValueError) as error:
+            results.append(dict(fields, valid=False, size=None, uncovered=None,
+                                error='The solution file cannot be read: {}'.format(error)))
+            continue
+        results.append(dict(fields, **verify_cover(graph, solution, num_sol)))
+    return results
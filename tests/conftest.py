@@ -0,0 +1,7 @@
+import os
+import sys
+
+# the modules of the code folder import each other by name, and use the paths relative to the root folder
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'code'))
+os.chdir(ROOT)
@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+from graph import Graph
+from io_utils import load_graph
+from BnB import branch_and_bound
+from verifier import verify_cover
+
+
+def random_graph(n, p, seed):
+    rng = np.random.default_rng(seed)
+    src, dst = np.nonzero(np.triu(rng.random((n, n)) < p, 1))
+    return Graph.from_edges(n, src, dst)
+
+
+# the parallel search proves the same optimum as the sequential one
+@pytest.mark.parametrize('graph', [load_graph('karate'), load_graph('jazz'), load_graph('netscience')]
+                         + [random_graph(n, p, seed) for n, p in ((40, 0.15), (80, 0.08), (100, 0.06))
+                            for seed in range(2)])
+def test_parallel_matches_sequential(graph):
+    sequential, parallel = {}, {}
+    expected, _ = branch_and_bound(graph.copy(), 60, sequential)
+    solution, _ = branch_and_bound(graph.copy(), 60, parallel, workers=2)
+    assert sequential['optimal'] and parallel['optimal']
+    assert verify_cover(graph, solution)['valid']
+    assert len(solution) == len(expected)
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from graph import Graph
+from components import split_components, solve_components
+from bitset_bnb import bitset_branch_and_bound
+from verifier import verify_cover
+
+
+# two cycles of 150 vertices, too large for the exact solver, and 20 triangles
+def _graph():
+    src, dst = [], []
+    for first in (0, 150):
+        src += list(range(first, first + 150))
+        dst += list(range(first + 1, first + 150)) + [first]
+    for first in range(300, 360, 3):
+        src += [first, first + 1, first + 2]
+        dst += [first + 1, first + 2, first]
+    return Graph.from_edges(360, src, dst)
+
+
+# a solver that gives up at once with an empty (non-)cover that it claims to be optimal
+def _partial_solver(graph, budget):
+    return [], [(0.0, 0)]
+
+
+def _exact_solver(graph, budget):
+    return bitset_branch_and_bound(graph, budget)
+
+
+def test_split_components():
+    subgraphs = split_components(_graph())
+    assert sorted(g.get_num_nodes() for g in subgraphs) == [3] * 20 + [150, 150]
+    labels = np.concatenate([g.labels for g in subgraphs])
+    assert sorted(labels.tolist()) == list(range(1, 361))
+
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_solve_components_combines_covers(processes):
+    graph = _graph()
+    solution, trace = solve_components(graph.copy(), _exact_solver, 30, processes)
+    assert verify_cover(graph, solution)['valid']
+    # 75 per cycle, 2 per triangle
+    assert len(solution) == 190
+    assert trace[-1][1] == len(solution)
+    assert all(a[1] > b[1] for a, b in zip(trace, trace[1:]))
+
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_solve_components_rejects_partial_covers(processes):
+    graph = _graph()
+    solution, trace = solve_components(graph.copy(), _partial_solver, 30, processes)
+    assert verify_cover(graph, solution)['valid']
+    # the traces of the rejected covers are dropped, the combined trace ends at the cover returned
+    assert trace[-1][1] == len(solution)
+    assert min(size for _, size in trace) == len(solution)
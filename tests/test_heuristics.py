@@ -0,0 +1,69 @@
+import time
+import numpy as np
+import pytest
+from graph import Graph
+from io_utils import load_graph, DATA_PATH
+from heuristics import heuristic, max_degree_greedy, leaf_first_greedy, matching_approx, best_of
+from verifier import verify_cover
+from BnB import branch_and_bound
+
+
+# the original GIC on the original graph representation: the networkx graph built from the file is a dict of
+# adjacency sets in insertion order, where min() breaks the ties in favor of the vertex inserted first
+def original_heuristic(graph_file):
+    adjacency = {}
+    with open(DATA_PATH + graph_file + '.graph', 'r') as f:
+        num_nodes = int(f.readline().split()[0])
+        for current_node in range(1, num_nodes + 1):
+            adjacency.setdefault(current_node, set())
+            for node in map(int, f.readline().split()):
+                adjacency[current_node].add(node)
+                adjacency.setdefault(node, set()).add(current_node)
+    solution = set()
+    while adjacency:
+        selected_node = min(adjacency, key=lambda v: len(adjacency[v]))
+        neighbors = set(adjacency[selected_node])
+        solution |= neighbors
+        neighbors.add(selected_node)
+        for node in neighbors:
+            for other in adjacency.pop(node):
+                if other in adjacency:
+                    adjacency[other].discard(node)
+    return solution
+
+
+# delaunay_n10 and email list the neighbors out of order, so their ties depend on the insertion order
+@pytest.mark.parametrize('graph_file', ['karate', 'football', 'jazz', 'email', 'delaunay_n10', 'netscience'])
+def test_heuristic_matches_original(graph_file):
+    solution, _ = heuristic(load_graph(graph_file))
+    assert set(solution) == original_heuristic(graph_file)
+
+
+# the bucket queue keeps GIC linear: about a second on a random graph with a million edges
+def test_heuristic_scales_linearly():
+    rng = np.random.default_rng(0)
+    src, dst = rng.integers(0, 200000, 1000000), rng.integers(0, 200000, 1000000)
+    edges = np.unique(np.minimum(src, dst) * 200000 + np.maximum(src, dst))
+    edges = edges[edges // 200000 != edges % 200000]
+    graph = Graph.from_edges(200000, edges // 200000, edges % 200000)
+    start = time.perf_counter()
+    solution, _ = heuristic(graph)
+    assert time.perf_counter() - start < 5
+    assert verify_cover(graph, solution)['valid']
+
+
+# a heuristic stopped by the budget completes its cover, which seeds the upper bound of BnB and LS3
+@pytest.mark.parametrize('algorithm', [heuristic, max_degree_greedy, leaf_first_greedy, matching_approx, best_of])
+def test_heuristic_cover_without_budget(algorithm):
+    graph = load_graph('as-22july06')
+    solution, _ = algorithm(graph.copy(), 0)
+    assert verify_cover(graph, solution)['valid']
+
+
+def test_branch_and_bound_incumbent_without_budget():
+    graph = load_graph('as-22july06')
+    solution, _ = branch_and_bound(graph.copy(), 0)
+    assert verify_cover(graph, solution)['valid']
+    # a known cover that is not one is never taken as the incumbent
+    solution, _ = branch_and_bound(graph.copy(), 0, initial_cover=[1, 2, 3])
+    assert verify_cover(graph, solution)['valid']
@@ -0,0 +1,30 @@
+import pytest
+from io_utils import parse_graph_file
+
+
+def _write(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+# the error messages count the comment lines, i.e. they point at the line of the file
+@pytest.mark.parametrize('text, line', [
+    ('% a triangle\n3 3\n% the neighbors\n2 3\n1 3\n1 x\n', 6),
+    ('% a triangle\n3 3\n% the neighbors\n2 3\n1 4\n1 2\n', 5),
+    ('% a triangle\n3 3\n2 3\n% the neighbors\n1 3\n1 2\n2\n', 7),
+])
+def test_metis_error_lines(tmp_path, text, line):
+    with pytest.raises(ValueError, match='on line {}'.format(line)):
+        parse_graph_file(_write(tmp_path / 'g.graph', text), 'metis')
+
+
+def test_edgelist_error_lines(tmp_path):
+    with pytest.raises(ValueError, match='on line 4'):
+        parse_graph_file(_write(tmp_path / 'g.txt', '# edges\n1 2\n# more edges\n2 3 4\n'), 'edgelist')
+
+
+def test_metis_comments(tmp_path):
+    indptr, indices, labels = parse_graph_file(_write(tmp_path / 'g.graph', '% c\n3 3\n% c\n2 3\n1 3\n% c\n1 2\n'),
+                                               'metis')
+    assert indptr.tolist() == [0, 2, 4, 6]
+    assert sorted(indices[4:].tolist()) == [0, 1]
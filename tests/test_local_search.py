@@ -0,0 +1,21 @@
+import multiprocessing as mp
+import threading
+import time
+from io_utils import load_graph
+from budget import Budget
+from local_search_1 import local_search_1
+from verifier import verify_cover
+
+
+# cancelling the budget (as a race does) stops the replica exchange long before its cutoff time
+def test_replica_exchange_cancel():
+    graph = load_graph('jazz')
+    budget = Budget(60, cancel=mp.get_context().Event())
+    timer = threading.Timer(0.5, budget.cancel_event.set)
+    timer.start()
+    start = time.perf_counter()
+    solution, trace = local_search_1(graph.copy(), 1, budget, replicas=2)
+    timer.join()
+    assert time.perf_counter() - start < 10
+    assert not mp.active_children()
+    assert verify_cover(graph, solution)['valid']
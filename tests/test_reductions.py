@@ -0,0 +1,38 @@
+import itertools
+import numpy as np
+import pytest
+from graph import Graph
+from reductions import reduce_graph, REDUCTION_RULES
+from verifier import verify_cover
+
+
+# a minimum vertex cover by brute force (labels), for graphs of a dozen vertices
+def brute_force_cover(graph):
+    src, dst = graph.get_edge_arrays()
+    vertices = np.flatnonzero(graph.alive)
+    for size in range(len(vertices) + 1):
+        for cover in itertools.combinations(vertices.tolist(), size):
+            in_cover = np.zeros(len(graph.alive), dtype=bool)
+            in_cover[list(cover)] = True
+            if np.all(in_cover[src] | in_cover[dst]):
+                return graph.labels[list(cover)].tolist()
+
+
+def random_graphs(count=60, seed=0):
+    rng = np.random.default_rng(seed)
+    for _ in range(count):
+        n = int(rng.integers(2, 13))
+        pairs = [(u, v) for u in range(n) for v in range(u + 1, n) if rng.random() < rng.uniform(0.1, 0.6)]
+        src, dst = zip(*pairs) if pairs else ((), ())
+        yield Graph.from_edges(n, src, dst)
+
+
+# an optimal cover of the kernel lifts to an optimal cover of the graph, for every rule and all of them
+@pytest.mark.parametrize('rules', [(rule,) for rule in REDUCTION_RULES] + [REDUCTION_RULES])
+def test_lift_is_optimal(rules):
+    for graph in random_graphs():
+        optimum = len(brute_force_cover(graph))
+        reduction = reduce_graph(graph.copy(), rules)
+        solution = reduction.lift(brute_force_cover(reduction.graph))
+        assert verify_cover(graph, solution)['valid']
+        assert len(solution) == optimum
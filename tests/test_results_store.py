@@ -0,0 +1,45 @@
+import multiprocessing as mp
+from results_store import ResultsStore
+
+WRITERS = 4
+RUNS = 25
+
+
+# append RUNS runs of one writer, every run in its own transaction
+def _append_runs(path, writer):
+    store = ResultsStore(path)
+    for seed in range(RUNS):
+        config = {'graph': 'g{}'.format(writer), 'algorithm': 'LS1', 'cutoff_time': 1, 'seed': seed}
+        store.append(config, list(range(1, seed + 2)), [[0.1, seed + 3], [0.5, seed + 1]])
+
+
+# the WAL database takes appends from several processes at once, while it is read, without losing any run
+def test_concurrent_appends(tmp_path):
+    path = str(tmp_path / 'results.sqlite')
+    store = ResultsStore(path)
+    context = mp.get_context('spawn')
+    writers = [context.Process(target=_append_runs, args=(path, writer)) for writer in range(WRITERS)]
+    for writer in writers:
+        writer.start()
+    while any(writer.is_alive() for writer in writers):
+        store.load_runs()
+    for writer in writers:
+        writer.join()
+        assert writer.exitcode == 0
+    runs = store.load_runs()
+    assert len(runs) == WRITERS * RUNS
+    assert sorted(runs['quality'].tolist()) == sorted(list(range(1, RUNS + 1)) * WRITERS)
+    traces = store.load_traces(graph='g0')
+    assert len(traces) == 2 * RUNS
+    assert store.load_solution({'graph': 'g3', 'algorithm': 'LS1', 'cutoff_time': 1, 'seed': 4}) == [1, 2, 3, 4, 5]
+
+
+# a rerun appends a new row, the queries only see the latest run of every experiment
+def test_latest_run(tmp_path):
+    store = ResultsStore(str(tmp_path / 'results.sqlite'))
+    config = {'graph': 'g', 'algorithm': 'LS1', 'cutoff_time': 1, 'seed': 1}
+    store.append(config, [1, 2, 3], [[0.1, 3]])
+    store.append(config, [1, 2], [[0.2, 2]])
+    assert store.contains(config)
+    assert store.load_runs()['quality'].tolist() == [2]
+    assert store.load_solution(config) == [1, 2]
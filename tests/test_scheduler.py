@@ -0,0 +1,41 @@
+import os
+from scheduler import run_jobs
+
+
+# the job function: record the number of edges of the graph, or kill the worker
+def _run(config, T0_P, graph):
+    if config['algorithm'] == 'crash':
+        os._exit(1)
+    with open(os.path.join(config['path'], '{}_{}'.format(config['graph'], config['seed'])), 'w') as f:
+        f.write(str(graph.get_num_edges()))
+
+
+def _done(config, T0_P):
+    return os.path.exists(os.path.join(config['path'], '{}_{}'.format(config['graph'], config['seed'])))
+
+
+def _jobs(path, graphs, algorithm='run'):
+    return [({'graph': graph, 'algorithm': algorithm, 'seed': seed, 'path': str(path)}, None)
+            for graph in graphs for seed in range(3)]
+
+
+def test_run_jobs(tmp_path):
+    jobs = _jobs(tmp_path, ['karate', 'jazz', 'football'])
+    assert run_jobs(jobs, _run, _done, processes=2) == []
+    assert all(_done(*job) for job in jobs)
+    with open(os.path.join(str(tmp_path), 'karate_0')) as f:
+        assert f.read() == '78'
+    # the finished jobs are skipped
+    assert run_jobs(jobs, _run, _done, processes=2) == []
+
+
+# a worker that dies fails its jobs in flight, the other jobs still run in a new pool
+def test_run_jobs_worker_death(tmp_path):
+    crash = _jobs(tmp_path, ['karate'], 'crash')[:1]
+    jobs = crash + _jobs(tmp_path, ['jazz', 'football'])
+    failed = run_jobs(jobs, _run, _done, processes=1)
+    assert crash[0] in [job for job, _ in failed]
+    assert all('BrokenProcessPool' in error for _, error in failed)
+    # a resumed run finishes the jobs lost with the worker
+    run_jobs(jobs[1:], _run, _done, processes=1)
+    assert all(_done(*job) for job in jobs[1:])
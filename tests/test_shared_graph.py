@@ -0,0 +1,45 @@
+import multiprocessing as mp
+import threading
+import numpy as np
+from multiprocessing import shared_memory
+from io_utils import load_graph
+from shared_graph import publish, attach, _unlink
+
+
+# the number of edges of the published graph, read in a worker
+def _num_edges(handle):
+    return attach(handle).get_num_edges()
+
+
+def test_attach_in_threads():
+    graph = load_graph('jazz')
+    errors = []
+
+    def publish_and_attach():
+        try:
+            shm, handle = publish(graph)
+            attached = attach(handle)
+            assert np.array_equal(attached.indices, graph.indices)
+            del attached
+            _unlink(shm)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=publish_and_attach) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+
+
+# workers forked before the block exists have trackers of their own, their exit must not unlink it
+def test_workers_do_not_unlink():
+    graph = load_graph('karate')
+    with mp.get_context('fork').Pool(2) as pool:
+        shm, handle = publish(graph)
+        assert pool.map(_num_edges, [handle] * 4) == [graph.get_num_edges()] * 4
+    try:
+        shared_memory.SharedMemory(name=handle.name).close()
+    finally:
+        _unlink(shm)
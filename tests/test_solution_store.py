@@ -0,0 +1,54 @@
+import os
+from io_utils import load_graph
+from graph import Graph
+from solution_store import SolutionStore, graph_fingerprint
+from heuristics import heuristic
+
+
+def test_update_keeps_the_best(tmp_path):
+    store = SolutionStore(str(tmp_path))
+    graph = load_graph('karate')
+    cover, _ = heuristic(graph)
+    assert store.update(graph, cover, source='Approx')
+    assert not store.update(graph, cover + [v for v in graph if v not in cover][:1])
+    assert store.update(graph, cover, lower_bound=10)
+    entry = store.get(graph)
+    assert entry['cover'] == sorted(cover) and entry['lower_bound'] == 10 and entry['source'] == 'Approx'
+
+
+# a graph with other edges or other vertices has another fingerprint, so the entry of the original is not used
+def test_fingerprint_invalidation(tmp_path):
+    store = SolutionStore(str(tmp_path))
+    graph = load_graph('karate')
+    store.update(graph, heuristic(graph)[0])
+    # one more edge
+    src, dst = graph.get_edge_arrays()
+    missing = next((u, v) for u in range(34) for v in range(u + 1, 34) if v not in graph.neighbors(u))
+    extended = Graph.from_edges(34, src.tolist() + [missing[0]], dst.tolist() + [missing[1]])
+    assert graph_fingerprint(extended) != graph_fingerprint(graph)
+    assert store.get(extended) is None
+    # one vertex deleted
+    reduced = graph.copy()
+    reduced.remove_node(1)
+    assert graph_fingerprint(reduced) != graph_fingerprint(graph)
+    assert store.get(reduced) is None
+    # the same graph loaded again still finds its entry
+    assert store.get(load_graph('karate')) is not None
+
+
+# an entry that is not a cover of its graph anymore (e.g. a corrupted file) is ignored
+def test_invalid_entry_is_ignored(tmp_path):
+    store = SolutionStore(str(tmp_path))
+    graph = load_graph('karate')
+    store.update(graph, [1, 2, 3])
+    assert store.get(graph) is None
+
+
+def test_evict(tmp_path):
+    store = SolutionStore(str(tmp_path), max_age=0)
+    graph = load_graph('karate')
+    store.update(graph, heuristic(graph)[0])
+    path = os.path.join(str(tmp_path), graph_fingerprint(graph) + '.json')
+    os.utime(path, (0, 0))
+    assert store.evict() == 1
+    assert store.get(graph) is None
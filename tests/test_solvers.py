@@ -0,0 +1,30 @@
+import pytest
+from io_utils import load_graph
+from solvers import run_algorithm, ALGORITHM_LIST
+from verifier import verify_cover
+
+# every algorithm, and the parallel BnB and the replica exchange of LS1
+CONFIGS = [{'algorithm': algorithm} for algorithm in ALGORITHM_LIST] + [{'algorithm': 'BnB', 'workers': 2},
+                                                                         {'algorithm': 'LS1', 'replicas': 2}]
+
+
+# the size-based choice between the BnB engines is recorded in the statistics
+def test_bnb_engine():
+    config = {'graph': 'karate', 'algorithm': 'BnB', 'seed': 1, 'workers': 1}
+    stats = {}
+    run_algorithm(config, load_graph('karate'), 5, stats=stats)
+    assert stats['engine'] == 'bitset'
+    stats = {}
+    run_algorithm(config, load_graph('power'), 5, stats=stats)
+    assert stats['engine'] == 'bnb'
+
+
+# a solver stopped by the budget before it is done still returns a cover, and its trace ends with its size
+@pytest.mark.parametrize('config', CONFIGS, ids=lambda config: '-'.join(map(str, config.values())))
+@pytest.mark.parametrize('cutoff_time', [0, 0.01])
+def test_cover_under_tiny_cutoff(config, cutoff_time):
+    for graph_file in ('jazz', 'as-22july06'):
+        graph = load_graph(graph_file)
+        solution, trace = run_algorithm(dict(config, graph=graph_file, seed=1), graph.copy(), cutoff_time)
+        assert verify_cover(graph, solution)['valid']
+        assert trace[-1][1] >= len(solution)
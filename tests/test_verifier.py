@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+from io_utils import load_graph
+from verifier import verify_cover
+from exec import run_algorithm, check_solution
+
+
+@pytest.mark.parametrize('algorithm', ['LS1', 'LS2', 'LS3'])
+def test_check_solution_of_local_search(algorithm):
+    # the LS algorithms return their covers as sets
+    graph = load_graph('karate')
+    config = {'graph': 'karate', 'algorithm': algorithm, 'seed': 1, 'cutoff_time': 1}
+    solution, _ = run_algorithm(config, graph.copy(), 0.2)
+    assert isinstance(solution, set)
+    assert check_solution(graph, solution)
+
+
+@pytest.mark.parametrize('container', [list, set, tuple, np.array])
+def test_verify_cover_containers(container):
+    graph = load_graph('karate')
+    cover = list(range(1, graph.get_num_nodes() + 1))
+    assert verify_cover(graph, container(cover))['valid']
+    result = verify_cover(graph, container(cover[2:]))
+    assert not result['valid'] and result['uncovered'] > 0